@@ -0,0 +1,239 @@
+import os
+import traceback
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from filing_store import FilingStore
+from sec_filing_parser import _download_filings, parse_stored_filing
+from xbrl_parser import parse_xbrl
+
+
+# One result per input: `data` is set on success, `error` holds the formatted
+# exception (type, message and traceback) when parsing that input failed.
+BatchResult = namedtuple('BatchResult', ['source', 'data', 'error'])
+
+
+def _run_chunk(func, chunk):
+    """
+    Worker entry point: parse a chunk of inputs, capturing errors per input
+    """
+    results = []
+    for source in chunk:
+        try:
+            results.append(BatchResult(source, func(source), None))
+        except Exception:
+            results.append(BatchResult(source, None, traceback.format_exc()))
+    return results
+
+
+def _chunk_errors(chunk):
+    """
+    Fail every input of a chunk with the exception being handled
+    """
+    error = traceback.format_exc()
+    return [BatchResult(source, None, error) for source in chunk]
+
+
+def _run_isolated(func, chunk, initializer, initargs):
+    """
+    Rerun a chunk alone in a fresh worker process after the pool broke
+
+    Only a chunk that crashes its worker by itself is failed, instead of
+    every chunk that happened to be in flight when the pool went down.
+    """
+    with ProcessPoolExecutor(max_workers=1, initializer=initializer, initargs=initargs) as executor:
+        try:
+            return executor.submit(_run_chunk, func, chunk).result()
+        except Exception:
+            return _chunk_errors(chunk)
+
+
+def _chunks(items, chunksize):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_batch(func, items, max_workers=None, chunksize=4, ordered=True, max_pending=None,
+              initializer=None, initargs=()):
+    """
+    Run a picklable function over many inputs in a process pool
+
+    Inputs are submitted in chunks, and only a bounded number of chunks are
+    in flight at once, so very long input lists (or generators) do not build
+    up a huge backlog of pending futures and results. A chunk whose worker
+    crashes (taking the pool down with it) fails only that chunk's inputs;
+    the pool is recreated and the rest of the batch carries on.
+
+    Args:
+        func (callable): Module-level function (or functools.partial) taking one input
+        items (iterable): Inputs to process
+        max_workers (int): Worker processes (default: os.cpu_count())
+        chunksize (int): Inputs per submitted task (default: 4)
+        ordered (bool): Yield results in input order; otherwise as they complete (default: True)
+        max_pending (int): Maximum chunks in flight (default: 2 * max_workers)
+        initializer (callable): Run once in each worker process, e.g. to open shared resources
+        initargs (tuple): Arguments for initializer
+
+    Yields:
+        BatchResult: One result per input
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * max_workers
+    chunks = _chunks(items, max(1, chunksize))
+
+    def new_executor():
+        return ProcessPoolExecutor(max_workers=max_workers, initializer=initializer, initargs=initargs)
+
+    executor = new_executor()
+    # Futures of the chunks in flight, mapped to (chunk, executor it was submitted to)
+    pending = {}
+    try:
+        def replace_executor(broken):
+            # Only the first chunk to notice a broken pool replaces it
+            nonlocal executor
+            if broken is executor:
+                executor.shutdown(wait=False)
+                executor = new_executor()
+
+        def submit_next():
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            try:
+                future = executor.submit(_run_chunk, func, chunk)
+            except BrokenProcessPool:
+                # The pool broke while other chunks were still completing;
+                # their futures fail on their own when they are collected
+                replace_executor(executor)
+                future = executor.submit(_run_chunk, func, chunk)
+            pending[future] = (chunk, executor)
+            return True
+
+        # Prime the pool
+        while len(pending) < max_pending and submit_next():
+            pass
+
+        while pending:
+            if ordered:
+                # Results come back in submission order
+                done = [next(iter(pending))]
+            else:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                done = [future for future in pending if future in finished]
+
+            for future in done:
+                chunk, submitted_to = pending.pop(future)
+                try:
+                    results = future.result()
+                except BrokenProcessPool:
+                    # A worker died; every chunk in flight on that pool fails
+                    # with it, so each is rerun alone to find the culprit
+                    replace_executor(submitted_to)
+                    results = _run_isolated(func, chunk, initializer, initargs)
+                except Exception:
+                    results = _chunk_errors(chunk)
+
+                for result in results:
+                    yield result
+                submit_next()
+    finally:
+        executor.shutdown()
+
+
+def parse_xbrl_batch(paths, max_workers=None, chunksize=4, ordered=True, engine='auto', compact=True):
+    """
+    Parse many XBRL instance documents across a process pool
+
+    Args:
+        paths (iterable): Paths of XBRL instance documents
+        max_workers (int): Worker processes (default: os.cpu_count())
+        chunksize (int): Files per submitted task (default: 4)
+        ordered (bool): Yield results in input order; otherwise as they complete (default: True)
+        engine (str): XBRL parser engine, see parse_xbrl_to_dataframe (default: 'auto')
+        compact (bool): Return the typed fact table (default: True)
+
+    Yields:
+        BatchResult: source is the path, data the parsed DataFrame
+    """
+    func = partial(parse_xbrl, engine=engine, compact=compact)
+    return run_batch(func, paths, max_workers=max_workers, chunksize=chunksize, ordered=ordered)
+
+
+def _parse_filing(filing, store, html_engine):
+    """
+    Worker entry point: parse one filing (URL or filing dict) from the store
+    """
+    if isinstance(filing, str):
+        return parse_stored_filing(filing, store, html_engine)
+    return parse_stored_filing(filing['filing_url'], store, html_engine,
+                               filing.get('primary_document') or None)
+
+
+def _filing_url(filing):
+    return filing if isinstance(filing, str) else filing['filing_url']
+
+
+def _with_download_errors(filings, results, errors, ordered):
+    """
+    Merge filings that failed to download, as BatchResults, into the parse results
+    """
+    if not ordered:
+        for filing in filings:
+            if _filing_url(filing) in errors:
+                yield BatchResult(filing, None, errors[_filing_url(filing)])
+        yield from results
+        return
+
+    results = iter(results)
+    for filing in filings:
+        if _filing_url(filing) in errors:
+            yield BatchResult(filing, None, errors[_filing_url(filing)])
+        else:
+            yield next(results)
+
+
+def parse_filings_batch(filings, max_workers=None, chunksize=1, ordered=True,
+                        download=True, client=None, store=None, html_engine='auto'):
+    """
+    Parse many SEC filings across a process pool
+
+    Downloads (when requested) happen in this process so every request shares
+    one rate limiter; the workers only parse from the local filing store,
+    opened with the same configuration as store. Any failure, including a
+    filing or document that failed to download and an XBRL instance that
+    does not parse, lands in the result's error; filings that did not
+    download completely are not parsed.
+
+    Args:
+        filings (list): Filing URLs, or filing dicts from get_sp500_sec_filings
+                        (their primary_document is then used)
+        max_workers (int): Worker processes (default: os.cpu_count())
+        chunksize (int): Filings per submitted task (default: 1)
+        ordered (bool): Yield results in input order; otherwise as they complete (default: True)
+        download (bool): Download missing documents first (default: True)
+        client (EdgarClient): EDGAR client used for downloads (default: shared client)
+        store (FilingStore): Local filing store (default: FilingStore())
+        html_engine (str): HTML extraction engine (default: 'auto')
+
+    Yields:
+        BatchResult: source is the filing as given, data the dict returned by parse_sec_filing
+    """
+    store = store or FilingStore()
+    filings = list(filings)
+
+    errors = {}
+    if download:
+        errors = _download_filings(filings, client=client, store=store)[1]
+
+    func = partial(_parse_filing, store=store, html_engine=html_engine)
+    downloaded = [filing for filing in filings if _filing_url(filing) not in errors]
+    results = run_batch(func, downloaded, max_workers=max_workers, chunksize=chunksize, ordered=ordered)
+    return _with_download_errors(filings, results, errors, ordered)
@@ -0,0 +1,185 @@
+"""
+Synthetic, size-scaled EDGAR fixtures for the benchmark suite
+
+Generators are deterministic (seeded), so a given size always produces the
+same document and timings stay comparable across commits:
+
+    generate_xbrl_instance   XBRL instance with N facts (us-gaap concepts, contexts, units)
+    generate_10k             10-K style primary HTML document of N MB (see html_extract_bench)
+    generate_submissions     data.sec.gov submissions JSON with N filings plus overflow pages
+    build_replay_fixtures    company_tickers_exchange.json and submissions for N companies,
+                             laid out for edgar_replay_server
+"""
+import json
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from edgar_replay_server import fixture_path_for  # noqa: E402
+from html_extract_bench import generate_10k  # noqa: E402,F401
+
+
+XBRL_HEADER = '''<?xml version="1.0" encoding="utf-8"?>
+<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance"
+    xmlns:us-gaap="http://fasb.org/us-gaap/2023"
+    xmlns:dei="http://xbrl.sec.gov/dei/2023"
+    xmlns:iso4217="http://www.xbrl.org/2003/iso4217"
+    xmlns:xbrldi="http://xbrl.org/2006/xbrldi">
+  <xbrli:unit id="usd"><xbrli:measure>iso4217:USD</xbrli:measure></xbrli:unit>
+  <xbrli:unit id="shares"><xbrli:measure>xbrli:shares</xbrli:measure></xbrli:unit>
+  <xbrli:unit id="usdPerShare"><xbrli:divide>
+    <xbrli:unitNumerator><xbrli:measure>iso4217:USD</xbrli:measure></xbrli:unitNumerator>
+    <xbrli:unitDenominator><xbrli:measure>xbrli:shares</xbrli:measure></xbrli:unitDenominator>
+  </xbrli:divide></xbrli:unit>
+'''
+XBRL_CONCEPT_STEMS = ['Revenue', 'CostOfRevenue', 'OperatingExpenses', 'Assets', 'Liabilities',
+                      'StockholdersEquity', 'CashAndCashEquivalents', 'AccountsReceivable', 'Inventory',
+                      'Goodwill', 'IncomeTax', 'NetIncomeLoss', 'LongTermDebt', 'DeferredRevenue',
+                      'ShareBasedCompensation', 'Depreciation', 'InterestExpense', 'Dividends']
+XBRL_CONCEPT_SUFFIXES = ['', 'Current', 'Noncurrent', 'Net', 'Gross', 'Other', 'FairValue', 'Increase',
+                         'Decrease', 'Adjustment']
+XBRL_TEXT_FRACTION = 0.1
+XBRL_FACTS_PER_CONTEXT = 25
+
+FORM_MIX = [('4', 30), ('8-K', 25), ('10-Q', 12), ('10-K', 4), ('S-8', 3), ('SC 13G/A', 8),
+            ('DEF 14A', 3), ('424B2', 10), ('3', 2), ('144', 3)]
+RECENT_FILINGS = 1000
+OVERFLOW_PAGE_SIZE = 2000
+LATEST_FILING_DATE = date(2024, 12, 31)
+
+
+def generate_xbrl_instance(path, n_facts, seed=0):
+    """
+    Write a synthetic XBRL instance with n_facts facts
+
+    Roughly one context per XBRL_FACTS_PER_CONTEXT facts (alternating
+    duration and instant periods, some with a segment) and about 10% text
+    facts, in the element shapes real 10-K instances use.
+    """
+    rng = random.Random(seed)
+    concepts = [stem + suffix for stem in XBRL_CONCEPT_STEMS for suffix in XBRL_CONCEPT_SUFFIXES]
+    n_contexts = max(1, n_facts // XBRL_FACTS_PER_CONTEXT)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(XBRL_HEADER)
+        for i in range(n_contexts):
+            year = 2024 - (i % 20)
+            if i % 2:
+                period = f'<xbrli:instant>{year}-12-31</xbrli:instant>'
+            else:
+                period = f'<xbrli:startDate>{year}-01-01</xbrli:startDate><xbrli:endDate>{year}-12-31</xbrli:endDate>'
+            segment = ''
+            if i % 5 == 0:
+                segment = (f'<xbrli:segment><xbrldi:explicitMember dimension="us-gaap:StatementBusinessSegmentsAxis">'
+                           f'us-gaap:Segment{i % 7}Member</xbrldi:explicitMember></xbrli:segment>')
+            f.write(f'  <xbrli:context id="c{i}"><xbrli:entity>'
+                    f'<xbrli:identifier scheme="http://www.sec.gov/CIK">0000320193</xbrli:identifier>'
+                    f'{segment}</xbrli:entity><xbrli:period>{period}</xbrli:period></xbrli:context>\n')
+
+        lines = []
+        for i in range(n_facts):
+            context = f'c{rng.randrange(n_contexts)}'
+            concept = rng.choice(concepts)
+            if rng.random() < XBRL_TEXT_FRACTION:
+                lines.append(f'  <us-gaap:{concept}TextBlock contextRef="{context}">'
+                             f'&lt;p&gt;Disclosure {i} describing accounting policies.&lt;/p&gt;'
+                             f'</us-gaap:{concept}TextBlock>\n')
+            else:
+                lines.append(f'  <us-gaap:{concept} contextRef="{context}" unitRef="usd" decimals="-6">'
+                             f'{rng.randrange(-10 ** 9, 10 ** 11)}</us-gaap:{concept}>\n')
+            if len(lines) >= 10000:
+                f.writelines(lines)
+                lines = []
+        f.writelines(lines)
+        f.write('</xbrli:xbrl>\n')
+
+
+def _filings_block(rows):
+    """
+    Columnar filings block (the shape of filings.recent and overflow pages)
+    """
+    return {
+        'accessionNumber': [row[0] for row in rows],
+        'filingDate': [row[1] for row in rows],
+        'reportDate': [row[1] for row in rows],
+        'form': [row[2] for row in rows],
+        'primaryDocument': [row[3] for row in rows],
+    }
+
+
+def generate_submissions(cik, n_filings, seed=0, name=None):
+    """
+    Build a submissions API response with n_filings filings, newest first
+
+    The newest RECENT_FILINGS go in filings.recent; older ones are split into
+    OVERFLOW_PAGE_SIZE overflow pages listed in filings.files, as EDGAR does
+    for companies with long histories. Filings are spread over 25 years.
+
+    Returns:
+        tuple: (submissions dict, {page name: overflow page dict})
+    """
+    rng = random.Random(seed)
+    forms = [form for form, _ in FORM_MIX]
+    weights = [weight for _, weight in FORM_MIX]
+    spacing = 25 * 365 / max(n_filings, 1)
+
+    rows = []
+    for i in range(n_filings):
+        filed = LATEST_FILING_DATE - timedelta(days=int(i * spacing))
+        form = rng.choices(forms, weights)[0]
+        accession = f'{cik:010d}-{filed.year % 100:02d}-{i:06d}'
+        rows.append((accession, filed.isoformat(), form, f'doc{i}.htm'))
+
+    data = {
+        'cik': str(cik),
+        'name': name or f'Benchmark Company {cik}',
+        'tickers': [],
+        'filings': {'recent': _filings_block(rows[:RECENT_FILINGS]), 'files': []},
+    }
+    pages = {}
+    for number, start in enumerate(range(RECENT_FILINGS, n_filings, OVERFLOW_PAGE_SIZE), 1):
+        page_rows = rows[start:start + OVERFLOW_PAGE_SIZE]
+        page_name = f'CIK{cik:010d}-submissions-{number:03d}.json'
+        pages[page_name] = _filings_block(page_rows)
+        data['filings']['files'].append({
+            'name': page_name,
+            'filingCount': len(page_rows),
+            'filingFrom': page_rows[-1][1],
+            'filingTo': page_rows[0][1],
+        })
+    return data, pages
+
+
+def build_replay_fixtures(fixtures_dir, n_companies, filings_per_company=1500, first_cik=100000):
+    """
+    Write a replay-server fixture tree for n_companies companies
+
+    Companies get tickers BENCH0..BENCH<n-1> in company_tickers_exchange.json
+    and one submissions response (plus overflow pages) each.
+
+    Returns:
+        list: Tickers of the generated companies
+    """
+    def write(url, payload):
+        path = fixture_path_for(url, fixtures_dir)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+
+    tickers = [f'BENCH{i}' for i in range(n_companies)]
+    rows = []
+    for i, ticker in enumerate(tickers):
+        cik = first_cik + i
+        data, pages = generate_submissions(cik, filings_per_company, seed=i, name=f'{ticker} Inc')
+        write(f'https://data.sec.gov/submissions/CIK{cik:010d}.json', data)
+        for page_name, page in pages.items():
+            write(f'https://data.sec.gov/submissions/{page_name}', page)
+        rows.append([cik, f'{ticker} Inc', ticker, 'Nasdaq'])
+
+    write('https://www.sec.gov/files/company_tickers_exchange.json',
+          {'fields': ['cik', 'name', 'ticker', 'exchange'], 'data': rows})
+    return tickers
@@ -0,0 +1,103 @@
+"""
+Benchmark HTML text-block / footnote extraction engines on 10-K sized documents
+
+Usage:
+    python benchmarks/html_extract_bench.py [--sizes 1 5 10 20] [--repeat 3] [--html path ...]
+
+Synthetic documents mimic a large 10-K: Item headings, long narrative
+paragraphs, financial tables and scattered textBlock / footnote divs. Real
+primary documents can be benchmarked with --html.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_extract import extract_html_text  # noqa: E402
+
+
+PARAGRAPH = ("The Company designs, manufactures and markets products and services worldwide. "
+             "Net sales&#160;increased due to higher <b>volume</b> and favourable <i>pricing</i>. ") * 6
+TABLE_ROW = "<tr><td>Net sales</td><td>$</td><td>{value:,}</td><td>$</td><td>{prior:,}</td></tr>"
+ITEMS = ['1', '1A', '1B', '2', '3', '4', '5', '6', '7', '7A', '8', '9', '9A', '9B', '10', '11', '12', '13', '14', '15']
+
+
+def generate_10k(path, size_mb):
+    """
+    Write a synthetic 10-K style HTML document of roughly size_mb megabytes
+    """
+    target = int(size_mb * 1024 * 1024)
+    written = 0
+    block = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<html><head><title>10-K</title><style>p {margin: 0}</style></head><body>\n')
+        # Table of contents, as most 10-Ks have one
+        f.write('<table>' + ''.join(f'<tr><td>Item {item}.</td><td>{i + 3}</td></tr>'
+                                    for i, item in enumerate(ITEMS)) + '</table>\n')
+        while written < target:
+            item = ITEMS[block % len(ITEMS)]
+            chunk = [f'<div><p style="font-weight:bold">Item {item}. Section {item}</p>']
+            for i in range(40):
+                chunk.append(f'<p><span>{PARAGRAPH}</span></p>')
+            chunk.append('<table>' + ''.join(TABLE_ROW.format(value=1000 * i + block, prior=900 * i)
+                                             for i in range(30)) + '</table>')
+            chunk.append(f'<div class="textBlock" id="tb{block}"><p>{PARAGRAPH}</p>'
+                         f'<table>{TABLE_ROW.format(value=block, prior=block)}</table></div>')
+            chunk.append(f'<div class="footnote" id="fn{block}"><p>(1) {PARAGRAPH[:200]}</p></div></div>\n')
+            text = ''.join(chunk)
+            f.write(text)
+            written += len(text)
+            block += 1
+        f.write('</body></html>\n')
+
+
+def time_engine(path, engine, repeat):
+    """
+    Best-of-repeat wall time of one engine, plus its output
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = extract_html_text(path, engine=engine)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run(paths, repeat):
+    print(f"{'document':<28}{'MB':>7}{'engine':>8}{'seconds':>10}{'MB/s':>8}{'blocks':>8}{'notes':>7}{'items':>7}")
+    for path in paths:
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        timings = {}
+        for engine in ('bs4', 'lxml'):
+            seconds, result = time_engine(path, engine, repeat)
+            timings[engine] = seconds
+            items = len(result['sections']) if 'sections' in result else '-'
+            print(f"{os.path.basename(path)[:27]:<28}{size_mb:>7.1f}{engine:>8}{seconds:>10.2f}"
+                  f"{size_mb / seconds:>8.1f}{len(result['text_blocks']):>8}{len(result['footnotes']):>7}{items:>7}")
+        print(f"{'':<28}{'':>7}{'speedup':>8}{timings['bs4'] / timings['lxml']:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=float, nargs='*', default=[1, 5, 10, 20],
+                        help='Synthetic document sizes in MB')
+    parser.add_argument('--html', nargs='*', default=[], help='Real HTML documents to benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per engine (best is reported)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = list(args.html)
+        for size in args.sizes:
+            path = os.path.join(tmp, f'synthetic_10k_{size:g}mb.htm')
+            generate_10k(path, size)
+            paths.append(path)
+        run(paths, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,373 @@
+"""
+Benchmark suite for the parsing and crawling hot paths
+
+Usage:
+    python benchmarks/suite.py run [--suites xbrl html submissions crawl crawl_async] [--quick]
+                                   [--sizes N ...] [--repeat 3] [--output results.json]
+    python benchmarks/suite.py compare baseline.json candidate.json [--threshold 0.1]
+
+Suites and their default sizes:
+
+    xbrl          parse_xbrl_to_dataframe on instances of 1k, 100k and 1M facts
+    html          extract_html_text on 1, 5, 10 and 20 MB 10-K documents
+    submissions   submissions filtering (extract_filings) on 100, 1k and 10k filings
+    crawl         get_sp500_sec_filings over 10 and 100 companies against edgar_replay_server
+    crawl_async   the same crawl with concurrent=True
+
+Every case runs in a fresh subprocess, so peak RSS belongs to that case
+alone; fixtures are generated once by the parent and reused from
+--fixtures. Each case reports its best and mean wall time over --repeat
+runs, throughput, peak RSS, and, from one extra run under tracemalloc,
+peak traced allocations and the memory still held by the result.
+
+Results are written as JSON tagged with the git commit, so runs can be
+compared across commits; `compare` exits with status 1 when a case got
+slower or bigger than the threshold allows.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixtures  # noqa: E402
+
+
+SUITES = {
+    'xbrl': {'unit': 'facts', 'sizes': [1000, 100000, 1000000], 'quick': [1000, 10000, 100000]},
+    'html': {'unit': 'MB', 'sizes': [1, 5, 10, 20], 'quick': [1, 5]},
+    'submissions': {'unit': 'filings', 'sizes': [100, 1000, 10000], 'quick': [100, 1000, 10000]},
+    'crawl': {'unit': 'companies', 'sizes': [10, 100], 'quick': [10]},
+    'crawl_async': {'unit': 'companies', 'sizes': [10, 100], 'quick': [10]},
+}
+FILING_TYPES = ['10-K', '10-Q']
+START_DATE = '2000-01-01'
+END_DATE = '2024-12-31'
+CRAWL_FILINGS_PER_COMPANY = 1500
+
+# Metrics checked by compare; all of them are better when lower
+COMPARED_METRICS = ['seconds', 'peak_rss_mb', 'tracemalloc_peak_mb']
+DEFAULT_THRESHOLD = 0.10
+
+
+def _megabytes(value):
+    return round(value / (1024 * 1024), 2)
+
+
+def case_name(suite, size):
+    return f"{suite}:{size}" if isinstance(size, int) else f"{suite}:{size:g}"
+
+
+def _peak_rss_bytes():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def prepare_fixture(suite, size, fixtures_dir):
+    """
+    Generate (or reuse) the fixture for one case
+
+    Returns:
+        str: Fixture file, or fixture directory for the crawl suites
+    """
+    os.makedirs(fixtures_dir, exist_ok=True)
+    if suite == 'xbrl':
+        path = os.path.join(fixtures_dir, f'xbrl_{size}_facts.xml')
+        generate = lambda tmp: fixtures.generate_xbrl_instance(tmp, size)  # noqa: E731
+    elif suite == 'html':
+        path = os.path.join(fixtures_dir, f'10k_{size:g}mb.htm')
+        generate = lambda tmp: fixtures.generate_10k(tmp, size)  # noqa: E731
+    elif suite == 'submissions':
+        path = os.path.join(fixtures_dir, f'submissions_{size}_filings.json')
+
+        def generate(tmp):
+            data, pages = fixtures.generate_submissions(320193, size)
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'data': data, 'pages': list(pages.values())}, f)
+    else:
+        path = os.path.join(fixtures_dir, f'crawl_{size}_companies')
+        generate = lambda tmp: fixtures.build_replay_fixtures(tmp, size, CRAWL_FILINGS_PER_COMPANY)  # noqa: E731
+
+    if not os.path.exists(path):
+        # Build under a temporary name so an interrupted run never leaves a partial fixture
+        tmp_path = os.path.join(fixtures_dir, '.' + os.path.basename(path) + '.tmp')
+        generate(tmp_path)
+        os.replace(tmp_path, path)
+    return path
+
+
+def _workload(suite, size, fixture, crawl_rate_limit):
+    """
+    Set up one case inside the worker process
+
+    Returns:
+        tuple: (run callable, units of work per run, info callable taking (result, runs),
+               teardown callable or None)
+    """
+    if suite == 'xbrl':
+        from xbrl_parser import parse_xbrl_to_dataframe
+        return lambda: parse_xbrl_to_dataframe(fixture), size, lambda result, runs: {'rows': len(result)}, None
+
+    if suite == 'html':
+        from html_extract import extract_html_text
+        units = os.path.getsize(fixture) / (1024 * 1024)
+        info = lambda result, runs: {'text_blocks': len(result['text_blocks'])}  # noqa: E731
+        return lambda: extract_html_text(fixture), units, info, None
+
+    if suite == 'submissions':
+        from sec import extract_filings
+        with open(fixture, 'r', encoding='utf-8') as f:
+            loaded = json.load(f)
+        data, pages = loaded['data'], loaded['pages']
+        cik = str(data['cik']).zfill(10)
+
+        def run():
+            return extract_filings(data, 'BENCH', cik, FILING_TYPES, START_DATE, END_DATE, pages)
+        return run, size, lambda result, runs: {'filings': len(result)}, None
+
+    from edgar_client import EdgarClient
+    from edgar_replay_server import ReplayServer
+    from sec import get_sp500_sec_filings
+
+    server = ReplayServer(fixture, rate_limit=None)
+    client = EdgarClient(user_agent='sec-benchmarks bench@example.com', rate_limit=crawl_rate_limit,
+                         base_url=server.start())
+    tickers = [f'BENCH{i}' for i in range(size)]
+
+    def run():
+        return get_sp500_sec_filings(FILING_TYPES, START_DATE, END_DATE, client=client,
+                                     concurrent=(suite == 'crawl_async'), full_history=True,
+                                     tickers=tickers)
+
+    def info(result, runs):
+        return {'filings': len(result), 'requests_per_run': server.stats.snapshot()['requests'] // runs}
+
+    return run, size, info, server.stop
+
+
+def measure(suite, size, fixture, repeat, crawl_rate_limit):
+    """
+    Time one case and record its memory use (runs inside the worker process)
+
+    Returns:
+        dict: The case's result record
+    """
+    run, units, info, teardown = _workload(suite, size, fixture, crawl_rate_limit)
+    try:
+        baseline_rss = _peak_rss_bytes()
+
+        timings = []
+        result = None
+        for _ in range(repeat):
+            result = None
+            start = time.perf_counter()
+            result = run()
+            timings.append(time.perf_counter() - start)
+        if result is None:
+            raise RuntimeError(f"{suite} run returned no result")
+        peak_rss = _peak_rss_bytes()
+        extra = info(result, repeat)
+        result = None
+
+        # A separate traced run: tracemalloc slows allocation-heavy code down
+        tracemalloc.start()
+        result = run()
+        retained, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        if teardown is not None:
+            teardown()
+
+    best = min(timings)
+    record = {
+        'case': case_name(suite, size),
+        'suite': suite,
+        'size': size,
+        'unit': SUITES[suite]['unit'],
+        'repeat': repeat,
+        'seconds': round(best, 6),
+        'mean_seconds': round(sum(timings) / len(timings), 6),
+        'throughput': round(units / best, 3) if best > 0 else None,
+        'throughput_unit': f"{SUITES[suite]['unit']}/s",
+        'baseline_rss_mb': _megabytes(baseline_rss),
+        'peak_rss_mb': _megabytes(peak_rss),
+        'tracemalloc_peak_mb': _megabytes(traced_peak),
+        'retained_mb': _megabytes(retained),
+    }
+    record.update(extra)
+    return record
+
+
+def git_commit():
+    """
+    Get the checked-out commit and whether the working tree has uncommitted changes
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        return commit, bool(status)
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+
+def run_case(suite, size, fixture, repeat, crawl_rate_limit):
+    """
+    Run one case in a fresh interpreter and collect its record
+    """
+    command = [sys.executable, os.path.abspath(__file__), '_case', suite, str(size), fixture,
+               '--repeat', str(repeat), '--crawl-rate-limit', str(crawl_rate_limit)]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        error = (completed.stderr.strip().splitlines() or ['no output'])[-1]
+        return {'case': case_name(suite, size), 'suite': suite, 'size': size, 'error': error}
+    # The record is the last line; anything before it is output from the code under test
+    return json.loads(lines[-1])
+
+
+def _print_row(record):
+    if 'error' in record:
+        print(f"{record['case']:<24}  FAILED: {record['error']}")
+        return
+    print(f"{record['case']:<24}{record['seconds']:>10.3f}{record['throughput']:>14,.1f} {record['throughput_unit']:<12}"
+          f"{record['peak_rss_mb']:>10.1f}{record['tracemalloc_peak_mb']:>10.1f}{record['retained_mb']:>10.1f}")
+
+
+def run_suites(args):
+    commit, dirty = git_commit()
+    print(f"commit {commit[:12]}{' (dirty)' if dirty else ''}, python {platform.python_version()}")
+    print(f"{'case':<24}{'seconds':>10}{'throughput':>14} {'':<12}{'rss MB':>10}{'peak MB':>10}{'kept MB':>10}")
+
+    records = []
+    for suite in args.suites:
+        sizes = args.sizes or SUITES[suite]['quick' if args.quick else 'sizes']
+        for size in sizes:
+            size = int(size) if float(size).is_integer() else float(size)
+            fixture = prepare_fixture(suite, size, args.fixtures)
+            record = run_case(suite, size, fixture, args.repeat, args.crawl_rate_limit)
+            _print_row(record)
+            records.append(record)
+
+    results = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'cases': records,
+    }
+    output = args.output or os.path.join(
+        REPO_ROOT, 'benchmarks', 'results', f"{datetime.now():%Y%m%d-%H%M%S}-{commit[:10]}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+    return 1 if any('error' in record for record in records) else 0
+
+
+def compare(baseline, candidate, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare two result files case by case
+
+    Args:
+        baseline (dict): Results of the reference run
+        candidate (dict): Results of the run being checked
+        threshold (float): Allowed relative increase of each metric (default: 0.10)
+
+    Returns:
+        list: (case, metric, baseline value, candidate value) of every regression
+    """
+    base_cases = {record['case']: record for record in baseline['cases'] if 'error' not in record}
+    print(f"baseline {baseline['commit'][:12]} ({baseline['timestamp']})  vs  "
+          f"candidate {candidate['commit'][:12]}{' (dirty)' if candidate.get('dirty') else ''} "
+          f"({candidate['timestamp']})")
+    print(f"{'case':<24}" + ''.join(f"{metric:>32}" for metric in COMPARED_METRICS))
+
+    regressions = []
+    for record in candidate['cases']:
+        base = base_cases.get(record['case'])
+        if base is None or 'error' in record:
+            status = 'FAILED' if 'error' in record else 'new case'
+            print(f"{record['case']:<24}  {status}")
+            continue
+        cells = []
+        for metric in COMPARED_METRICS:
+            old, new = base.get(metric), record.get(metric)
+            if not old or new is None:
+                cells.append(f"{'-':>32}")
+                continue
+            change = new / old - 1
+            flag = ' !' if change > threshold else '  '
+            if change > threshold:
+                regressions.append((record['case'], metric, old, new))
+            cells.append(f"{old:.3f} -> {new:.3f} ({change:+.0%}){flag}".rjust(32))
+        print(f"{record['case']:<24}" + ''.join(cells))
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {threshold:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Run benchmark suites and write a results file')
+    run_parser.add_argument('--suites', nargs='*', choices=list(SUITES), default=list(SUITES))
+    run_parser.add_argument('--sizes', type=float, nargs='*', help='Override the sizes of every selected suite')
+    run_parser.add_argument('--quick', action='store_true', help='Smaller sizes, for a fast smoke run')
+    run_parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case (best is compared)')
+    run_parser.add_argument('--fixtures', default=os.path.join(tempfile.gettempdir(), 'sec_benchmark_fixtures'),
+                            help='Directory generated fixtures are cached in')
+    run_parser.add_argument('--crawl-rate-limit', type=float, default=1000,
+                            help='Client requests per second in the crawl suites (default: 1000, so the '
+                                 'crawl measures client overhead; 10 reproduces the SEC budget)')
+    run_parser.add_argument('--output', help='Results file (default: benchmarks/results/<time>-<commit>.json)')
+
+    compare_parser = commands.add_parser('compare', help='Compare two results files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help='Allowed relative increase before a case counts as a regression')
+
+    case_parser = commands.add_parser('_case')
+    case_parser.add_argument('suite', choices=list(SUITES))
+    case_parser.add_argument('size', type=float)
+    case_parser.add_argument('fixture')
+    case_parser.add_argument('--repeat', type=int, default=3)
+    case_parser.add_argument('--crawl-rate-limit', type=float, default=1000)
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        sys.exit(run_suites(args))
+    if args.command == 'compare':
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.candidate, 'r', encoding='utf-8') as f:
+            candidate = json.load(f)
+        sys.exit(1 if compare(baseline, candidate, args.threshold) else 0)
+
+    size = int(args.size) if args.size.is_integer() else args.size
+    record = measure(args.suite, size, args.fixture, args.repeat, args.crawl_rate_limit)
+    print(json.dumps(record))
+
+
+if __name__ == '__main__':
+    main()
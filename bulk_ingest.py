@@ -0,0 +1,210 @@
+import json
+import re
+import zipfile
+from datetime import datetime, timedelta
+from functools import partial
+
+import pandas as pd
+
+from batch_parser import _chunks, run_batch
+from companyfacts import concat_companyfacts, flatten_companyfacts
+from edgar_metrics import get_default_metrics
+from sec import extract_filings
+
+
+# Members of the nightly archives: CIK##########.json (one company) and, in
+# submissions.zip, CIK##########-submissions-###.json overflow pages
+MEMBER_PATTERN = re.compile(r'^CIK(\d{10})(?:-submissions-\d+)?\.json$')
+
+
+def _group_members(zip_path, ciks=None):
+    """
+    Group archive members by CIK: (cik, main member, [overflow page members])
+    """
+    wanted = None if ciks is None else {str(cik).zfill(10) for cik in ciks}
+    groups = {}
+
+    with zipfile.ZipFile(zip_path) as archive:
+        for name in archive.namelist():
+            match = MEMBER_PATTERN.match(name)
+            if not match:
+                continue
+            cik = match.group(1)
+            if wanted is not None and cik not in wanted:
+                continue
+            group = groups.setdefault(cik, [None, []])
+            if '-submissions-' in name:
+                group[1].append(name)
+            else:
+                group[0] = name
+
+    return [(cik, main, sorted(pages)) for cik, (main, pages) in sorted(groups.items()) if main]
+
+
+# The archive each worker process has open. Reading the central directory of
+# the real submissions.zip (~900k members) is expensive, so it happens once
+# per worker instead of once per chunk.
+_archive = None
+
+
+def _open_archive(zip_path):
+    """
+    Worker initializer: open the archive once for the life of the process
+    """
+    global _archive
+    if _archive is not None:
+        _archive.close()
+    _archive = zipfile.ZipFile(zip_path)
+
+
+def _get_archive(zip_path):
+    if _archive is None or _archive.filename != zip_path:
+        _open_archive(zip_path)
+    return _archive
+
+
+def _read_member(archive, name):
+    # Stream the member straight out of the archive; nothing is extracted to disk
+    with archive.open(name) as member:
+        return json.load(member)
+
+
+def _member_error(failures, name, e):
+    # Workers run in other processes, so failures travel back with the chunk's
+    # output and are reported by _collect
+    failures.append((name, f"{type(e).__name__}: {str(e)}"))
+
+
+def _submissions_chunk(groups, zip_path, filing_types, start_date, end_date):
+    """
+    Worker: extract matching filings for a chunk of CIKs from submissions.zip
+
+    Returns:
+        tuple: (filing dicts, [(member name, error)] for members that failed)
+    """
+    filing_links = []
+    failures = []
+    archive = _get_archive(zip_path)
+    for cik, main, pages in groups:
+        try:
+            data = _read_member(archive, main)
+        except Exception as e:
+            _member_error(failures, main, e)
+            continue
+
+        # A bad overflow page only loses that page's filings
+        overflow_pages = []
+        for page in pages:
+            try:
+                overflow_pages.append(_read_member(archive, page))
+            except Exception as e:
+                _member_error(failures, page, e)
+
+        try:
+            ticker = (data.get('tickers') or [''])[0]
+            filing_links.extend(extract_filings(
+                data, ticker, cik, filing_types, start_date, end_date, overflow_pages
+            ))
+        except Exception as e:
+            _member_error(failures, main, e)
+    return filing_links, failures
+
+
+def _companyfacts_chunk(groups, zip_path):
+    """
+    Worker: flatten a chunk of CIKs from companyfacts.zip into one table
+
+    Returns:
+        tuple: (fact table, [(member name, error)] for members that failed)
+    """
+    frames = []
+    failures = []
+    archive = _get_archive(zip_path)
+    for cik, main, pages in groups:
+        try:
+            frames.append(flatten_companyfacts(_read_member(archive, main)))
+        except Exception as e:
+            _member_error(failures, main, e)
+    return concat_companyfacts(frames), failures
+
+
+def _collect(results, zip_path):
+    """
+    Gather worker outputs, reporting chunks and members that failed
+    """
+    metrics = get_default_metrics()
+    outputs = []
+    for result in results:
+        if result.error:
+            error = result.error.strip().splitlines()[-1]
+            metrics.event('bulk_chunk_failed', level='error',
+                          message=f"Error reading {zip_path}: {error}", zip_path=zip_path, error=error)
+            continue
+        output, failures = result.data
+        for member, error in failures:
+            metrics.event('bulk_member_failed', level='error',
+                          message=f"Error reading {member} from {zip_path}: {error}",
+                          zip_path=zip_path, member=member, error=error)
+        outputs.append(output)
+    return outputs
+
+
+def read_submissions_zip(zip_path, filing_types=['10-K', '10-Q'], start_date=None, end_date=None,
+                         ciks=None, max_workers=None, chunksize=256, as_dataframe=False):
+    """
+    Build the filing index from a locally downloaded nightly submissions.zip
+
+    Produces the same filing dictionaries as get_sp500_sec_filings, including
+    filings from overflow pages, without making any HTTP requests. Members
+    are streamed out of the archive and parsed across a process pool.
+
+    Args:
+        zip_path (str): Path to submissions.zip
+        filing_types (list): List of filing types to keep (default: ['10-K', '10-Q'])
+        start_date (str): Start date in YYYY-MM-DD format (default: 365 days ago)
+        end_date (str): End date in YYYY-MM-DD format (default: today)
+        ciks (list): Only read these CIKs (default: every company in the archive)
+        max_workers (int): Worker processes (default: os.cpu_count())
+        chunksize (int): Companies per worker task (default: 256)
+        as_dataframe (bool): Return a DataFrame instead of a list (default: False)
+
+    Returns:
+        list: List of dictionaries containing filing information and links
+    """
+    # Set default dates if not provided
+    if not end_date:
+        end_date = datetime.now().strftime('%Y-%m-%d')
+    if not start_date:
+        start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
+
+    groups = _group_members(zip_path, ciks)
+    func = partial(_submissions_chunk, zip_path=zip_path, filing_types=list(filing_types),
+                   start_date=start_date, end_date=end_date)
+    results = run_batch(func, _chunks(groups, chunksize), max_workers=max_workers, chunksize=1,
+                        initializer=_open_archive, initargs=(zip_path,))
+
+    filing_links = [filing for chunk in _collect(results, zip_path) for filing in chunk]
+    return pd.DataFrame(filing_links) if as_dataframe else filing_links
+
+
+def read_companyfacts_zip(zip_path, ciks=None, max_workers=None, chunksize=64):
+    """
+    Build the company fact table from a locally downloaded nightly companyfacts.zip
+
+    Produces the same table as flatten_companyfacts does for a single
+    api/xbrl/companyfacts response, for every company in the archive.
+
+    Args:
+        zip_path (str): Path to companyfacts.zip
+        ciks (list): Only read these CIKs (default: every company in the archive)
+        max_workers (int): Worker processes (default: os.cpu_count())
+        chunksize (int): Companies per worker task (default: 64)
+
+    Returns:
+        pandas.DataFrame: One row per reported fact
+    """
+    groups = _group_members(zip_path, ciks)
+    func = partial(_companyfacts_chunk, zip_path=zip_path)
+    results = run_batch(func, _chunks(groups, chunksize), max_workers=max_workers, chunksize=1,
+                        initializer=_open_archive, initargs=(zip_path,))
+    return concat_companyfacts(_collect(results, zip_path))
@@ -0,0 +1,205 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from edgar_client import get_default_client, run_coroutine
+from edgar_metrics import get_default_metrics
+
+
+COMPANYFACTS_URL = "https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json"
+COMPANYCONCEPT_URL = "https://data.sec.gov/api/xbrl/companyconcept/CIK{cik}/{taxonomy}/{tag}.json"
+
+FACT_FIELDS = ['start', 'end', 'val', 'accn', 'fy', 'fp', 'form', 'filed', 'frame']
+COMPANYFACTS_COLUMNS = ['cik', 'entity_name', 'taxonomy', 'concept', 'unit', 'start', 'end', 'value',
+                        'accn', 'fy', 'fp', 'form', 'filed', 'frame']
+CATEGORICAL_COLUMNS = ['entity_name', 'taxonomy', 'concept', 'unit', 'fp', 'form', 'frame']
+
+
+def flatten_companyfacts(data):
+    """
+    Flatten a companyfacts JSON document into one typed columnar table
+
+    The nested taxonomy -> concept -> unit -> facts structure is walked once to
+    concatenate the fact lists and record how many facts each (taxonomy,
+    concept, unit) group holds. The table is then built in a single DataFrame
+    construction, with the group labels broadcast as categorical codes via
+    np.repeat instead of being copied into every fact dict.
+
+    Args:
+        data (dict): Decoded api/xbrl/companyfacts/CIK##########.json document
+
+    Returns:
+        pandas.DataFrame: One row per reported fact with COMPANYFACTS_COLUMNS
+    """
+    facts = []
+    group_labels = []
+    group_sizes = []
+
+    for taxonomy, concepts in data.get('facts', {}).items():
+        for concept, detail in concepts.items():
+            for unit, unit_facts in detail.get('units', {}).items():
+                facts.extend(unit_facts)
+                group_labels.append((taxonomy, concept, unit))
+                group_sizes.append(len(unit_facts))
+
+    table = pd.DataFrame.from_records(facts, columns=FACT_FIELDS) if facts else pd.DataFrame(columns=FACT_FIELDS)
+    group_codes = np.repeat(np.arange(len(group_labels), dtype=np.int32), group_sizes)
+
+    def labels(position):
+        # Factorize the per-group labels, then broadcast codes to every fact
+        codes, uniques = pd.factorize(pd.Series([label[position] for label in group_labels], dtype=object))
+        return pd.Categorical.from_codes(codes[group_codes], categories=uniques)
+
+    result = pd.DataFrame({
+        'cik': np.full(len(table), int(data.get('cik', 0)), dtype=np.int64),
+        'entity_name': pd.Categorical([data.get('entityName', '')] * len(table)),
+        'taxonomy': labels(0),
+        'concept': labels(1),
+        'unit': labels(2),
+        'start': pd.to_datetime(table['start'], errors='coerce').astype('datetime64[ns]'),
+        'end': pd.to_datetime(table['end'], errors='coerce').astype('datetime64[ns]'),
+        'value': pd.to_numeric(table['val'], errors='coerce').astype('float64'),
+        'accn': table['accn'].astype(object),
+        'fy': pd.to_numeric(table['fy'], errors='coerce').astype('Int16'),
+        'fp': table['fp'].astype('category'),
+        'form': table['form'].astype('category'),
+        'filed': pd.to_datetime(table['filed'], errors='coerce').astype('datetime64[ns]'),
+        'frame': table['frame'].astype('category'),
+    }, columns=COMPANYFACTS_COLUMNS)
+    return result
+
+
+def concat_companyfacts(frames):
+    """
+    Concatenate flattened companyfacts tables, keeping categorical columns compact
+
+    Args:
+        frames (list): DataFrames returned by flatten_companyfacts
+
+    Returns:
+        pandas.DataFrame: Combined table
+    """
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        return flatten_companyfacts({})
+
+    combined = pd.concat(frames, ignore_index=True)
+    for column in CATEGORICAL_COLUMNS:
+        # Categoricals with different categories concatenate to object; re-encode once
+        if combined[column].dtype != 'category':
+            combined[column] = combined[column].astype('category')
+    return combined
+
+
+def _as_cik_list(ciks):
+    if isinstance(ciks, (str, int)):
+        ciks = [ciks]
+    return [str(cik).zfill(10) for cik in ciks]
+
+
+def _concept_as_companyfacts(data):
+    """
+    Wrap a companyconcept response in the companyfacts layout so it flattens the same way
+    """
+    return {
+        'cik': data.get('cik', 0),
+        'entityName': data.get('entityName', ''),
+        'facts': {data.get('taxonomy', ''): {data.get('tag', ''): {'units': data.get('units', {})}}},
+    }
+
+
+async def _fetch_flattened_async(urls, client, max_concurrency):
+    """
+    Fetch JSON documents concurrently and flatten each one
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(url):
+        try:
+            async with semaphore:
+                data = await client.get_json_async(url)
+            if 'facts' not in data:
+                data = _concept_as_companyfacts(data)
+            return flatten_companyfacts(data)
+        except Exception as e:
+            get_default_metrics().error('companyfacts_fetch_failed', f"Error fetching {url}: {str(e)}", e, url=url)
+            return None
+
+    return concat_companyfacts(await asyncio.gather(*(fetch(url) for url in urls)))
+
+
+async def fetch_company_facts_async(ciks, client=None, max_concurrency=10):
+    """
+    Fetch and flatten api/xbrl/companyfacts for many companies concurrently
+
+    Requests draw from the client's shared token bucket, so the crawl stays
+    within the SEC request budget.
+
+    Args:
+        ciks (list): CIKs (padded or unpadded), or a single CIK
+        client (EdgarClient): EDGAR client to use (default: shared client)
+        max_concurrency (int): Maximum in-flight requests (default: 10)
+
+    Returns:
+        pandas.DataFrame: One row per reported fact (see flatten_companyfacts)
+    """
+    client = client or get_default_client()
+    urls = [COMPANYFACTS_URL.format(cik=cik) for cik in _as_cik_list(ciks)]
+    return await _fetch_flattened_async(urls, client, max_concurrency)
+
+
+def fetch_company_facts(ciks, client=None, max_concurrency=10):
+    """
+    Fetch every XBRL fact reported by one or more companies
+
+    One companyfacts request returns a company's full reported history,
+    replacing a download and parse of each of its instance documents.
+
+    Args:
+        ciks (list): CIKs (padded or unpadded), or a single CIK
+        client (EdgarClient): EDGAR client to use (default: shared client)
+        max_concurrency (int): Maximum in-flight requests (default: 10)
+
+    Returns:
+        pandas.DataFrame: One row per reported fact (see flatten_companyfacts)
+    """
+    return run_coroutine(fetch_company_facts_async(ciks, client=client, max_concurrency=max_concurrency))
+
+
+async def fetch_company_concept_async(ciks, tag, taxonomy='us-gaap', client=None, max_concurrency=10):
+    """
+    Fetch and flatten api/xbrl/companyconcept for one concept across many companies
+
+    Args:
+        ciks (list): CIKs (padded or unpadded), or a single CIK
+        tag (str): Concept name, e.g. 'AccountsPayableCurrent'
+        taxonomy (str): Taxonomy of the concept (default: 'us-gaap')
+        client (EdgarClient): EDGAR client to use (default: shared client)
+        max_concurrency (int): Maximum in-flight requests (default: 10)
+
+    Returns:
+        pandas.DataFrame: One row per reported fact (see flatten_companyfacts)
+    """
+    client = client or get_default_client()
+    urls = [COMPANYCONCEPT_URL.format(cik=cik, taxonomy=taxonomy, tag=tag) for cik in _as_cik_list(ciks)]
+    return await _fetch_flattened_async(urls, client, max_concurrency)
+
+
+def fetch_company_concept(ciks, tag, taxonomy='us-gaap', client=None, max_concurrency=10):
+    """
+    Fetch one concept's full history for one or more companies
+
+    Args:
+        ciks (list): CIKs (padded or unpadded), or a single CIK
+        tag (str): Concept name, e.g. 'AccountsPayableCurrent'
+        taxonomy (str): Taxonomy of the concept (default: 'us-gaap')
+        client (EdgarClient): EDGAR client to use (default: shared client)
+        max_concurrency (int): Maximum in-flight requests (default: 10)
+
+    Returns:
+        pandas.DataFrame: One row per reported fact (see flatten_companyfacts)
+    """
+    return run_coroutine(fetch_company_concept_async(
+        ciks, tag, taxonomy=taxonomy, client=client, max_concurrency=max_concurrency
+    ))
@@ -0,0 +1,415 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from edgar_metrics import endpoint_for, get_default_metrics
+from http_cache import HttpCache
+
+
+# SEC asks automated clients to identify themselves and stay under 10 requests per second
+DEFAULT_RATE_LIMIT = 10
+# Template agents copied from examples; SEC blocks them like missing ones
+PLACEHOLDER_USER_AGENTS = {'your name (your.email@domain.com)', 'sample company name admin@company.com'}
+
+# Responses worth retrying after the server's Retry-After (or an exponential backoff)
+RETRY_STATUSES = (429, 503)
+MAX_RETRY_DELAY = 60
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter measured against wall-clock time
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Time spent
+    inside a request counts towards the refill, so a slow response does not
+    cause an additional fixed sleep the way `time.sleep(0.1)` did.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE_LIMIT, capacity=None):
+        """
+        Args:
+            rate (float): Tokens added per second
+            capacity (float): Maximum burst size (default: same as rate)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take one token and return how long the caller must wait before using it
+
+        The token is claimed immediately, so concurrent callers (threads or
+        asyncio tasks) queue up behind each other instead of all waking at once.
+
+        Returns:
+            float: Seconds to wait before sending the request (0 if available now)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """
+        Block until a token is available
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class EdgarClient:
+    """
+    Shared HTTP client for sec.gov and data.sec.gov
+
+    Holds a keep-alive connection pool, negotiates gzip and sends the mandatory
+    User-Agent on every request. All requests go through one token bucket so
+    every caller sharing the client shares the same SEC request budget.
+    429 and 503 responses are retried after their Retry-After delay.
+
+    With a base_url, https://<host>/<path> requests for sec.gov hosts are
+    sent to <base_url>/<host>/<path> instead, e.g. an edgar_replay_server.
+
+    Requests, response bytes, latency, 429s, retries, rate-limiter waits and
+    cache hits are counted per endpoint in the client's Metrics registry.
+    """
+
+    def __init__(self, user_agent=None, rate_limit=DEFAULT_RATE_LIMIT, pool_size=20, timeout=30, cache=None,
+                 base_url=None, max_retries=3, metrics=None):
+        """
+        Args:
+            user_agent (str): User-Agent sent to the SEC, e.g. 'Jane Doe jane@example.com'
+                              (default: $SEC_USER_AGENT; one of the two is required)
+            rate_limit (float): Maximum requests per second (default: 10)
+            pool_size (int): Keep-alive connections kept per host (default: 20)
+            timeout (float): Per-request timeout in seconds (default: 30)
+            cache (HttpCache): Conditional-GET cache used by get_json (default: no caching)
+            base_url (str): Send sec.gov requests to this server instead (default: $EDGAR_BASE_URL)
+            max_retries (int): Retries of a 429/503 response (default: 3)
+            metrics (Metrics): Registry for request metrics (default: process-wide registry)
+        """
+        user_agent = (user_agent or os.environ.get('SEC_USER_AGENT') or '').strip()
+        if not user_agent or user_agent.lower() in PLACEHOLDER_USER_AGENTS:
+            raise ValueError(
+                "A User-Agent identifying you is required for SEC EDGAR requests: pass "
+                "user_agent='Your Name your.email@example.com' or set $SEC_USER_AGENT"
+            )
+
+        if max_retries < 0:
+            raise ValueError(f"max_retries must be 0 or more, got {max_retries}")
+
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.base_url = (base_url or os.environ.get('EDGAR_BASE_URL') or '').rstrip('/') or None
+        self.max_retries = max_retries
+        # No burst allowance: requests are paced evenly, so no one-second
+        # window ever holds more than rate_limit requests
+        self.limiter = TokenBucket(rate_limit, capacity=1)
+        self.cache = cache
+        self._metrics = metrics
+
+        # One pooled session reused across requests avoids a TCP+TLS handshake per call
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Accept-Encoding': 'gzip, deflate',
+        })
+
+    def get(self, url, **kwargs):
+        """
+        Rate-limited GET request
+
+        Args:
+            url (str): URL to fetch
+            **kwargs: Extra arguments passed to requests.Session.get
+
+        Returns:
+            requests.Response: The response (status is not checked)
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        endpoint = endpoint_for(url)
+        url = self.resolve_url(url)
+        for attempt in range(self.max_retries + 1):
+            self._record_wait(endpoint, self.limiter.acquire())
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, **kwargs)
+            except requests.RequestException as e:
+                self.metrics.inc('http_errors_total', endpoint=endpoint, error=type(e).__name__)
+                raise
+            self._record_response(endpoint, response, time.perf_counter() - started, kwargs.get('stream'))
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            response.close()
+            time.sleep(self._record_retry(endpoint, url, response, attempt))
+
+    async def get_async(self, url, **kwargs):
+        """
+        Rate-limited GET request for use from asyncio code
+
+        Waiting for a token happens on the event loop, so many tasks can be
+        queued without tying up threads; only the request itself runs in a
+        worker thread on the shared connection pool.
+
+        Args:
+            url (str): URL to fetch
+            **kwargs: Extra arguments passed to requests.Session.get
+
+        Returns:
+            requests.Response: The response (status is not checked)
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        endpoint = endpoint_for(url)
+        url = self.resolve_url(url)
+        for attempt in range(self.max_retries + 1):
+            delay = self.limiter.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._record_wait(endpoint, delay)
+            started = time.perf_counter()
+            try:
+                response = await asyncio.to_thread(self.session.get, url, **kwargs)
+            except requests.RequestException as e:
+                self.metrics.inc('http_errors_total', endpoint=endpoint, error=type(e).__name__)
+                raise
+            self._record_response(endpoint, response, time.perf_counter() - started, kwargs.get('stream'))
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            response.close()
+            await asyncio.sleep(self._record_retry(endpoint, url, response, attempt))
+
+    @property
+    def metrics(self):
+        """
+        Metrics registry the client records into
+        """
+        return self._metrics or get_default_metrics()
+
+    def _record_wait(self, endpoint, delay):
+        if delay > 0:
+            self.metrics.inc('rate_limit_wait_seconds_total', delay, endpoint=endpoint)
+
+    def _record_response(self, endpoint, response, elapsed, stream=False):
+        metrics = self.metrics
+        status = response.status_code
+        metrics.inc('http_requests_total', endpoint=endpoint, status=status)
+        metrics.observe('http_request_seconds', elapsed, endpoint=endpoint)
+        if status == 429:
+            metrics.inc('http_throttled_total', endpoint=endpoint)
+        # Streamed bodies are counted by whoever consumes them
+        if not stream:
+            metrics.inc('http_response_bytes_total', len(response.content), endpoint=endpoint)
+
+    def _record_retry(self, endpoint, url, response, attempt):
+        """
+        Count a retry and return how long to wait before it
+        """
+        delay = _retry_delay(response, attempt)
+        status = response.status_code
+        self.metrics.inc('http_retries_total', endpoint=endpoint, status=status)
+        self.metrics.event('http_retry', message=f"Retrying {url} in {delay:.1f}s after HTTP {status}",
+                           endpoint=endpoint, url=url, status=status, attempt=attempt + 1, delay=delay)
+        return delay
+
+    def resolve_url(self, url):
+        """
+        Rewrite a sec.gov URL onto base_url (unchanged when no base_url is set)
+
+        Args:
+            url (str): URL such as https://data.sec.gov/submissions/CIK0000320193.json
+
+        Returns:
+            str: URL to request, e.g. <base_url>/data.sec.gov/submissions/CIK0000320193.json
+        """
+        if self.base_url is None:
+            return url
+        split = urlsplit(url)
+        if split.scheme != 'https' or not split.netloc.endswith('sec.gov'):
+            return url
+        query = f"?{split.query}" if split.query else ''
+        return f"{self.base_url}/{split.netloc}{split.path}{query}"
+
+    def get_json(self, url, missing_ok=False, **kwargs):
+        """
+        Rate-limited GET request that raises on HTTP errors and decodes JSON
+
+        When the client has a cache, fresh entries are served from disk and
+        stale ones are revalidated with If-None-Match / If-Modified-Since.
+
+        Args:
+            url (str): URL to fetch
+            missing_ok (bool): Return None for a 404 instead of raising; the
+                               404 is cached like any other response (default: False)
+            **kwargs: Extra arguments passed to requests.Session.get
+
+        Returns:
+            dict: Decoded JSON body
+        """
+        entry = self._cache_lookup(url)
+        if entry is not None and self.cache.is_fresh(entry):
+            self._record_cache(url, 'hit')
+            return json.loads(self.cache.read(url))
+
+        response = self.get(url, **self._with_validators(entry, kwargs))
+        return json.loads(self._cache_response(url, entry, response, missing_ok))
+
+    async def get_json_async(self, url, missing_ok=False, **kwargs):
+        """
+        Asyncio version of get_json
+
+        Args:
+            url (str): URL to fetch
+            missing_ok (bool): Return None for a 404 instead of raising (default: False)
+            **kwargs: Extra arguments passed to requests.Session.get
+
+        Returns:
+            dict: Decoded JSON body
+        """
+        entry = self._cache_lookup(url)
+        if entry is not None and self.cache.is_fresh(entry):
+            self._record_cache(url, 'hit')
+            return json.loads(self.cache.read(url))
+
+        response = await self.get_async(url, **self._with_validators(entry, kwargs))
+        return json.loads(self._cache_response(url, entry, response, missing_ok))
+
+    def _record_cache(self, url, result):
+        self.metrics.inc('http_cache_total', endpoint=endpoint_for(url), result=result)
+
+    def _cache_lookup(self, url):
+        if self.cache is None:
+            return None
+        return self.cache.lookup(url)
+
+    def _with_validators(self, entry, kwargs):
+        if entry is None:
+            return kwargs
+        headers = dict(kwargs.get('headers') or {})
+        headers.update(self.cache.conditional_headers(entry))
+        return dict(kwargs, headers=headers)
+
+    def _cache_response(self, url, entry, response, missing_ok=False):
+        # 304 Not Modified: the body on disk is still current
+        if response.status_code == 304 and entry is not None:
+            self.cache.revalidated(url)
+            self._record_cache(url, 'revalidated')
+            return self.cache.read(url)
+
+        # An expected 404 is stored as a JSON null, so it is served from the
+        # cache (and decodes to None) like any other response
+        if missing_ok and response.status_code == 404:
+            body = b'null'
+        else:
+            response.raise_for_status()
+            body = response.content
+        if self.cache is not None:
+            self._record_cache(url, 'miss')
+            self.cache.store(url, body, response.headers)
+        return body
+
+    def close(self):
+        """
+        Close all pooled connections
+        """
+        self.session.close()
+
+
+def _retry_delay(response, attempt):
+    """
+    Seconds to wait before retrying: the Retry-After header, else exponential backoff
+    """
+    retry_after = response.headers.get('Retry-After')
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), MAX_RETRY_DELAY)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                return min(max(delay, 0.0), MAX_RETRY_DELAY)
+            except (TypeError, ValueError):
+                pass
+    return min(2.0 ** attempt, MAX_RETRY_DELAY)
+
+
+def run_coroutine(coroutine):
+    """
+    Run a coroutine to completion from synchronous code
+
+    asyncio.run() refuses to start inside a running event loop, which
+    Jupyter always has. There the coroutine runs on its own loop in a worker
+    thread, and this call blocks until it finishes.
+
+    Args:
+        coroutine (coroutine): Coroutine to run
+
+    Returns:
+        object: The coroutine's result
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """
+    Get the process-wide EDGAR client, creating it on first use
+
+    The User-Agent is read from $SEC_USER_AGENT, which must be set (ValueError
+    otherwise). Setting $SEC_HTTP_CACHE_DIR enables the on-disk conditional-GET
+    cache, and $EDGAR_BASE_URL redirects requests to a stand-in server.
+
+    Returns:
+        EdgarClient: Shared client instance
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            cache_dir = os.environ.get('SEC_HTTP_CACHE_DIR')
+            cache = HttpCache(cache_dir) if cache_dir else None
+            _default_client = EdgarClient(cache=cache)
+        return _default_client
+
+
+def set_default_client(client):
+    """
+    Replace the process-wide EDGAR client (e.g. to change the User-Agent or rate limit)
+
+    Args:
+        client (EdgarClient): Client used by all fetch functions from now on
+    """
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
@@ -0,0 +1,438 @@
+"""
+Structured metrics and events for the EDGAR pipeline
+
+One Metrics registry collects:
+
+    counters     http_requests_total{endpoint,status}, http_response_bytes_total{endpoint},
+                 http_throttled_total{endpoint}, http_retries_total{endpoint,status},
+                 http_errors_total{endpoint,error}, http_cache_total{endpoint,result},
+                 rate_limit_wait_seconds_total{endpoint}, stage_errors_total{stage},
+                 events_total{event,level}
+    histograms   http_request_seconds{endpoint}, stage_seconds{stage}
+    events       structured records (failures, retries) passed to every sink
+
+so a slow run can be told apart as network-bound (request latency),
+throttled (429s, retries, rate-limiter wait) or parser-bound (parse stages).
+
+Output is pluggable: sinks receive events (ConsoleSink prints their
+messages as the library always did, JsonLogSink writes JSON lines), and
+counters/histograms are exported in Prometheus text format with
+prometheus_text, write_prometheus (textfile collector) or
+start_prometheus_server. Setting $SEC_METRICS_LOG adds a JSON log sink
+to the process-wide registry.
+
+Usage:
+    from edgar_metrics import get_default_metrics, JsonLogSink, write_prometheus
+
+    metrics = get_default_metrics()
+    metrics.add_sink(JsonLogSink('edgar_events.jsonl'))
+    with metrics.timed('download'):
+        ...
+    write_prometheus('/var/lib/node_exporter/edgar.prom')
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40}
+
+METRIC_HELP = {
+    'http_requests_total': 'HTTP responses received from EDGAR',
+    'http_response_bytes_total': 'Decoded response body bytes received from EDGAR',
+    'http_throttled_total': 'HTTP 429 (rate limit) responses received from EDGAR',
+    'http_retries_total': 'Requests retried after a 429/503 response',
+    'http_errors_total': 'Requests that failed without a response',
+    'http_cache_total': 'get_json cache lookups by result (hit, revalidated, miss)',
+    'http_request_seconds': 'EDGAR request latency (streamed responses: until headers)',
+    'rate_limit_wait_seconds_total': 'Time spent waiting for the client rate limiter',
+    'stage_seconds': 'Wall time of pipeline stages (download, parse, filter)',
+    'stage_errors_total': 'Pipeline stages that raised',
+    'events_total': 'Structured events by name and level',
+}
+
+# EDGAR URL path -> endpoint label; labels stay low-cardinality (no CIKs or accessions)
+ENDPOINT_PATTERNS = [
+    (re.compile(r'^/submissions/'), 'submissions'),
+    (re.compile(r'^/api/xbrl/companyfacts/'), 'companyfacts'),
+    (re.compile(r'^/api/xbrl/companyconcept/'), 'companyconcept'),
+    (re.compile(r'^/api/xbrl/frames/'), 'frames'),
+    (re.compile(r'^/files/company_tickers'), 'company_tickers'),
+    (re.compile(r'^/Archives/edgar/data/.+/index\.json$'), 'filing_index'),
+    (re.compile(r'^/Archives/edgar/data/'), 'filing_document'),
+    (re.compile(r'^/Archives/edgar/(?:full-index|daily-index|Feed)/'), 'edgar_index'),
+]
+
+
+def endpoint_for(url):
+    """
+    Get the endpoint label of an EDGAR URL, e.g. 'submissions' or 'filing_document'
+    """
+    path = urlsplit(url).path
+    for pattern, endpoint in ENDPOINT_PATTERNS:
+        if pattern.search(path):
+            return endpoint
+    return 'other'
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class Metrics:
+    """
+    Thread-safe registry of counters, latency histograms and event sinks
+    """
+
+    def __init__(self, sinks=None, buckets=DEFAULT_BUCKETS, namespace='edgar'):
+        """
+        Args:
+            sinks (list): Callables receiving each event record (default: none)
+            buckets (list): Histogram bucket upper bounds in seconds (default: DEFAULT_BUCKETS)
+            namespace (str): Prefix of exported metric names (default: 'edgar')
+        """
+        self.sinks = list(sinks or [])
+        self.buckets = tuple(sorted(buckets))
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def add_sink(self, sink):
+        """
+        Send events to another sink (any callable taking the event record dict)
+        """
+        self.sinks.append(sink)
+        return sink
+
+    def remove_sink(self, sink):
+        self.sinks.remove(sink)
+
+    def inc(self, name, value=1, **labels):
+        """
+        Add to a counter
+
+        Args:
+            name (str): Counter name, e.g. 'http_requests_total'
+            value (float): Amount to add (default: 1)
+            **labels: Label values, e.g. endpoint='submissions'
+        """
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """
+        Record a value (seconds) in a histogram
+
+        Args:
+            name (str): Histogram name, e.g. 'stage_seconds'
+            value (float): Observed value
+            **labels: Label values, e.g. stage='parse'
+        """
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram['buckets'][i] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def event(self, name, level='info', message=None, **fields):
+        """
+        Emit a structured event to every sink
+
+        Args:
+            name (str): Event name, e.g. 'filing_download_failed'
+            level (str): 'debug', 'info', 'warning' or 'error' (default: 'info')
+            message (str): Human-readable message (default: None)
+            **fields: Structured fields, e.g. url=..., ticker=...
+
+        Returns:
+            dict: The event record
+        """
+        record = {'time': time.time(), 'event': name, 'level': level}
+        if message is not None:
+            record['message'] = message
+        record.update(fields)
+        self.inc('events_total', event=name, level=level)
+        for sink in list(self.sinks):
+            try:
+                sink(record)
+            except Exception:
+                # A broken sink must never take the pipeline down with it
+                pass
+        return record
+
+    def error(self, name, message, error=None, **fields):
+        """
+        Emit an error event, with the exception's text and type as fields
+
+        Args:
+            name (str): Event name, e.g. 'ticker_failed'
+            message (str): Human-readable message
+            error (Exception): The exception being reported (default: None)
+            **fields: Structured fields
+        """
+        if error is not None:
+            fields.update(error=str(error), error_type=type(error).__name__)
+        return self.event(name, level='error', message=message, **fields)
+
+    @contextmanager
+    def timed(self, stage, **labels):
+        """
+        Time a pipeline stage into stage_seconds{stage=...}
+
+        Exceptions propagate; they are also counted in stage_errors_total.
+
+        Args:
+            stage (str): Stage name, e.g. 'download', 'parse' or 'filter'
+            **labels: Extra label values
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc('stage_errors_total', stage=stage, **labels)
+            raise
+        finally:
+            self.observe('stage_seconds', time.perf_counter() - started, stage=stage, **labels)
+
+    def value(self, name, **labels):
+        """
+        Read a counter (0 if never incremented)
+        """
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def total(self, name, **labels):
+        """
+        Sum a counter over every label combination matching the given labels
+        """
+        wanted = set(_label_key(labels))
+        with self._lock:
+            return sum(value for (counter, key), value in self._counters.items()
+                       if counter == name and wanted <= set(key))
+
+    def snapshot(self):
+        """
+        Copy every counter and histogram
+
+        Returns:
+            dict: 'counters' and 'histograms' lists of {name, labels, ...} records
+        """
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(key), 'value': value}
+                        for (name, key), value in sorted(self._counters.items())]
+            histograms = [{'name': name, 'labels': dict(key), 'buckets': dict(zip(self.buckets, h['buckets'])),
+                           'sum': h['sum'], 'count': h['count']}
+                          for (name, key), h in sorted(self._histograms.items())]
+        return {'counters': counters, 'histograms': histograms}
+
+    def reset(self):
+        """
+        Clear every counter and histogram (sinks are kept)
+        """
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+class ConsoleSink:
+    """
+    Prints event messages at or above a level, as the library's print() calls did
+    """
+
+    def __init__(self, level='warning', stream=None):
+        """
+        Args:
+            level (str): Lowest level printed (default: 'warning')
+            stream (file): Text stream (default: sys.stdout at the time of each event)
+        """
+        self.level = LEVELS[level]
+        self.stream = stream
+
+    def __call__(self, record):
+        if LEVELS.get(record['level'], 0) >= self.level:
+            print(record.get('message') or record['event'], file=self.stream or sys.stdout)
+
+
+class JsonLogSink:
+    """
+    Writes each event as one JSON line
+    """
+
+    def __init__(self, target, level='debug'):
+        """
+        Args:
+            target (str or file): Log file path (appended to) or a text stream
+            level (str): Lowest level written (default: 'debug')
+        """
+        self.level = LEVELS[level]
+        self._owned = isinstance(target, str)
+        if self._owned:
+            directory = os.path.dirname(os.path.abspath(target))
+            os.makedirs(directory, exist_ok=True)
+            self.stream = open(target, 'a', encoding='utf-8')
+        else:
+            self.stream = target
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        if LEVELS.get(record['level'], 0) < self.level:
+            return
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+    def close(self):
+        if self._owned:
+            self.stream.close()
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels.items()) + list((extra or {}).items())
+    if not items:
+        return ''
+    escaped = [(name, str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"'))
+               for name, value in items]
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+def prometheus_text(metrics=None):
+    """
+    Render counters and histograms in the Prometheus text exposition format
+
+    Args:
+        metrics (Metrics): Registry to export (default: process-wide registry)
+
+    Returns:
+        str: Exposition text (version 0.0.4)
+    """
+    metrics = metrics or get_default_metrics()
+    snapshot = metrics.snapshot()
+    prefix = f"{metrics.namespace}_" if metrics.namespace else ''
+    lines = []
+    declared = set()
+
+    def declare(name, kind):
+        if name not in declared:
+            declared.add(name)
+            lines.append(f"# HELP {prefix}{name} {METRIC_HELP.get(name, name)}")
+            lines.append(f"# TYPE {prefix}{name} {kind}")
+
+    for counter in snapshot['counters']:
+        declare(counter['name'], 'counter')
+        lines.append(f"{prefix}{counter['name']}{_format_labels(counter['labels'])} {counter['value']}")
+
+    for histogram in snapshot['histograms']:
+        name, labels = histogram['name'], histogram['labels']
+        declare(name, 'histogram')
+        for bound, count in histogram['buckets'].items():
+            lines.append(f"{prefix}{name}_bucket{_format_labels(labels, {'le': _format_bound(bound)})} {count}")
+        lines.append(f"{prefix}{name}_bucket{_format_labels(labels, {'le': '+Inf'})} {histogram['count']}")
+        lines.append(f"{prefix}{name}_sum{_format_labels(labels)} {histogram['sum']}")
+        lines.append(f"{prefix}{name}_count{_format_labels(labels)} {histogram['count']}")
+
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path, metrics=None):
+    """
+    Write the exposition text to a file (written atomically), e.g. for the
+    node_exporter textfile collector at the end of a batch run
+
+    Args:
+        path (str): Output .prom file
+        metrics (Metrics): Registry to export (default: process-wide registry)
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, '.' + os.path.basename(path) + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(prometheus_text(metrics))
+    os.replace(tmp_path, path)
+
+
+def start_prometheus_server(port=9464, host='127.0.0.1', metrics=None):
+    """
+    Serve GET /metrics for Prometheus to scrape, from a background thread
+
+    Args:
+        port (int): Port to listen on (default: 9464)
+        host (str): Interface to listen on (default: 127.0.0.1)
+        metrics (Metrics): Registry to export (default: process-wide registry at scrape time)
+
+    Returns:
+        ThreadingHTTPServer: The running server (call shutdown() to stop it)
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if urlsplit(self.path).path != '/metrics':
+                self.send_error(404)
+                return
+            body = prometheus_text(metrics).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+_default_metrics = None
+_default_metrics_lock = threading.Lock()
+
+
+def get_default_metrics():
+    """
+    Get the process-wide metrics registry, creating it on first use
+
+    It prints warning and error messages to stdout (the library's former
+    print() output); setting $SEC_METRICS_LOG also writes every event to that
+    file as JSON lines.
+
+    Returns:
+        Metrics: Shared registry
+    """
+    global _default_metrics
+    with _default_metrics_lock:
+        if _default_metrics is None:
+            sinks = [ConsoleSink()]
+            log_path = os.environ.get('SEC_METRICS_LOG')
+            if log_path:
+                sinks.append(JsonLogSink(log_path))
+            _default_metrics = Metrics(sinks)
+        return _default_metrics
+
+
+def set_default_metrics(metrics):
+    """
+    Replace the process-wide metrics registry (e.g. one without a console sink)
+    """
+    global _default_metrics
+    with _default_metrics_lock:
+        _default_metrics = metrics
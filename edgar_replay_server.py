@@ -0,0 +1,425 @@
+"""
+Offline stand-in for sec.gov / data.sec.gov that replays recorded fixtures
+
+Fixtures are laid out as <fixtures_dir>/<host>/<path>, e.g.
+
+    fixtures/www.sec.gov/files/company_tickers.json
+    fixtures/data.sec.gov/submissions/CIK0000320193.json
+    fixtures/www.sec.gov/Archives/edgar/data/320193/000032019323000106/index.json
+    fixtures/data.sec.gov/api/xbrl/frames/us-gaap/Assets/USD/CY2023Q4I.json
+
+and requested as <base_url>/<host>/<path>. Point an EdgarClient at the
+server with EdgarClient(base_url=server.base_url) or $EDGAR_BASE_URL.
+Folder URLs are served from their index.html; a fixture stored only as
+<file>.gz is sent gzip-encoded.
+
+The server can add latency, cap bandwidth, inject 429/503 responses with
+Retry-After, and answers 429 to clients exceeding the SEC's 10 requests
+per second. GET /__stats__ returns request counters as JSON
+(/__stats__?reset=1 also clears them).
+
+Usage:
+    python edgar_replay_server.py serve fixtures --port 8080 --latency 0.05
+    python edgar_replay_server.py record fixtures https://www.sec.gov/files/company_tickers.json ...
+"""
+import argparse
+import collections
+import json
+import os
+import random
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from edgar_client import DEFAULT_RATE_LIMIT, EdgarClient
+
+
+CONTENT_TYPES = {
+    '.json': 'application/json',
+    '.xml': 'application/xml',
+    '.xsd': 'application/xml',
+    '.htm': 'text/html',
+    '.html': 'text/html',
+    '.txt': 'text/plain',
+    '.zip': 'application/zip',
+}
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class ReplayStats:
+    """
+    Thread-safe request counters exposed at /__stats__
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+            self.by_status = collections.Counter()
+            self.by_host = collections.Counter()
+            self.injected_errors = 0
+            self.rate_limit_violations = 0
+            self.max_requests_per_second = 0
+            self.in_flight = 0
+            self.max_in_flight = 0
+            self.started_at = time.time()
+            self._window = collections.deque()
+
+    def begin(self, host):
+        """
+        Count an incoming request
+
+        Returns:
+            tuple: (arrival time, requests received in the last second including this one)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.requests += 1
+            self.by_host[host] += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self._window.append(now)
+            while self._window and self._window[0] <= now - 1.0:
+                self._window.popleft()
+            self.max_requests_per_second = max(self.max_requests_per_second, len(self._window))
+            return now, len(self._window)
+
+    def refuse(self, received_at):
+        """
+        Drop a throttled request from the rate window, so 429s do not keep the window full
+        """
+        with self._lock:
+            try:
+                self._window.remove(received_at)
+            except ValueError:
+                pass
+
+    def end(self, status, bytes_sent, injected=False, throttled=False):
+        with self._lock:
+            self.in_flight -= 1
+            self.by_status[str(status)] += 1
+            self.bytes_sent += bytes_sent
+            self.injected_errors += injected
+            self.rate_limit_violations += throttled
+            if self.in_flight == 0:
+                self._idle.notify_all()
+
+    def snapshot(self, timeout=1.0):
+        """
+        Get the counters, first waiting up to timeout for requests still being answered
+
+        A response reaches the client just before its handler counts it, so
+        without the wait a client could miss its own last request.
+        """
+        with self._lock:
+            self._idle.wait_for(lambda: self.in_flight == 0, timeout=timeout)
+            elapsed = time.time() - self.started_at
+            return {
+                'requests': self.requests,
+                'bytes_sent': self.bytes_sent,
+                'by_status': dict(self.by_status),
+                'by_host': dict(self.by_host),
+                'injected_errors': self.injected_errors,
+                'rate_limit_violations': self.rate_limit_violations,
+                'max_requests_per_second': self.max_requests_per_second,
+                'max_in_flight': self.max_in_flight,
+                'elapsed': elapsed,
+                'requests_per_second': self.requests / elapsed if elapsed > 0 else 0.0,
+            }
+
+
+class _ReplayHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections (e.g. after closing a retried response) are routine
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'EdgarReplay/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.replay.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        replay = self.server.replay
+        split = urlsplit(self.path)
+        if split.path == '/__stats__':
+            if parse_qs(split.query).get('reset'):
+                replay.stats.reset()
+            return self._send_body(200, json.dumps(replay.stats.snapshot(timeout=0)).encode('utf-8'),
+                                   {'Content-Type': 'application/json'}, count=False)
+
+        host, _, path = split.path.lstrip('/').partition('/')
+        received_at, recent = replay.stats.begin(host)
+        status, sent, injected, throttled = 500, 0, False, False
+        try:
+            if replay.latency:
+                time.sleep(replay.latency + replay.random.uniform(0, replay.jitter))
+
+            if not self.headers.get('User-Agent'):
+                status, sent = self._send_error(403, 'A User-Agent header is required')
+            elif replay.rate_limit and recent > replay.rate_limit:
+                throttled = True
+                replay.stats.refuse(received_at)
+                status, sent = self._send_error(429, 'Request rate threshold exceeded',
+                                                retry_after=replay.retry_after)
+            elif replay.error_rate and replay.random.random() < replay.error_rate:
+                injected = True
+                status, sent = self._send_error(replay.random.choice(replay.error_statuses),
+                                                'Injected failure', retry_after=replay.retry_after)
+            else:
+                status, sent = self._send_fixture(host, path)
+        finally:
+            replay.stats.end(status, sent, injected, throttled)
+
+    def _send_error(self, status, message, retry_after=None):
+        headers = {'Content-Type': 'text/plain'}
+        if retry_after is not None:
+            headers['Retry-After'] = str(retry_after)
+        return status, self._send_body(status, message.encode('utf-8'), headers)
+
+    def _send_fixture(self, host, path):
+        replay = self.server.replay
+        fixture = replay.fixture_path(host, path)
+        if fixture is None:
+            return self._send_error(404, 'No fixture for this URL')
+
+        headers = {'Content-Type': CONTENT_TYPES.get(os.path.splitext(path)[1].lower(), 'application/octet-stream')}
+        if fixture.endswith('.gz') and not path.endswith('.gz'):
+            headers['Content-Encoding'] = 'gzip'
+
+        stat = os.stat(fixture)
+        etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+        headers['ETag'] = etag
+        headers['Last-Modified'] = formatdate(stat.st_mtime, usegmt=True)
+        if self.headers.get('If-None-Match') == etag:
+            return 304, self._send_body(304, b'', headers)
+
+        with open(fixture, 'rb') as f:
+            body = f.read()
+
+        # Resumable downloads: honour "Range: bytes=N-", unless an If-Range
+        # validator no longer matches, in which case the whole body is sent
+        status = 200
+        requested = self.headers.get('Range', '')
+        if_range = self.headers.get('If-Range')
+        if (requested.startswith('bytes=') and 'Content-Encoding' not in headers
+                and if_range in (None, etag, headers['Last-Modified'])):
+            start = int(requested[len('bytes='):].split('-', 1)[0] or 0)
+            if start >= len(body):
+                headers['Content-Range'] = f'bytes */{len(body)}'
+                return 416, self._send_body(416, b'', headers)
+            headers['Content-Range'] = f'bytes {start}-{len(body) - 1}/{len(body)}'
+            body = body[start:]
+            status = 206
+        headers['Accept-Ranges'] = 'bytes'
+        return status, self._send_body(status, body, headers)
+
+    def _send_body(self, status, body, headers, count=True):
+        """
+        Send a response, pacing the body to the configured bandwidth cap
+
+        Returns:
+            int: Body bytes sent
+        """
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        bandwidth = self.server.replay.bandwidth if count else None
+        started = time.monotonic()
+        for offset in range(0, len(body), STREAM_CHUNK_SIZE):
+            self.wfile.write(body[offset:offset + STREAM_CHUNK_SIZE])
+            if bandwidth:
+                ahead = min(offset + STREAM_CHUNK_SIZE, len(body)) / bandwidth - (time.monotonic() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+        return len(body)
+
+
+class ReplayServer:
+    """
+    Threaded HTTP server replaying EDGAR fixtures, for offline load and latency tests
+    """
+
+    def __init__(self, fixtures_dir, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, bandwidth=None,
+                 error_rate=0.0, error_statuses=(429, 503), retry_after=1, rate_limit=DEFAULT_RATE_LIMIT,
+                 seed=None, verbose=False):
+        """
+        Args:
+            fixtures_dir (str): Directory laid out as <host>/<path>
+            host (str): Interface to listen on (default: 127.0.0.1)
+            port (int): Port to listen on (default: 0, any free port)
+            latency (float): Seconds added before every response (default: 0)
+            jitter (float): Extra random latency of up to this many seconds (default: 0)
+            bandwidth (float): Per-response cap in bytes per second (default: unlimited)
+            error_rate (float): Fraction of requests answered with an injected error (default: 0)
+            error_statuses (list): Statuses used for injected errors (default: 429 and 503)
+            retry_after (int): Retry-After seconds sent with 429/503 responses (default: 1)
+            rate_limit (float): Requests per second above which clients get 429
+                                (default: 10, the SEC limit; None disables the check)
+            seed (int): Seed for error injection, for reproducible runs (default: None)
+            verbose (bool): Log every request to stderr (default: False)
+        """
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.error_statuses = list(error_statuses)
+        self.retry_after = retry_after
+        self.rate_limit = rate_limit
+        self.random = random.Random(seed)
+        self.verbose = verbose
+        self.stats = ReplayStats()
+
+        self.httpd = _ReplayHTTPServer((host, port), _ReplayHandler)
+        self.httpd.replay = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fixture_path(self, host, path):
+        """
+        Find the fixture file for a request, or None
+        """
+        root = os.path.abspath(self.fixtures_dir)
+        fixture = os.path.abspath(os.path.join(root, host, path))
+        if not fixture.startswith(root + os.sep):
+            return None
+        if os.path.isdir(fixture):
+            fixture = os.path.join(fixture, 'index.html')
+        for candidate in (fixture, fixture + '.gz'):
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+
+    def start(self):
+        """
+        Serve in a background thread
+
+        Returns:
+            str: Base URL to pass to EdgarClient(base_url=...)
+        """
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        """
+        Stop serving and close the listening socket
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def fixture_path_for(url, fixtures_dir):
+    """
+    Get the fixture file a live URL is recorded to (folder URLs map to index.html)
+    """
+    split = urlsplit(url)
+    path = split.path.lstrip('/')
+    if not path or path.endswith('/') or '.' not in os.path.basename(path):
+        path = os.path.join(path, 'index.html')
+    return os.path.join(fixtures_dir, split.netloc, path)
+
+
+def record(urls, fixtures_dir, client=None):
+    """
+    Download live EDGAR responses into a fixtures directory
+
+    Args:
+        urls (list): sec.gov / data.sec.gov URLs to record
+        fixtures_dir (str): Fixtures directory laid out as <host>/<path>
+        client (EdgarClient): Client used for the live requests (default: a new client)
+
+    Returns:
+        list: Paths of the recorded fixtures (failed URLs are skipped)
+    """
+    client = client or EdgarClient()
+    recorded = []
+    for url in urls:
+        try:
+            response = client.get(url)
+            response.raise_for_status()
+            path = fixture_path_for(url, fixtures_dir)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(response.content)
+            recorded.append(path)
+        except Exception as e:
+            client.metrics.error('fixture_record_failed', f"Error recording {url}: {str(e)}", e, url=url)
+    return recorded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline EDGAR replay server')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help='Serve a fixtures directory')
+    serve.add_argument('fixtures_dir')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8080)
+    serve.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    serve.add_argument('--jitter', type=float, default=0.0, help='Extra random latency (seconds)')
+    serve.add_argument('--bandwidth', type=float, default=None, help='Bytes per second per response')
+    serve.add_argument('--error-rate', type=float, default=0.0, help='Fraction of injected 429/503s')
+    serve.add_argument('--retry-after', type=int, default=1)
+    serve.add_argument('--rate-limit', type=float, default=DEFAULT_RATE_LIMIT,
+                       help='Requests per second before 429 (0 disables)')
+    serve.add_argument('--seed', type=int, default=None)
+    serve.add_argument('--verbose', action='store_true')
+
+    rec = commands.add_parser('record', help='Record live URLs into a fixtures directory')
+    rec.add_argument('fixtures_dir')
+    rec.add_argument('urls', nargs='+')
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        for path in record(args.urls, args.fixtures_dir):
+            print(path)
+        return
+
+    server = ReplayServer(
+        args.fixtures_dir, host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+        bandwidth=args.bandwidth, error_rate=args.error_rate, retry_after=args.retry_after,
+        rate_limit=args.rate_limit or None, seed=args.seed, verbose=args.verbose,
+    )
+    print(f"Replaying {args.fixtures_dir} at {server.base_url} (set EDGAR_BASE_URL to point clients here)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
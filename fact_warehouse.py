@@ -0,0 +1,293 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+
+# Stable on-disk schemas. Partition columns (cik, fiscal_year) are encoded in
+# the directory names and are not stored inside the files.
+FACT_SCHEMA = pa.schema([
+    ('accession_number', pa.string()),
+    ('form_type', pa.string()),
+    ('filing_date', pa.timestamp('ns')),
+    ('concept', pa.dictionary(pa.int32(), pa.string())),
+    ('value', pa.float64()),
+    ('value_text', pa.string()),
+    ('context_ref', pa.dictionary(pa.int32(), pa.string())),
+    ('start', pa.timestamp('ns')),
+    ('end', pa.timestamp('ns')),
+    ('instant', pa.timestamp('ns')),
+    ('unit', pa.dictionary(pa.int32(), pa.string())),
+    ('decimals', pa.dictionary(pa.int32(), pa.string())),
+])
+
+TEXT_SCHEMA = pa.schema([
+    ('accession_number', pa.string()),
+    ('form_type', pa.string()),
+    ('filing_date', pa.timestamp('ns')),
+    ('id', pa.string()),
+    ('type', pa.string()),
+    ('text', pa.string()),
+])
+
+PARTITIONING = ds.partitioning(
+    pa.schema([('cik', pa.int64()), ('fiscal_year', pa.int32())]), flavor='hive'
+)
+
+TABLES = {
+    'facts': FACT_SCHEMA,
+    'text_blocks': TEXT_SCHEMA,
+    'footnotes': TEXT_SCHEMA,
+}
+
+
+def _conform(df, schema):
+    """
+    Cast a DataFrame to a fixed Arrow schema, adding missing columns as nulls
+    """
+    columns = []
+    for field in schema:
+        if field.name in df.columns:
+            column = df[field.name]
+            if pa.types.is_dictionary(field.type) or pa.types.is_string(field.type):
+                # Normalize categoricals / missing values to plain strings before casting
+                column = column.astype(object).where(column.notna(), None)
+            columns.append(pa.array(column, from_pandas=True).cast(field.type))
+        else:
+            columns.append(pa.nulls(len(df), type=field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def _split_text_values(facts):
+    """
+    Move non-numeric entries of a string `value` column into value_text
+
+    Fact tables parsed with compact=False keep every value as a string; the
+    numeric ones go to the float64 `value` column and the rest to value_text,
+    as in the compact fact table.
+    """
+    if 'value' not in facts.columns or pd.api.types.is_numeric_dtype(facts['value']):
+        return facts
+    raw = facts['value']
+    numeric = pd.to_numeric(raw, errors='coerce')
+    text = raw.astype(object).where(numeric.isna() & raw.notna(), None)
+    if 'value_text' in facts.columns:
+        text = facts['value_text'].astype(object).where(facts['value_text'].notna(), text)
+    return facts.assign(value=numeric.astype('float64'), value_text=text)
+
+
+class FactWarehouse:
+    """
+    Partitioned Parquet dataset of parsed filings
+
+    Facts, text blocks and footnotes are written to root/<table>/cik=<cik>/
+    fiscal_year=<year>/<accession>.parquet. Every file is cast to the table's
+    fixed schema, so datasets stay readable as new accessions are appended,
+    and reads push concept/CIK/date filters down to the Parquet scanner.
+    """
+
+    def __init__(self, root='sec_warehouse'):
+        """
+        Args:
+            root (str): Root directory of the dataset (default: sec_warehouse)
+        """
+        self.root = root
+
+    def _partition_dir(self, table, cik, fiscal_year):
+        return os.path.join(self.root, table, f"cik={int(cik)}", f"fiscal_year={int(fiscal_year)}")
+
+    def _file_path(self, table, cik, fiscal_year, accession_number):
+        return os.path.join(self._partition_dir(table, cik, fiscal_year),
+                            f"{accession_number.replace('-', '')}.parquet")
+
+    def has_accession(self, cik, accession_number, table='facts'):
+        """
+        Check whether an accession has already been written for a CIK
+
+        Args:
+            cik (str): Company CIK
+            accession_number (str): Accession number (with or without dashes)
+            table (str): 'facts', 'text_blocks' or 'footnotes' (default: 'facts')
+
+        Returns:
+            bool: True if a file for the accession exists in any fiscal year
+        """
+        cik_dir = os.path.join(self.root, table, f"cik={int(cik)}")
+        if not os.path.isdir(cik_dir):
+            return False
+        filename = f"{accession_number.replace('-', '')}.parquet"
+        return any(
+            os.path.exists(os.path.join(cik_dir, year_dir, filename))
+            for year_dir in os.listdir(cik_dir)
+        )
+
+    def write_filing(self, filing, parsed, fiscal_year=None):
+        """
+        Append one parsed filing to the warehouse
+
+        Writes are append-only: an accession that is already present is skipped.
+
+        Args:
+            filing (dict): Filing info with 'cik', 'accession_number', 'filing_type'
+                           and 'filing_date' (as returned by get_sp500_sec_filings)
+            parsed (dict): Output of parse_sec_filing
+            fiscal_year (int): Partition year (default: dei:DocumentFiscalYearFocus,
+                               then the year of dei:DocumentPeriodEndDate, then the
+                               latest duration end date capped at the filing date)
+
+        Returns:
+            list: Paths of the files written
+        """
+        cik = filing['cik']
+        accession_number = filing['accession_number']
+        filing_date = pd.Timestamp(filing['filing_date'])
+
+        facts = parsed.get('xbrl_data')
+        if fiscal_year is None:
+            fiscal_year = _infer_fiscal_year(facts, filing_date)
+
+        written = []
+        for table, schema in TABLES.items():
+            df = parsed.get('xbrl_data' if table == 'facts' else table)
+            if df is None or df.empty or self.has_accession(cik, accession_number, table):
+                continue
+
+            if table == 'facts':
+                df = _split_text_values(df)
+            df = df.assign(
+                accession_number=accession_number,
+                form_type=filing.get('filing_type', ''),
+                filing_date=filing_date,
+            )
+            path = self._file_path(table, cik, fiscal_year, accession_number)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            # Write under a hidden temp name (skipped by dataset discovery) and rename
+            tmp_path = os.path.join(os.path.dirname(path), '.' + os.path.basename(path) + '.tmp')
+            pq.write_table(_conform(df, schema), tmp_path)
+            os.replace(tmp_path, path)
+            written.append(path)
+
+        return written
+
+    def dataset(self, table='facts'):
+        """
+        Open one table as a pyarrow dataset
+
+        Args:
+            table (str): 'facts', 'text_blocks' or 'footnotes' (default: 'facts')
+
+        Returns:
+            pyarrow.dataset.Dataset: The partitioned dataset
+        """
+        schema = TABLES[table]
+        for field in PARTITIONING.schema:
+            schema = schema.append(field)
+        return ds.dataset(os.path.join(self.root, table), format='parquet',
+                          partitioning=PARTITIONING, schema=schema)
+
+    def read(self, table='facts', concepts=None, ciks=None, start_date=None, end_date=None,
+             form_types=None, columns=None):
+        """
+        Read rows with filters pushed down to the Parquet scan
+
+        Args:
+            table (str): 'facts', 'text_blocks' or 'footnotes' (default: 'facts')
+            concepts (list): Concept names to keep (facts only)
+            ciks (list): CIKs to keep; prunes whole cik= partitions
+            start_date (str): Keep facts whose period ends on/after this date
+                              (filing date for text tables)
+            end_date (str): Keep facts whose period ends on/before this date
+                            (filing date for text tables)
+            form_types (list): Form types to keep
+            columns (list): Columns to return (default: all)
+
+        Returns:
+            pandas.DataFrame: Matching rows
+        """
+        if not os.path.isdir(os.path.join(self.root, table)):
+            return pd.DataFrame(columns=columns or TABLES[table].names)
+
+        expression = None
+
+        def add(condition):
+            nonlocal expression
+            expression = condition if expression is None else expression & condition
+
+        if ciks is not None:
+            add(ds.field('cik').isin([int(cik) for cik in ciks]))
+        if concepts is not None and table == 'facts':
+            add(ds.field('concept').isin(list(concepts)))
+        if form_types is not None:
+            add(ds.field('form_type').isin(list(form_types)))
+
+        # Facts are dated by their period end (or instant); text by filing date
+        if start_date is not None or end_date is not None:
+            if table == 'facts':
+                add(_date_range('end', start_date, end_date) | _date_range('instant', start_date, end_date))
+            else:
+                add(_date_range('filing_date', start_date, end_date))
+
+        return self.dataset(table).to_table(columns=columns, filter=expression).to_pandas()
+
+
+def _date_range(name, start_date, end_date):
+    """
+    Build a pushdown expression keeping rows whose date column lies in the window
+    """
+    field = ds.field(name)
+    condition = field.is_valid()
+    if start_date is not None:
+        condition = condition & (field >= pa.scalar(pd.Timestamp(start_date).as_unit('ns'), type=pa.timestamp('ns')))
+    if end_date is not None:
+        condition = condition & (field <= pa.scalar(pd.Timestamp(end_date).as_unit('ns'), type=pa.timestamp('ns')))
+    return condition
+
+
+def _dei_value(facts, name):
+    """
+    Get the first reported value of a dei cover-page fact, or None
+    """
+    concept = facts['concept'].astype(str)
+    rows = facts[(concept == name) | concept.str.endswith(':' + name)]
+    for _, row in rows.iterrows():
+        value = row.get('value_text')
+        if value is None or pd.isna(value):
+            value = row.get('value')
+        if value is not None and not pd.isna(value) and str(value).strip():
+            return str(value).strip()
+    return None
+
+
+def _infer_fiscal_year(facts, filing_date):
+    """
+    Pick the partition year for a filing
+
+    Uses the cover page's dei:DocumentFiscalYearFocus, then the year of
+    dei:DocumentPeriodEndDate. Without either, falls back to the latest end
+    date among duration contexts, capped at the filing date so contexts
+    dated after filing (e.g. future maturities) cannot push the filing into
+    a later year.
+    """
+    if facts is None or facts.empty or 'concept' not in facts.columns:
+        return int(filing_date.year)
+
+    focus = _dei_value(facts, 'DocumentFiscalYearFocus')
+    if focus is not None:
+        year = pd.to_numeric(focus, errors='coerce')
+        if pd.notna(year) and 1900 <= year <= filing_date.year + 1:
+            return int(year)
+
+    period_end = _dei_value(facts, 'DocumentPeriodEndDate')
+    if period_end is not None:
+        period_end = pd.to_datetime(period_end, errors='coerce')
+        if pd.notna(period_end):
+            return int(period_end.year)
+
+    if 'end' in facts.columns and 'start' in facts.columns:
+        latest = facts.loc[facts['start'].notna(), 'end'].max()
+        if pd.notna(latest):
+            return int(min(latest, filing_date).year)
+    return int(filing_date.year)
@@ -0,0 +1,365 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; gzip compression works without it
+    zstandard = None
+
+
+# https://www.sec.gov/Archives/edgar/data/{cik}/{accession}/{filename}
+FILING_URL_PATTERN = re.compile(r'/Archives/edgar/data/(\d+)/(\d{10}-?\d{2}-?\d{6})(?:/([^/?#]*))?')
+
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+COMPRESSION_LEVELS = {'gzip': 6, 'zstd': 10}
+CHUNK_SIZE = 1024 * 1024
+
+
+def parse_filing_url(url):
+    """
+    Split an EDGAR archive URL into CIK, accession number and file name
+
+    Args:
+        url (str): URL under /Archives/edgar/data/
+
+    Returns:
+        tuple: (cik, accession, filename); filename is None for folder URLs,
+               and the whole tuple is None if the URL is not a filing URL
+    """
+    match = FILING_URL_PATTERN.search(url)
+    if not match:
+        return None
+    cik, accession, filename = match.groups()
+    return normalize_cik(cik), normalize_accession(accession), filename or None
+
+
+def normalize_cik(cik):
+    """
+    Normalize a CIK to the unpadded form EDGAR uses in archive paths
+    """
+    return str(int(cik))
+
+
+def normalize_accession(accession):
+    """
+    Normalize an accession number to the 18-digit form EDGAR uses in archive paths
+    """
+    return accession.replace('-', '')
+
+
+def _sha256_file(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _atomic_write(path, data):
+    # Write to a temp file in the same directory and rename over the target
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _compressor(compression):
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError("zstd compression requires the zstandard package")
+        return zstandard.ZstdCompressor(level=COMPRESSION_LEVELS['zstd'])
+    return None
+
+
+def _compress_bytes(data, compression):
+    if compression is None:
+        return data
+    if compression == 'gzip':
+        return gzip.compress(data, compresslevel=COMPRESSION_LEVELS['gzip'])
+    return _compressor(compression).compress(data)
+
+
+def _compress_file(src_path, dst_path, compression):
+    """
+    Stream-compress src_path into dst_path (written atomically)
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dst_path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as dst, open(src_path, 'rb') as src:
+            if compression == 'gzip':
+                with gzip.GzipFile(fileobj=dst, mode='wb', compresslevel=COMPRESSION_LEVELS['gzip']) as gz:
+                    shutil.copyfileobj(src, gz, CHUNK_SIZE)
+            else:
+                _compressor(compression).copy_stream(src, dst, read_size=CHUNK_SIZE, write_size=CHUNK_SIZE)
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def open_document(path):
+    """
+    Open a stored document for streaming reads, decompressing transparently
+
+    Documents stored with compression (.gz / .zst suffix) are decompressed
+    as they are read; nothing is written back to disk.
+
+    Args:
+        path (str): Local path of the document, e.g. from FilingStore.documents
+
+    Returns:
+        file: Binary file object (use as a context manager)
+    """
+    if path.endswith(COMPRESSION_SUFFIXES['gzip']):
+        return gzip.open(path, 'rb')
+    if path.endswith(COMPRESSION_SUFFIXES['zstd']):
+        if zstandard is None:
+            raise ImportError("Reading .zst documents requires the zstandard package")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+
+def document_name(path):
+    """
+    Get a stored document's original file name (compression suffix removed)
+    """
+    name = os.path.basename(path)
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+class FilingStore:
+    """
+    Local filing store laid out as root/cik/accession/filename
+
+    Each accession folder has a manifest.json recording the SHA-256, size,
+    source URL and fetch time of every document, so intact documents can be
+    skipped on re-download and filings can be re-parsed without the network.
+
+    With compression='gzip' or 'zstd' new documents are stored compressed
+    (filename.gz / filename.zst); open_document reads them back as a
+    decompressing stream. Hash and size in the manifest describe the bytes
+    on disk, and a store may mix compressed and raw documents.
+    """
+
+    MANIFEST_NAME = 'manifest.json'
+
+    def __init__(self, root='sec_filings', verify_hashes=True, compression=None):
+        """
+        Args:
+            root (str): Root directory of the store (default: sec_filings)
+            verify_hashes (bool): Re-hash documents when checking they are intact (default: True)
+            compression (str): Store new documents as 'gzip' or 'zstd' (default: None, raw)
+        """
+        if compression not in (None, 'gzip', 'zstd'):
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == 'zstd' and zstandard is None:
+            raise ImportError("zstd compression requires the zstandard package")
+        self.root = root
+        self.verify_hashes = verify_hashes
+        self.compression = compression
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # The lock only guards this process's manifests, so worker processes get their own
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def filing_dir(self, cik, accession):
+        """
+        Get the directory holding one filing's documents
+        """
+        return os.path.join(self.root, normalize_cik(cik), normalize_accession(accession))
+
+    def document_path(self, cik, accession, filename, compression=None):
+        """
+        Get the local path of one document as stored with the given compression
+        """
+        path = os.path.join(self.filing_dir(cik, accession), os.path.basename(filename))
+        return path + COMPRESSION_SUFFIXES[compression] if compression else path
+
+    def stored_path(self, cik, accession, filename, manifest=None):
+        """
+        Get the local path a document was actually stored at (per its manifest entry)
+        """
+        manifest = self.manifest(cik, accession) if manifest is None else manifest
+        entry = manifest.get(os.path.basename(filename), {})
+        return self.document_path(cik, accession, filename, entry.get('compression'))
+
+    def manifest(self, cik, accession):
+        """
+        Load a filing's manifest
+
+        Returns:
+            dict: filename -> {sha256, size, url, fetched_at, compression, raw_size}
+        """
+        path = os.path.join(self.filing_dir(cik, accession), self.MANIFEST_NAME)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def has(self, cik, accession, filename, manifest=None):
+        """
+        Check whether a document is present and matches its manifest entry
+
+        Args:
+            cik (str): Company CIK (padded or unpadded)
+            accession (str): Accession number (with or without dashes)
+            filename (str): Document file name
+            manifest (dict): Already loaded manifest of the filing (default: read it)
+
+        Returns:
+            bool: True if the document exists with the recorded size (and hash)
+        """
+        manifest = self.manifest(cik, accession) if manifest is None else manifest
+        entry = manifest.get(os.path.basename(filename))
+        if entry is None:
+            return False
+
+        path = self.document_path(cik, accession, filename, entry.get('compression'))
+        try:
+            if os.path.getsize(path) != entry['size']:
+                return False
+        except OSError:
+            return False
+
+        return not self.verify_hashes or _sha256_file(path) == entry['sha256']
+
+    def write(self, cik, accession, filename, content, url=None):
+        """
+        Atomically write a document and record it in the manifest
+
+        Args:
+            cik (str): Company CIK (padded or unpadded)
+            accession (str): Accession number (with or without dashes)
+            filename (str): Document file name
+            content (bytes): Document body
+            url (str): Source URL recorded in the manifest (default: None)
+
+        Returns:
+            str: Local path of the document
+        """
+        path = self.document_path(cik, accession, filename, self.compression)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        stored = _compress_bytes(content, self.compression)
+        _atomic_write(path, stored)
+
+        return self._record(cik, accession, filename, {
+            'sha256': hashlib.sha256(stored).hexdigest(),
+            'size': len(stored),
+            'url': url,
+            'fetched_at': time.time(),
+            'compression': self.compression,
+            'raw_size': len(content),
+        })
+
+    def partial_path(self, cik, accession, filename):
+        """
+        Get the path a document is streamed to before it is complete
+
+        A partial file left behind by an interrupted download is resumed,
+        not restarted, by the next download of the same document.
+        """
+        return self.document_path(cik, accession, filename) + '.part'
+
+    def partial_validator_path(self, cik, accession, filename):
+        """
+        Get the path holding the validator (ETag or Last-Modified) of a partial download
+
+        A partial file is only resumed while the document still matches it.
+        """
+        return self.partial_path(cik, accession, filename) + '.validator'
+
+    def commit(self, cik, accession, filename, url=None):
+        """
+        Atomically move a completed partial download into place and record it
+
+        With compression enabled the partial file is stream-compressed into
+        place and then removed.
+
+        Args:
+            cik (str): Company CIK (padded or unpadded)
+            accession (str): Accession number (with or without dashes)
+            filename (str): Document file name
+            url (str): Source URL recorded in the manifest (default: None)
+
+        Returns:
+            str: Local path of the document
+        """
+        path = self.document_path(cik, accession, filename, self.compression)
+        partial_path = self.partial_path(cik, accession, filename)
+        raw_size = os.path.getsize(partial_path)
+        if self.compression:
+            _compress_file(partial_path, path, self.compression)
+            os.remove(partial_path)
+        else:
+            os.replace(partial_path, path)
+        validator_path = self.partial_validator_path(cik, accession, filename)
+        if os.path.exists(validator_path):
+            os.remove(validator_path)
+
+        return self._record(cik, accession, filename, {
+            'sha256': _sha256_file(path),
+            'size': os.path.getsize(path),
+            'url': url,
+            'fetched_at': time.time(),
+            'compression': self.compression,
+            'raw_size': raw_size,
+        })
+
+    def _record(self, cik, accession, filename, entry):
+        """
+        Record a stored document in the manifest, removing any copy stored
+        under a different compression
+
+        Returns:
+            str: Local path of the document
+        """
+        with self._lock:
+            manifest = self.manifest(cik, accession)
+            previous = manifest.get(os.path.basename(filename))
+            manifest[os.path.basename(filename)] = entry
+            manifest_path = os.path.join(self.filing_dir(cik, accession), self.MANIFEST_NAME)
+            _atomic_write(manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+        if previous is not None and previous.get('compression') != entry['compression']:
+            stale_path = self.document_path(cik, accession, filename, previous.get('compression'))
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+        return self.document_path(cik, accession, filename, entry['compression'])
+
+    def documents(self, cik, accession):
+        """
+        List the intact documents stored for a filing
+
+        Returns:
+            dict: filename -> local path (open it with open_document)
+        """
+        manifest = self.manifest(cik, accession)
+        return {
+            filename: self.stored_path(cik, accession, filename, manifest)
+            for filename in manifest
+            if self.has(cik, accession, filename, manifest)
+        }
@@ -0,0 +1,185 @@
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+
+PERIOD_PATTERN = re.compile(r'^CY(\d{4})(?:Q([1-4]))?(I?)$')
+
+
+def _period_sort_key(period):
+    """
+    Chronological sort key for frame periods (CY2019 < CY2019Q1 < CY2019Q1I < CY2019Q2 ...)
+    """
+    match = PERIOD_PATTERN.match(period)
+    if not match:
+        return (9999, 9, 9, period)
+    year, quarter, instant = match.groups()
+    return (int(year), int(quarter or 0), 1 if instant else 0, period)
+
+
+class FramesPanel:
+    """
+    Dense company x period arrays built from frames results
+
+    Each tag is stored as a float64 array of shape (len(ciks), len(periods))
+    with NaN for missing observations. The CIK and period axes are shared by
+    every tag, so cross-sectional calculations are plain array operations.
+    """
+
+    def __init__(self, ciks, periods, values):
+        """
+        Args:
+            ciks (numpy.ndarray): Sorted int64 CIK axis
+            periods (numpy.ndarray): Chronologically ordered period axis
+            values (dict): tag -> 2-D float64 array (cik x period)
+        """
+        self.ciks = np.asarray(ciks, dtype=np.int64)
+        self.periods = np.asarray(periods, dtype=str)
+        self.values = values
+        self._period_index = {period: i for i, period in enumerate(self.periods)}
+
+    @property
+    def tags(self):
+        return list(self.values)
+
+    def cik_codes(self, ciks):
+        """
+        Map CIKs to row positions (-1 for CIKs not on the axis)
+
+        Args:
+            ciks (array-like): CIKs (ints or zero-padded strings)
+
+        Returns:
+            numpy.ndarray: Integer row codes
+        """
+        ciks = np.asarray([int(cik) for cik in np.atleast_1d(ciks)], dtype=np.int64)
+        if len(self.ciks) == 0:
+            return np.full(len(ciks), -1, dtype=np.int64)
+        codes = np.searchsorted(self.ciks, ciks)
+        codes = np.minimum(codes, len(self.ciks) - 1)
+        return np.where(self.ciks[codes] == ciks, codes, -1)
+
+    def period_code(self, period):
+        """
+        Map a period to its column position
+
+        Returns:
+            int: Column position, or -1 if the period is not on the axis
+        """
+        return self._period_index.get(period, -1)
+
+    def get(self, tag):
+        """
+        Get the (cik x period) array for a tag
+        """
+        return self.values[tag]
+
+    def cross_section(self, tag, period):
+        """
+        Get one period's values for every company
+
+        Returns:
+            numpy.ndarray: float64 vector aligned with self.ciks
+        """
+        return self.values[tag][:, self._period_index[period]]
+
+    def to_frame(self, tag):
+        """
+        Get a tag's array as a DataFrame indexed by CIK with one column per period
+        """
+        return pd.DataFrame(self.values[tag], index=pd.Index(self.ciks, name='cik'),
+                            columns=pd.Index(self.periods, name='period'))
+
+    def save(self, path):
+        """
+        Write the panel to an .npz snapshot (written atomically)
+
+        Args:
+            path (str): Snapshot path
+        """
+        arrays = {'ciks': self.ciks, 'periods': self.periods,
+                  'tags': np.asarray(self.tags, dtype=str)}
+        for i, tag in enumerate(self.tags):
+            arrays[f'values_{i}'] = self.values[tag]
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = os.path.join(directory, '.' + os.path.basename(path) + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a panel from an .npz snapshot
+
+        Returns:
+            FramesPanel: The stored panel
+        """
+        with np.load(path, allow_pickle=False) as snapshot:
+            tags = [str(tag) for tag in snapshot['tags']]
+            values = {tag: snapshot[f'values_{i}'] for i, tag in enumerate(tags)}
+            return cls(snapshot['ciks'], snapshot['periods'], values)
+
+
+def build_frames_panel(frames, unit=None):
+    """
+    Build a dense company x period panel from a long frames DataFrame
+
+    Args:
+        frames (pandas.DataFrame): Output of fetch_frames_grid
+        unit (str): Only use rows in this unit (default: all units; each tag
+                    must then be reported in a single unit)
+
+    Returns:
+        FramesPanel: One (cik x period) array per tag
+    """
+    if unit is not None:
+        frames = frames[frames['unit'] == unit]
+    frames = frames.dropna(subset=['cik'])
+
+    # Integer-coded axes shared by every tag
+    ciks = np.unique(frames['cik'].to_numpy(dtype=np.int64))
+    periods = np.asarray(sorted(frames['period'].astype(str).unique(), key=_period_sort_key), dtype=str)
+    cik_codes = np.searchsorted(ciks, frames['cik'].to_numpy(dtype=np.int64))
+    period_codes = pd.Categorical(frames['period'].astype(str), categories=periods).codes
+
+    tags = frames['tag'].astype(str).to_numpy()
+    values = frames['value'].to_numpy(dtype=np.float64)
+    units = frames['unit'].astype(str).to_numpy()
+
+    layers = {}
+    for tag in pd.unique(tags):
+        mask = tags == tag
+        if len(np.unique(units[mask])) > 1:
+            raise ValueError(f"Tag {tag} is reported in several units; pass unit= to pick one")
+
+        layer = np.full((len(ciks), len(periods)), np.nan)
+        layer[cik_codes[mask], period_codes[mask]] = values[mask]
+        layers[tag] = layer
+
+    return FramesPanel(ciks, periods, layers)
+
+
+def load_or_build_panel(path, build, max_age=None):
+    """
+    Load a cached panel snapshot, rebuilding it when missing or stale
+
+    Args:
+        path (str): Snapshot path
+        build (callable): Zero-argument function returning a FramesPanel
+        max_age (float): Rebuild snapshots older than this many seconds (default: never)
+
+    Returns:
+        FramesPanel: The cached or freshly built panel
+    """
+    if os.path.exists(path) and (max_age is None or time.time() - os.path.getmtime(path) < max_age):
+        return FramesPanel.load(path)
+
+    panel = build()
+    panel.save(path)
+    return panel
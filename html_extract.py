@@ -0,0 +1,290 @@
+import re
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+except ImportError:  # lxml is optional; the BeautifulSoup engine still works without it
+    etree = None
+
+
+TEXT_COLUMNS = ['text', 'type', 'id']
+SECTION_COLUMNS = ['item', 'title', 'text']
+
+# Elements that end a line of text; everything else is inline and joins its neighbours
+BLOCK_TAGS = {
+    'address', 'article', 'blockquote', 'body', 'center', 'dd', 'div', 'dl', 'dt', 'form',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'html', 'li', 'ol', 'p', 'pre', 'section',
+    'table', 'tbody', 'thead', 'tfoot', 'tr', 'ul',
+}
+# Elements whose content is separated from its neighbours by a space
+BREAK_TAGS = BLOCK_TAGS | {'br', 'td', 'th'}
+SKIP_TAGS = {'script', 'style', 'head', 'title'}
+
+CAPTURE_CLASSES = {'textBlock': 'text_block', 'footnote': 'footnote'}
+ITEM_HEADING = re.compile(r'^item\s+(\d{1,2}[a-c]?)\s*[.:\-–—]?\s*(.*)$', re.IGNORECASE)
+MAX_HEADING_LENGTH = 200
+WHITESPACE = re.compile(r'\s+')
+
+
+def _normalize(text):
+    """
+    Collapse runs of whitespace (including non-breaking spaces) to single spaces
+    """
+    return WHITESPACE.sub(' ', text.replace('\xa0', ' ')).strip()
+
+
+def _local_tag(elem):
+    """
+    Get an element's tag without its namespace (XHTML parsed as XML), or '' for comments
+    """
+    tag = elem.tag
+    return tag.rpartition('}')[2] if isinstance(tag, str) else ''
+
+
+def _walk_children(children, parts):
+    for child in children:
+        tag = _local_tag(child)
+        if tag not in SKIP_TAGS:
+            if tag in BREAK_TAGS:
+                parts.append(' ')
+            _walk(child, parts)
+            if tag in BREAK_TAGS:
+                parts.append(' ')
+        if child.tail:
+            parts.append(child.tail)
+
+
+def _walk(node, parts):
+    if node.text:
+        parts.append(node.text)
+    _walk_children(node, parts)
+
+
+def _element_text(elem):
+    """
+    Get an element's normalized text, with block and cell boundaries kept as spaces
+    """
+    parts = []
+    _walk(elem, parts)
+    return _normalize(''.join(parts))
+
+
+def _flush_leading_text(elem):
+    """
+    Take the text that precedes a block element and has not been emitted yet
+
+    For every ancestor, outermost first, that is its own text plus the
+    inline siblings (and tails) before the path to elem. They are removed
+    from the tree once read, so each character is emitted once and in
+    document order.
+
+    Returns:
+        list: Normalized non-empty texts, in document order
+    """
+    path = []
+    node = elem
+    while node.getparent() is not None:
+        path.append(node)
+        node = node.getparent()
+
+    texts = []
+    for child in reversed(path):
+        parent = child.getparent()
+        preceding = list(child.itersiblings(preceding=True))[::-1]
+        parts = [parent.text or '']
+        _walk_children(preceding, parts)
+        parent.text = None
+        for sibling in preceding:
+            parent.remove(sibling)
+        text = _normalize(''.join(parts))
+        if text:
+            texts.append(text)
+    return texts
+
+
+def _capture_type(elem):
+    """
+    Get the record type of a text block / footnote div, or None for other elements
+    """
+    if _local_tag(elem) != 'div':
+        return None
+    for css_class in (elem.get('class') or '').split():
+        if css_class in CAPTURE_CLASSES:
+            return CAPTURE_CLASSES[css_class]
+    return None
+
+
+class _SectionBuilder:
+    """
+    Splits a document's running text into 10-K/10-Q Item sections
+    """
+
+    def __init__(self):
+        self.sections = []
+        self.current = None
+
+    def add(self, text):
+        if not text:
+            return
+        match = ITEM_HEADING.match(text) if len(text) <= MAX_HEADING_LENGTH else None
+        if match:
+            self.current = {'item': match.group(1).upper(), 'title': match.group(2), 'parts': []}
+            self.sections.append(self.current)
+        elif self.current is not None:
+            self.current['parts'].append(text)
+
+    def frame(self):
+        """
+        One row per Item; table-of-contents entries repeat a heading, so the
+        occurrence with the most text wins
+        """
+        best = {}
+        for section in self.sections:
+            text = ' '.join(section['parts'])
+            if section['item'] not in best or len(text) > len(best[section['item']]['text']):
+                best[section['item']] = {'item': section['item'], 'title': section['title'], 'text': text}
+        return pd.DataFrame(list(best.values()), columns=SECTION_COLUMNS)
+
+
+def _result(records, builder=None):
+    result = {
+        'text_blocks': pd.DataFrame([r for r in records if r['type'] == 'text_block'], columns=TEXT_COLUMNS),
+        'footnotes': pd.DataFrame([r for r in records if r['type'] == 'footnote'], columns=TEXT_COLUMNS),
+    }
+    if builder is not None:
+        result['sections'] = builder.frame()
+    return result
+
+
+class HtmlTextExtractor:
+    """
+    Turns the element events of an HTML document into text records and Item sections
+
+    Feed it each element's start and end in document order, from lxml
+    iterparse or iterwalk. This is how the 'lxml' engine reads a document,
+    and how parse_ixbrl pulls the text out of an inline XBRL document in the
+    same pass as its facts. Only text block / footnote divs are kept whole
+    until they close. Every other block element is turned into text and
+    released as soon as it ends, so memory stays flat and each character is
+    normalized once.
+
+    Args:
+        sections (bool): Also split the running text into Item sections (default: True)
+    """
+
+    def __init__(self, sections=True):
+        self.records = []
+        self.builder = _SectionBuilder() if sections else None
+        self.capture_depth = 0
+
+    def start(self, elem):
+        if _capture_type(elem):
+            self.capture_depth += 1
+
+    def end(self, elem):
+        record_type = _capture_type(elem)
+        if record_type:
+            self.capture_depth -= 1
+            text = _element_text(elem)
+            self.records.append({'text': text, 'type': record_type, 'id': elem.get('id', '')})
+        elif self.capture_depth or _local_tag(elem) not in BLOCK_TAGS:
+            # Inside a capture, or inline: the enclosing element still needs it
+            return
+        else:
+            text = _element_text(elem)
+
+        if self.capture_depth == 0:
+            # Inline text before the block comes first; already emitted
+            # blocks were cleared, so only their tails are left to read
+            leading = _flush_leading_text(elem)
+            if self.builder is not None:
+                for leading_text in leading:
+                    self.builder.add(leading_text)
+                self.builder.add(text)
+            elem.clear(keep_tail=True)
+
+    def result(self):
+        """
+        Returns:
+            dict: 'text_blocks' and 'footnotes' DataFrames, plus 'sections' when requested
+        """
+        return _result(self.records, self.builder)
+
+
+def _extract_lxml(source, sections=True):
+    """
+    Stream an HTML document through libxml2's HTML parser
+
+    Args:
+        source (str or file): Path or binary file object of the HTML document
+        sections (bool): Also split the running text into Item sections
+
+    Returns:
+        HtmlTextExtractor: The extractor holding the document's records
+    """
+    extractor = HtmlTextExtractor(sections)
+    for event, elem in etree.iterparse(source, events=('start', 'end'), html=True, huge_tree=True):
+        if not isinstance(elem.tag, str):
+            continue
+        if event == 'start':
+            extractor.start(elem)
+        else:
+            extractor.end(elem)
+    return extractor
+
+
+def _extract_bs4(source):
+    """
+    Find text blocks and footnotes in a full BeautifulSoup tree (the original engine)
+    """
+    if isinstance(source, str):
+        with open(source, 'r', encoding='utf-8') as file:
+            soup = BeautifulSoup(file, 'html.parser')
+    else:
+        soup = BeautifulSoup(source, 'html.parser')
+
+    records = []
+
+    # Find all div elements that might contain text blocks or footnotes
+    for div in soup.find_all('div', class_=['textBlock', 'footnote']):
+        records.append({
+            'text': div.get_text(strip=True),
+            'type': 'text_block' if 'textBlock' in div.get('class', []) else 'footnote',
+            'id': div.get('id', ''),
+        })
+    return records
+
+
+def extract_html_text(source, engine='auto', sections=True):
+    """
+    Extract text blocks, footnotes and Item sections from a filing's HTML document
+
+    The 'lxml' engine streams the document through a C parser and only
+    materializes the subtrees it needs. The 'bs4' engine builds the full
+    html.parser tree, as parse_sec_filing originally did; it does not split
+    Item sections and keeps get_text(strip=True) text, which drops the
+    spaces between adjacent strings.
+
+    Args:
+        source (str or file): Path or binary file object of the HTML document
+        engine (str): 'lxml', 'bs4' or 'auto' (default: 'auto', lxml when installed)
+        sections (bool): Split the document into Item sections (default: True)
+
+    Returns:
+        dict: 'text_blocks' and 'footnotes' DataFrames (text, type, id), plus
+              'sections' (item, title, text) with the lxml engine
+    """
+    if engine == 'auto':
+        engine = 'lxml' if etree is not None else 'bs4'
+
+    if engine == 'lxml':
+        if etree is None:
+            raise ImportError("The 'lxml' engine requires the lxml package")
+        return _extract_lxml(source, sections).result()
+    elif engine == 'bs4':
+        return _result(_extract_bs4(source))
+    else:
+        raise ValueError(f"Unknown HTML engine: {engine}")
+
@@ -0,0 +1,222 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+# Seconds a cached response is served without contacting the SEC at all.
+# After that the response is revalidated with a conditional GET, which
+# costs a request but only a few hundred bytes when nothing has changed.
+DEFAULT_TTLS = {
+    'https://www.sec.gov/files/': 24 * 3600,
+    'https://data.sec.gov/submissions/': 10 * 60,
+    'https://data.sec.gov/api/xbrl/': 60 * 60,
+}
+
+
+class HttpCache:
+    """
+    Persistent on-disk HTTP response cache keyed by URL
+
+    Bodies are stored as files named by the SHA-256 of the URL; validators
+    (ETag / Last-Modified), timestamps and sizes live in a small SQLite index.
+    Total size is bounded and the least recently used entries are evicted first.
+    """
+
+    def __init__(self, cache_dir='.edgar_cache', max_bytes=512 * 1024 * 1024, ttls=None, default_ttl=0):
+        """
+        Args:
+            cache_dir (str): Directory holding cached bodies and the index (default: .edgar_cache)
+            max_bytes (int): Maximum total size of cached bodies (default: 512 MB)
+            ttls (dict): URL prefix -> freshness lifetime in seconds (default: DEFAULT_TTLS)
+            default_ttl (float): Lifetime for URLs matching no prefix (default: 0, always revalidate)
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite3'), check_same_thread=False)
+        self._db.execute(
+            '''CREATE TABLE IF NOT EXISTS entries (
+                   url TEXT PRIMARY KEY,
+                   etag TEXT,
+                   last_modified TEXT,
+                   stored_at REAL NOT NULL,
+                   accessed_at REAL NOT NULL,
+                   size INTEGER NOT NULL
+               )'''
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)')
+        self._db.commit()
+
+    def _body_path(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def ttl_for(self, url):
+        """
+        Get the freshness lifetime for a URL (longest matching prefix wins)
+
+        Args:
+            url (str): Request URL
+
+        Returns:
+            float: Lifetime in seconds
+        """
+        matches = [prefix for prefix in self.ttls if url.startswith(prefix)]
+        if not matches:
+            return self.default_ttl
+        return self.ttls[max(matches, key=len)]
+
+    def lookup(self, url):
+        """
+        Get the cached entry for a URL
+
+        Args:
+            url (str): Request URL
+
+        Returns:
+            dict: Entry with etag, last_modified, stored_at and size, or None if not cached
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT etag, last_modified, stored_at, size FROM entries WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None or not os.path.exists(self._body_path(url)):
+            return None
+        return {'url': url, 'etag': row[0], 'last_modified': row[1], 'stored_at': row[2], 'size': row[3]}
+
+    def is_fresh(self, entry):
+        """
+        Check whether an entry may be served without contacting the server
+
+        Args:
+            entry (dict): Entry returned by lookup()
+
+        Returns:
+            bool: True if the entry is within its TTL
+        """
+        return time.time() - entry['stored_at'] < self.ttl_for(entry['url'])
+
+    def conditional_headers(self, entry):
+        """
+        Build If-None-Match / If-Modified-Since headers for revalidating an entry
+
+        Args:
+            entry (dict): Entry returned by lookup(), or None
+
+        Returns:
+            dict: Request headers (empty if there is nothing to revalidate)
+        """
+        headers = {}
+        if entry is None:
+            return headers
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def read(self, url):
+        """
+        Read a cached body and mark the entry as recently used
+
+        Args:
+            url (str): Request URL
+
+        Returns:
+            bytes: Cached response body
+        """
+        with open(self._body_path(url), 'rb') as f:
+            body = f.read()
+        with self._lock:
+            self._db.execute('UPDATE entries SET accessed_at = ? WHERE url = ?', (time.time(), url))
+            self._db.commit()
+        return body
+
+    def revalidated(self, url):
+        """
+        Record that the server answered 304 Not Modified for a cached URL
+
+        Args:
+            url (str): Request URL
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'UPDATE entries SET stored_at = ?, accessed_at = ? WHERE url = ?', (now, now, url)
+            )
+            self._db.commit()
+
+    def store(self, url, body, headers):
+        """
+        Store a response body with its validators, then evict down to max_bytes
+
+        Args:
+            url (str): Request URL
+            body (bytes): Response body
+            headers (Mapping): Response headers
+        """
+        path = self._body_path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temp file and rename so readers never see a partial body
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries (url, etag, last_modified, stored_at, accessed_at, size) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, headers.get('ETag'), headers.get('Last-Modified'), now, now, len(body))
+            )
+            self._db.commit()
+        self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_bytes
+        """
+        with self._lock:
+            total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            if total <= self.max_bytes:
+                return
+
+            rows = self._db.execute('SELECT url, size FROM entries ORDER BY accessed_at').fetchall()
+            for url, size in rows:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(self._body_path(url))
+                except FileNotFoundError:
+                    pass
+                self._db.execute('DELETE FROM entries WHERE url = ?', (url,))
+                total -= size
+            self._db.commit()
+
+    def clear(self):
+        """
+        Remove every cached entry
+        """
+        with self._lock:
+            urls = [row[0] for row in self._db.execute('SELECT url FROM entries')]
+            for url in urls:
+                try:
+                    os.remove(self._body_path(url))
+                except FileNotFoundError:
+                    pass
+            self._db.execute('DELETE FROM entries')
+            self._db.commit()
@@ -1,36 +1,31 @@
 import pandas as pd
-from bs4 import BeautifulSoup
-import requests
 from datetime import datetime, timedelta
-import time 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
+from edgar_client import get_default_client, run_coroutine
+from edgar_metrics import get_default_metrics
+from ticker_resolver import TickerResolver
 
-def get_ticker_to_cik_mapping():
+
+def get_ticker_to_cik_mapping(client=None):
     """
     Get mapping of stock tickers to SEC CIK numbers
     
+    Services that resolve tickers repeatedly should keep a TickerResolver
+    (see ticker_resolver.load_or_fetch_resolver) instead of rebuilding this dict.
+    
+    Args:
+        client (EdgarClient): EDGAR client to use (default: shared client)
+        
     Returns:
         dict: Mapping of tickers to CIK numbers
     """
     try:
-        # SEC company tickers file URL
-        url = "https://www.sec.gov/files/company_tickers.json"
-        
-        # Get the data
-        response = requests.get(url)
-        data = response.json()
-        
-        # Create mapping dictionary
-        ticker_to_cik = {}
-        for entry in data.values():
-            # Add leading zeros to CIK to make it 10 digits
-            cik_str = str(entry['cik_str']).zfill(10)
-            ticker_to_cik[entry['ticker']] = cik_str
-            
-        return ticker_to_cik
+        return TickerResolver.fetch(client).to_dict()
         
     except Exception as e:
-        print(f"Error fetching ticker to CIK mapping: {str(e)}")
+        get_default_metrics().error('ticker_mapping_failed', f"Error fetching ticker to CIK mapping: {str(e)}", e)
         return {}
 
 def get_sp500_tickers():
@@ -48,71 +43,168 @@ def get_sp500_tickers():
         )
         return sp500.index.tolist()
     except Exception as e:
-        print(f"Error fetching S&P 500 tickers: {str(e)}")
+        get_default_metrics().error('sp500_tickers_failed', f"Error fetching S&P 500 tickers: {str(e)}", e)
         return []
 
-
-
-def get_ticker_to_cik_mapping():
+def _filter_filings_frame(filings, filing_types, start_date, end_date):
     """
-    Get mapping of stock tickers to CIK numbers from SEC
+    Load columnar submissions data into a DataFrame and keep matching filings
+    
+    The submissions API already returns `filings.recent` as parallel arrays,
+    so the form-type and date-range filters are applied as vectorized masks
+    instead of looking each accession number up again.
     
+    Args:
+        filings (dict): Columnar filings block (e.g. data['filings']['recent'])
+        filing_types (list): List of filing types to keep
+        start_date (str): Start date in YYYY-MM-DD format
+        end_date (str): End date in YYYY-MM-DD format
+        
     Returns:
-        dict: Dictionary mapping tickers to CIK numbers
+        pandas.DataFrame: accession_number, filing_type, filing_date and primary_document of matching filings
     """
-    import requests
+    frame = pd.DataFrame({
+        'accession_number': filings.get('accessionNumber', []),
+        'filing_type': filings.get('form', []),
+        'filing_date': filings.get('filingDate', []),
+        'primary_document': filings.get('primaryDocument') or [''] * len(filings.get('accessionNumber', [])),
+    }, dtype=str)
     
-    headers = {
-        'User-Agent': 'Your Name (your.email@domain.com)'
-    }
+    # ISO dates compare correctly as strings
+    mask = (frame['filing_type'].isin(list(filing_types)) &
+            (frame['filing_date'] >= start_date) &
+            (frame['filing_date'] <= end_date))
+    return frame[mask]
+
+def extract_filings(data, ticker, cik, filing_types, start_date, end_date, overflow_pages=()):
+    """
+    Pull matching filings out of a submissions API response
     
-    try:
-        # Get the company tickers mapping file from SEC
-        response = requests.get(
-            'https://www.sec.gov/files/company_tickers.json',
-            headers=headers
-        )
-        response.raise_for_status()
+    Args:
+        data (dict): Decoded data.sec.gov/submissions JSON for one company
+        ticker (str): Ticker the company was looked up by
+        cik (str): 10-digit zero-padded CIK
+        filing_types (list): List of filing types to keep
+        start_date (str): Start date in YYYY-MM-DD format
+        end_date (str): End date in YYYY-MM-DD format
+        overflow_pages (list): Decoded `filings.files` pages to merge in (default: none)
         
-        # Convert to dictionary with ticker as key and CIK as value
-        ticker_cik_mapping = {}
-        for item in response.json().values():
-            ticker_cik_mapping[item['ticker']] = str(item['cik_str']).zfill(10)
-            
-        return ticker_cik_mapping
-    except Exception as e:
-        print(f"Error fetching CIK mapping: {str(e)}")
-        return {}
+    Returns:
+        list: List of dictionaries containing filing information and links
+    """
+    with get_default_metrics().timed('filter'):
+        recent = data.get('filings', {}).get('recent', {})
+        matches = _filter_filings_frame(recent, filing_types, start_date, end_date)
+        
+        # Merge older filings from overflow pages into one history for the CIK
+        if overflow_pages:
+            frames = [matches] + [
+                _filter_filings_frame(page, filing_types, start_date, end_date)
+                for page in overflow_pages
+            ]
+            matches = (pd.concat(frames, ignore_index=True)
+                       .drop_duplicates('accession_number')
+                       .sort_values('filing_date', ascending=False, kind='stable'))
+        
+        return _build_filing_links(matches, ticker, cik, data.get('name', ''))
 
-def get_sp500_sec_filings(filing_types=['10-K', '10-Q'], start_date=None, end_date=None):
+def _overflow_page_urls(data, start_date, end_date):
     """
-    Get SEC filing links for S&P 500 companies
+    List the `filings.files` overflow pages whose date span overlaps the window
+    
+    Companies with more than ~1,000 filings have their older history split
+    into CIK##########-submissions-###.json pages. Pages lying entirely
+    outside start_date/end_date are skipped without being downloaded.
     
     Args:
-        filing_types (list): List of filing types to fetch (default: ['10-K', '10-Q'])
-        start_date (str): Start date in YYYY-MM-DD format (default: None)
-        end_date (str): End date in YYYY-MM-DD format (default: None)
+        data (dict): Decoded data.sec.gov/submissions JSON for one company
+        start_date (str): Start date in YYYY-MM-DD format
+        end_date (str): End date in YYYY-MM-DD format
         
     Returns:
-        list: List of dictionaries containing filing information and links
+        list: URLs of overflow pages to fetch
     """
-    import requests
-    import pandas as pd
-    from datetime import datetime, timedelta
-    import time
+    urls = []
+    for page in data.get('filings', {}).get('files', []):
+        filing_from = page.get('filingFrom') or start_date
+        filing_to = page.get('filingTo') or end_date
+        if filing_to < start_date or filing_from > end_date:
+            continue
+        urls.append(f"https://data.sec.gov/submissions/{page['name']}")
+    return urls
 
-    # Get S&P 500 tickers
-    try:
-        sp500 = pd.read_html('https://en.wikipedia.org/wiki/List_of_S%26P_500_companies')[0]
-        tickers = sp500['Symbol'].tolist()
-    except Exception as e:
-        print(f"Error fetching S&P 500 tickers: {str(e)}")
+def _fetch_overflow_pages(data, start_date, end_date, client, max_workers=4):
+    """
+    Fetch a company's relevant overflow pages concurrently
+    
+    Returns:
+        list: Decoded overflow pages (pages that fail to download are skipped)
+    """
+    urls = _overflow_page_urls(data, start_date, end_date)
+    if not urls:
+        return []
+
+    def fetch_page(url):
+        try:
+            return client.get_json(url)
+        except Exception as e:
+            get_default_metrics().error('submissions_page_failed',
+                                        f"Error fetching submissions page {url}: {str(e)}", e, url=url)
+            return None
+
+    # Threads share the client's token bucket, so this stays under the rate limit
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pages = list(executor.map(fetch_page, urls))
+    return [page for page in pages if page is not None]
+
+def _build_filing_links(matches, ticker, cik, company_name):
+    """
+    Build the filing link dictionaries for a frame of matching filings in bulk
+    
+    Returns:
+        list: List of dictionaries containing filing information and links
+    """
+    if matches.empty:
         return []
+    
+    # Construct document URLs for all rows at once
+    doc_urls = (f"https://www.sec.gov/Archives/edgar/data/{cik}/" +
+                matches['accession_number'].str.replace('-', '', regex=False))
+    
+    links = pd.DataFrame({
+        'ticker': ticker,
+        'cik': cik,
+        'company_name': company_name,
+        'filing_type': matches['filing_type'],
+        'filing_date': matches['filing_date'],
+        'accession_number': matches['accession_number'],
+        'primary_document': matches['primary_document'],
+        'filing_url': doc_urls,
+        'interactive_url': doc_urls + "/index.json",
+        'documents_url': doc_urls + "/FilingSummary.xml",
+    })
+    return links.to_dict('records')
+
+def _prepare_sp500_crawl(start_date, end_date, client, tickers=None):
+    """
+    Resolve the S&P 500 ticker list, CIK mapping and default date window
+    
+    Returns:
+        tuple: (tickers, ticker_cik_mapping, start_date, end_date), or None on failure
+    """
+    # Get S&P 500 tickers unless the caller supplied its own list
+    if tickers is None:
+        try:
+            sp500 = pd.read_html('https://en.wikipedia.org/wiki/List_of_S%26P_500_companies')[0]
+            tickers = sp500['Symbol'].tolist()
+        except Exception as e:
+            get_default_metrics().error('sp500_tickers_failed', f"Error fetching S&P 500 tickers: {str(e)}", e)
+            return None
 
     # Get ticker to CIK mapping
-    ticker_cik_mapping = get_ticker_to_cik_mapping()
+    ticker_cik_mapping = get_ticker_to_cik_mapping(client)
     if not ticker_cik_mapping:
-        return []
+        return None
 
     # Set default dates if not provided
     if not end_date:
@@ -120,130 +212,179 @@ def get_sp500_sec_filings(filing_types=['10-K', '10-Q'], start_date=None, end_da
     if not start_date:
         start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
 
+    return tickers, ticker_cik_mapping, start_date, end_date
+
+def _finish_crawl(filing_links, filing_types, watermarks, advance_watermarks, as_dataframe):
+    """
+    Persist watermarks for an incremental crawl and shape the result
+    """
+    if watermarks is not None and advance_watermarks:
+        watermarks.advance(filing_links, filing_types)
+        watermarks.save()
+    return pd.DataFrame(filing_links) if as_dataframe else filing_links
+
+def get_sp500_sec_filings(filing_types=['10-K', '10-Q'], start_date=None, end_date=None, client=None,
+                          concurrent=False, max_concurrency=10, as_dataframe=False, full_history=False,
+                          watermarks=None, advance_watermarks=True, tickers=None):
+    """
+    Get SEC filing links for S&P 500 companies
+    
+    Args:
+        filing_types (list): List of filing types to fetch (default: ['10-K', '10-Q'])
+        start_date (str): Start date in YYYY-MM-DD format (default: None)
+        end_date (str): End date in YYYY-MM-DD format (default: None)
+        client (EdgarClient): EDGAR client to use (default: shared client)
+        concurrent (bool): Crawl with asyncio, keeping several requests in flight (default: False;
+                           also works inside Jupyter, where async code can instead
+                           await get_sp500_sec_filings_async directly)
+        max_concurrency (int): Maximum in-flight requests when concurrent (default: 10)
+        as_dataframe (bool): Return a DataFrame instead of a list (default: False)
+        full_history (bool): Also read older filings from `filings.files` pages (default: False)
+        watermarks (WatermarkStore): Only return filings newer than each CIK's watermark for
+                                     these filing_types
+                                     (default: None, return the whole window)
+        advance_watermarks (bool): Advance and save the watermarks past the returned
+                                   filings (default: True)
+        tickers (list): Crawl these tickers instead of the S&P 500 list from Wikipedia
+                        (default: None)
+        
+    Returns:
+        list: List of dictionaries containing filing information and links
+    """
+    if concurrent:
+        return run_coroutine(get_sp500_sec_filings_async(
+            filing_types, start_date, end_date, client=client,
+            max_concurrency=max_concurrency, as_dataframe=as_dataframe,
+            full_history=full_history, watermarks=watermarks,
+            advance_watermarks=advance_watermarks, tickers=tickers
+        ))
+
+    client = client or get_default_client()
+
+    prepared = _prepare_sp500_crawl(start_date, end_date, client, tickers)
+    if prepared is None:
+        return pd.DataFrame() if as_dataframe else []
+    tickers, ticker_cik_mapping, start_date, end_date = prepared
+
     # Initialize results list
     filing_links = []
 
-    # SEC EDGAR API headers
-    headers = {
-        'User-Agent': 'Your Name (your.email@domain.com)'
-    }
-
     # Process each ticker
     for ticker in tickers:
         try:
             # Skip if ticker not found in mapping
             if ticker not in ticker_cik_mapping:
-                print(f"No CIK found for ticker: {ticker}")
+                get_default_metrics().event('cik_not_found', level='warning',
+                                            message=f"No CIK found for ticker: {ticker}", ticker=ticker)
                 continue
 
-            # Respect SEC EDGAR's rate limiting (10 requests per second)
-            time.sleep(0.1)
-            
             # Get CIK and construct API URL
             cik = ticker_cik_mapping[ticker]
             base_url = f"https://data.sec.gov/submissions/CIK{cik}.json"
             
-            # Make API request
-            response = requests.get(base_url, headers=headers)
+            # Make API request (the client enforces SEC's 10 requests per second
+            # and serves unchanged submissions from its cache when configured)
+            data = client.get_json(base_url)
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Get recent filings
-                for filing in data.get('filings', {}).get('recent', {}).get('accessionNumber', []):
-                    filing_index = data['filings']['recent']['accessionNumber'].index(filing)
-                    
-                    # Get filing type and date
-                    filing_type = data['filings']['recent']['form'][filing_index]
-                    filing_date = data['filings']['recent']['filingDate'][filing_index]
-                    
-                    # Check if filing type matches and is within date range
-                    if (filing_type in filing_types and 
-                        start_date <= filing_date <= end_date):
-                        
-                        # Construct document URL
-                        accession_number = filing.replace('-', '')
-                        doc_url = f"https://www.sec.gov/Archives/edgar/data/{cik}/{accession_number}"
-                        
-                        filing_links.append({
-                            'ticker': ticker,
-                            'cik': cik,
-                            'company_name': data.get('name', ''),
-                            'filing_type': filing_type,
-                            'filing_date': filing_date,
-                            'accession_number': filing,
-                            'filing_url': doc_url,
-                            'interactive_url': f"{doc_url}/index.json",
-                            'documents_url': f"{doc_url}/FilingSummary.xml"
-                        })
+            # In incremental mode skip everything before the CIK's watermark
+            company_start = watermarks.start_date(cik, start_date, filing_types) if watermarks else start_date
+            
+            overflow_pages = []
+            if full_history:
+                overflow_pages = _fetch_overflow_pages(data, company_start, end_date, client)
+            
+            links = extract_filings(
+                data, ticker, cik, filing_types, company_start, end_date, overflow_pages
+            )
+            filing_links.extend(watermarks.filter_new(links, filing_types) if watermarks else links)
                         
         except Exception as e:
-            print(f"Error processing {ticker}: {str(e)}")
+            get_default_metrics().error('ticker_failed', f"Error processing {ticker}: {str(e)}", e, ticker=ticker)
             continue
 
-    return filing_links
-
-
-
+    return _finish_crawl(filing_links, filing_types, watermarks, advance_watermarks, as_dataframe)
 
-
-def parse_xbrl_to_dataframe(xbrl_file_path):
+async def get_sp500_sec_filings_async(filing_types=['10-K', '10-Q'], start_date=None, end_date=None,
+                                      client=None, max_concurrency=10, as_dataframe=False,
+                                      full_history=False, watermarks=None, advance_watermarks=True,
+                                      tickers=None):
     """
-    Parse XBRL file and convert it to a pandas DataFrame
+    Get SEC filing links for S&P 500 companies with many requests in flight
+    
+    Requests still draw from the client's shared token bucket, so the crawl
+    uses the full request budget without exceeding it. Results are returned
+    in ticker order, identical to the sequential crawl.
     
     Args:
-        xbrl_file_path (str): Path to the XBRL file
+        filing_types (list): List of filing types to fetch (default: ['10-K', '10-Q'])
+        start_date (str): Start date in YYYY-MM-DD format (default: None)
+        end_date (str): End date in YYYY-MM-DD format (default: None)
+        client (EdgarClient): EDGAR client to use (default: shared client)
+        max_concurrency (int): Maximum in-flight requests (default: 10)
+        as_dataframe (bool): Return a DataFrame instead of a list (default: False)
+        full_history (bool): Also read older filings from `filings.files` pages (default: False)
+        watermarks (WatermarkStore): Only return filings newer than each CIK's watermark for
+                                     these filing_types
+                                     (default: None, return the whole window)
+        advance_watermarks (bool): Advance and save the watermarks past the returned
+                                   filings (default: True)
+        tickers (list): Crawl these tickers instead of the S&P 500 list from Wikipedia
+                        (default: None)
         
     Returns:
-        pandas.DataFrame: DataFrame containing the XBRL data
+        list: List of dictionaries containing filing information and links
     """
-    try:
-        # Import required libraries
-        import pandas as pd
-        from bs4 import BeautifulSoup
-        
-        # Read and parse XBRL file
-        with open(xbrl_file_path, 'r', encoding='utf-8') as file:
-            soup = BeautifulSoup(file, 'xml')
-        
-        # Initialize lists to store data
-        contexts = {}
-        data = []
-        
-        # Extract contexts
-        context_elements = soup.find_all('context')
-        for context in context_elements:
-            context_id = context.get('id')
-            period = context.find('period')
-            if period:
-                instant = period.find('instant')
-                if instant:
-                    contexts[context_id] = instant.text
-                else:
-                    start_date = period.find('startDate')
-                    end_date = period.find('endDate')
-                    if start_date and end_date:
-                        contexts[context_id] = f"{start_date.text} to {end_date.text}"
-        
-        # Extract facts
-        for tag in soup.find_all():
-            if tag.name != 'context' and tag.get('contextRef'):
-                fact = {
-                    'concept': tag.name,
-                    'value': tag.text.strip(),
-                    'context_ref': tag.get('contextRef'),
-                    'period': contexts.get(tag.get('contextRef'), ''),
-                    'unit': tag.get('unitRef', ''),
-                    'decimals': tag.get('decimals', '')
-                }
-                data.append(fact)
-        
-        # Create DataFrame
-        df = pd.DataFrame(data)
-        return df
-        
-    except Exception as e:
-        print(f"Error parsing XBRL file: {str(e)}")
-        return None
+    client = client or get_default_client()
+
+    prepared = await asyncio.to_thread(_prepare_sp500_crawl, start_date, end_date, client, tickers)
+    if prepared is None:
+        return pd.DataFrame() if as_dataframe else []
+    tickers, ticker_cik_mapping, start_date, end_date = prepared
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch_page(url):
+        try:
+            async with semaphore:
+                return await client.get_json_async(url)
+        except Exception as e:
+            get_default_metrics().error('submissions_page_failed',
+                                        f"Error fetching submissions page {url}: {str(e)}", e, url=url)
+            return None
+
+    async def fetch_ticker(ticker):
+        try:
+            # Skip if ticker not found in mapping
+            if ticker not in ticker_cik_mapping:
+                get_default_metrics().event('cik_not_found', level='warning',
+                                            message=f"No CIK found for ticker: {ticker}", ticker=ticker)
+                return []
+
+            cik = ticker_cik_mapping[ticker]
+            base_url = f"https://data.sec.gov/submissions/CIK{cik}.json"
+
+            async with semaphore:
+                data = await client.get_json_async(base_url)
+
+            # In incremental mode skip everything before the CIK's watermark
+            company_start = watermarks.start_date(cik, start_date, filing_types) if watermarks else start_date
+
+            # Overflow pages share the semaphore with the per-company requests
+            overflow_pages = []
+            if full_history:
+                urls = _overflow_page_urls(data, company_start, end_date)
+                pages = await asyncio.gather(*(fetch_page(url) for url in urls))
+                overflow_pages = [page for page in pages if page is not None]
+
+            links = extract_filings(data, ticker, cik, filing_types, company_start, end_date, overflow_pages)
+            return watermarks.filter_new(links, filing_types) if watermarks else links
+
+        except Exception as e:
+            get_default_metrics().error('ticker_failed', f"Error processing {ticker}: {str(e)}", e, ticker=ticker)
+            return []
 
+    # gather() preserves input order, so output matches the sequential crawl
+    per_ticker = await asyncio.gather(*(fetch_ticker(ticker) for ticker in tickers))
+    filing_links = [filing for filings in per_ticker for filing in filings]
 
+    return _finish_crawl(filing_links, filing_types, watermarks, advance_watermarks, as_dataframe)
@@ -1,96 +1,488 @@
-import requests
 import os
-from urllib.parse import urljoin
-import pandas as pd
-from bs4 import BeautifulSoup
-import requests
-from datetime import datetime, timedelta
-import time 
+import re
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 
-def download_sec_filing(filing_url):
+from edgar_client import get_default_client
+from edgar_metrics import endpoint_for, get_default_metrics
+from filing_store import FilingStore, document_name, open_document, parse_filing_url
+from html_extract import HtmlTextExtractor, extract_html_text
+from xbrl_parser import (is_inline_xbrl, parse_ixbrl, parse_ixbrl_to_dataframe, parse_xbrl,
+                         parse_xbrl_to_dataframe)
+
+def _filing_key(filing_url):
     """
-    Downloads SEC filing files from given URL and returns paths to downloaded files
+    Get the (cik, accession) a filing URL belongs to in the local store
     """
-    try:
-        import requests
-        import os
-        from urllib.parse import urljoin
+    parsed = parse_filing_url(filing_url)
+    if parsed is None:
+        raise ValueError(f"Not an EDGAR filing URL: {filing_url}")
+    return parsed[0], parsed[1]
+
+# Document classes of a filing, as assigned by classify_document
+DOCUMENT_CLASSES = ('primary', 'xbrl_instance', 'linkbase', 'schema', 'r_file', 'filing_summary',
+                    'exhibit', 'archive', 'other')
+DEFAULT_DOCUMENT_CLASSES = ('primary', 'xbrl_instance')
+
+LINKBASE_PATTERN = re.compile(r'_(?:cal|def|lab|pre|ref)\.xml$', re.IGNORECASE)
+R_FILE_PATTERN = re.compile(r'^R\d+\.(?:htm|xml)$', re.IGNORECASE)
+EXHIBIT_PATTERN = re.compile(r'ex-?\d|exhibit', re.IGNORECASE)
+INDEX_PATTERN = re.compile(r'-index(?:-headers)?\.html?$', re.IGNORECASE)
+
+def classify_document(name, primary_document=None):
+    """
+    Classify a filing document by its file name
+    
+    Args:
+        name (str): Document file name, e.g. 'aapl-20230930.htm'
+        primary_document (str): The filing's primary document, as listed in
+                                the submissions API (default: unknown)
         
-        # Create directory to store files
-        base_dir = "sec_filings"
-        if not os.path.exists(base_dir):
-            os.makedirs(base_dir)
-            
-        # Download main filing page
-        response = requests.get(filing_url)
-        soup = BeautifulSoup(response.text, 'html.parser')
+    Returns:
+        str: One of DOCUMENT_CLASSES (without primary_document, every plain
+             HTML document is a 'primary' candidate)
+    """
+    lower = name.lower()
+    if primary_document and name == primary_document:
+        return 'primary'
+    if lower == 'filingsummary.xml':
+        return 'filing_summary'
+    if R_FILE_PATTERN.match(name):
+        return 'r_file'
+    if lower.endswith('.xsd'):
+        return 'schema'
+    if LINKBASE_PATTERN.search(name):
+        return 'linkbase'
+    if lower.endswith('.zip'):
+        return 'archive'
+    if INDEX_PATTERN.search(name):
+        return 'other'
+    if lower.endswith('.xml'):
+        return 'xbrl_instance'
+    if lower.endswith(('.htm', '.html', '.txt', '.pdf', '.jpg', '.gif', '.png')) and EXHIBIT_PATTERN.search(name):
+        return 'exhibit'
+    if lower.endswith(('.htm', '.html')) and not primary_document:
+        return 'primary'
+    return 'other'
+
+def _classify_documents(sizes, primary_document=None):
+    """
+    Classify a filing's documents, keeping a single primary document
+    
+    Args:
+        sizes (dict): {file name: size in bytes} of the filing's documents
+        primary_document (str): The filing's primary document (default: unknown)
         
-        downloaded_files = {}
+    Returns:
+        dict: {file name: document class}
+    """
+    classes = {name: classify_document(name, primary_document) for name in sizes}
+    
+    # Without the submissions API's answer, the largest remaining HTML is the primary document
+    candidates = [name for name, document_class in classes.items() if document_class == 'primary']
+    if len(candidates) > 1:
+        primary = max(candidates, key=lambda name: sizes[name] or 0)
+        for name in candidates:
+            if name != primary:
+                classes[name] = 'other'
+    return classes
+
+def _group_by_class(paths, classes):
+    """
+    Group {file name: path} into {document class: [paths]}
+    """
+    files = {}
+    for name in sorted(paths):
+        files.setdefault(classes[name], []).append(paths[name])
+    return files
+
+def _files_by_class(documents, primary_document=None):
+    """
+    Map stored documents to the {document class: [paths]} shape parse_sec_filing expects
+    """
+    sizes = {name: os.path.getsize(path) for name, path in documents.items()}
+    return _group_by_class(documents, _classify_documents(sizes, primary_document))
+
+def get_filing_index(filing_url, client=None, primary_document=None):
+    """
+    Read a filing's index.json manifest and classify its documents
+    
+    Args:
+        filing_url (str): EDGAR filing folder URL (e.g. the filing_url of get_sp500_sec_filings)
+        client (EdgarClient): EDGAR client to use (default: shared client)
+        primary_document (str): The filing's primary document (default: unknown)
         
-        # Find and download all relevant files (XBRL, HTML)
-        for link in soup.find_all('a'):
-            href = link.get('href')
-            if href and (href.endswith('.xml') or href.endswith('.htm') or href.endswith('.html')):
-                file_url = urljoin(filing_url, href)
-                file_name = os.path.join(base_dir, os.path.basename(href))
-                
-                # Download file
-                file_response = requests.get(file_url)
-                with open(file_name, 'wb') as f:
-                    f.write(file_response.content)
-                
-                downloaded_files[href.split('.')[-1]] = file_name
-                
-        return downloaded_files
+    Returns:
+        list: One dict per document with 'name', 'url', 'size' and 'document_class'
+    """
+    client = client or get_default_client()
+    cik, accession = _filing_key(filing_url)
+    folder_url = f"https://www.sec.gov/Archives/edgar/data/{cik}/{accession}/"
+    
+    index = client.get_json(folder_url + "index.json")
+    items = [item for item in index.get('directory', {}).get('item', [])
+             if item.get('name') and item.get('type') != 'folder.gif']
+    sizes = {item['name']: int(item['size']) if str(item.get('size', '')).isdigit() else None
+             for item in items}
+    classes = _classify_documents(sizes, primary_document)
+    
+    return [{
+        'name': name,
+        'url': folder_url + name,
+        'size': sizes[name],
+        'document_class': classes[name],
+    } for name in sizes]
+
+def _content_range_total(response):
+    """
+    Get the total length N from a "Content-Range: bytes */N" header, or None
+    """
+    match = re.match(r'bytes\s+[^/]*/(\d+)$', response.headers.get('Content-Range', '').strip())
+    return int(match.group(1)) if match else None
+
+def _response_validator(response):
+    """
+    Get the validator to resume a download with: a strong ETag, else Last-Modified
+    """
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('Last-Modified')
+
+def _discard_partial(partial_path, validator_path):
+    for path in (partial_path, validator_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+def _stream_document(url, store, cik, accession, name, client, chunk_size=1024 * 1024):
+    """
+    Stream one document to its partial file in the store, then commit it
+    
+    A partial file left by an interrupted download is resumed with a Range
+    request. The request carries the validator the partial body came with in
+    If-Range, so a document that changed in the meantime is sent whole and
+    the download restarts. Only chunk_size bytes are held in memory at a time.
+    
+    Returns:
+        str: Local path of the document
+    """
+    partial_path = store.partial_path(cik, accession, name)
+    validator_path = store.partial_validator_path(cik, accession, name)
+    os.makedirs(os.path.dirname(partial_path), exist_ok=True)
+    offset = os.path.getsize(partial_path) if os.path.exists(partial_path) else 0
+    
+    validator = None
+    if offset and os.path.exists(validator_path):
+        with open(validator_path, 'r', encoding='utf-8') as f:
+            validator = f.read().strip()
+    if not validator:
+        # A partial file that cannot be checked against the document is refetched
+        offset = 0
+    
+    # Byte ranges refer to the unencoded body, so resumed requests ask for identity encoding
+    headers = {'Range': f"bytes={offset}-", 'If-Range': validator,
+               'Accept-Encoding': 'identity'} if offset else {}
+    with client.get(url, headers=headers, stream=True) as response:
+        if offset and response.status_code == 416:
+            # The partial file holds the whole document only if it matches the
+            # size in "Content-Range: bytes */N"; a stale or oversized partial
+            # (e.g. the document changed upstream) is thrown away and refetched
+            if _content_range_total(response) == offset:
+                return store.commit(cik, accession, name, url=url)
+            _discard_partial(partial_path, validator_path)
+            return _stream_document(url, store, cik, accession, name, client, chunk_size)
+        response.raise_for_status()
+        
+        # A 200 to a Range request means the document changed (If-Range did
+        # not match) or the server ignores ranges: the whole body is sent again
+        resumed = offset and response.status_code == 206
+        received = 0
+        try:
+            with open(partial_path, 'ab' if resumed else 'wb') as f:
+                if not resumed:
+                    # Recorded only once the old partial body is truncated
+                    validator = _response_validator(response)
+                    if validator:
+                        with open(validator_path, 'w', encoding='utf-8') as v:
+                            v.write(validator)
+                    elif os.path.exists(validator_path):
+                        os.remove(validator_path)
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+                    received += len(chunk)
+        finally:
+            client.metrics.inc('http_response_bytes_total', received, endpoint=endpoint_for(url))
+    
+    return store.commit(cik, accession, name, url=url)
+
+def _is_inline_document(path):
+    """
+    Check whether a stored (possibly compressed) document is inline XBRL
+    """
+    with open_document(path) as f:
+        return is_inline_xbrl(f)
+
+def _download_documents(documents, cik, accession, client, store, executor, failures=None):
+    """
+    Download (or find in the store) a filing's documents concurrently
+    
+    Documents that fail to download are reported and left out; with a
+    failures list, "url: error" is also appended to it for each of them.
+    
+    Returns:
+        dict: {document class: [local paths]} of the documents now stored
+    """
+    def fetch(document):
+        name = document['name']
+        # Download file unless an intact copy is already stored
+        if not store.has(cik, accession, name):
+            try:
+                _stream_document(document['url'], store, cik, accession, name, client)
+            except Exception as e:
+                get_default_metrics().error('document_download_failed',
+                                            f"Error downloading {document['url']}: {str(e)}", e,
+                                            url=document['url'])
+                if failures is not None:
+                    failures.append(f"{document['url']}: {type(e).__name__}: {str(e)}")
+                return None
+        return store.stored_path(cik, accession, name)
+    
+    paths = list(executor.map(fetch, documents))
+    downloaded_files = {}
+    for document, path in zip(documents, paths):
+        if path is not None:
+            downloaded_files.setdefault(document['document_class'], []).append(path)
+    return downloaded_files
+
+def _download_filing(filing_url, client, store, classes, primary_document, executor, failures=None):
+    """
+    Download one filing's documents through a shared executor, raising on failure
+    """
+    cik, accession = _filing_key(filing_url)
+    skip_inline_instance = classes is None
+    wanted = set(DEFAULT_DOCUMENT_CLASSES if classes is None else classes)
+    
+    documents = [document for document in get_filing_index(filing_url, client, primary_document)
+                 if document['document_class'] in wanted]
+    
+    # The primary document goes first so it can be sniffed for inline XBRL
+    primary = [document for document in documents if document['document_class'] == 'primary']
+    downloaded_files = _download_documents(primary, cik, accession, client, store, executor, failures)
+    if skip_inline_instance and any(_is_inline_document(path) for path in downloaded_files.get('primary', [])):
+        wanted.discard('xbrl_instance')
+    
+    rest = [document for document in documents
+            if document['document_class'] != 'primary' and document['document_class'] in wanted]
+    rest_files = _download_documents(rest, cik, accession, client, store, executor, failures)
+    for document_class, paths in rest_files.items():
+        downloaded_files.setdefault(document_class, []).extend(paths)
+    return downloaded_files
+
+def download_sec_filing(filing_url, client=None, store=None, classes=None, primary_document=None,
+                        max_workers=4):
+    """
+    Downloads SEC filing files from given URL and returns paths to downloaded files
+    
+    The filing's index.json manifest is read and only documents of the
+    requested classes are fetched, several at a time under the client's
+    shared rate limit. Each document streams to disk in chunks and is
+    renamed into place when complete; interrupted downloads resume where
+    they stopped. Files are kept in the local filing store as
+    cik/accession/filename; documents already present and intact are not
+    downloaded again.
+    
+    Args:
+        filing_url (str): EDGAR filing folder URL
+        client (EdgarClient): EDGAR client to use (default: shared client)
+        store (FilingStore): Local filing store (default: FilingStore())
+        classes (list): Document classes to download, from DOCUMENT_CLASSES
+                        (default: primary document plus XBRL instance; the
+                        instance is skipped when the primary document is
+                        inline XBRL, since its facts are read from the HTML)
+        primary_document (str): The filing's primary document, e.g. the
+                                primary_document of get_sp500_sec_filings (default: unknown)
+        max_workers (int): Documents downloaded concurrently (default: 4)
+        
+    Returns:
+        dict: {document class: [local paths]}
+    """
+    client = client or get_default_client()
+    store = store or FilingStore()
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor, get_default_metrics().timed('download'):
+            return _download_filing(filing_url, client, store, classes, primary_document, executor)
         
     except Exception as e:
-        print(f"Error downloading SEC filing: {str(e)}")
+        get_default_metrics().error('filing_download_failed', f"Error downloading SEC filing: {str(e)}", e,
+                                    filing_url=filing_url)
         return None
 
-def parse_sec_filing(filing_url):
+def _download_filings(filings, client=None, store=None, classes=None, max_workers=8, max_filings=4):
+    """
+    Download many filings, also returning why each failed one failed
+    
+    Returns:
+        tuple: (filing URL -> files or None, as download_sec_filings returns;
+                filing URL -> error text for filings that failed or where
+                any document failed to download)
+    """
+    client = client or get_default_client()
+    store = store or FilingStore()
+    filings = [{'filing_url': filing} if isinstance(filing, str) else filing for filing in filings]
+    errors = {}
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        def fetch(filing):
+            filing_url = filing['filing_url']
+            failures = []
+            try:
+                with get_default_metrics().timed('download'):
+                    files = _download_filing(filing_url, client, store, classes,
+                                             filing.get('primary_document') or None, executor, failures)
+            except Exception as e:
+                get_default_metrics().error('filing_download_failed',
+                                            f"Error downloading SEC filing {filing_url}: {str(e)}", e,
+                                            filing_url=filing_url)
+                errors[filing_url] = ''.join(traceback.format_exception(e))
+                return None
+            if failures:
+                errors[filing_url] = f"Incomplete download of {filing_url}:\n" + '\n'.join(failures)
+            return files
+        
+        # Filing threads only wait on the document pool, so the two never deadlock
+        with ThreadPoolExecutor(max_workers=max_filings) as filing_executor:
+            results = list(filing_executor.map(fetch, filings))
+    
+    return {filing['filing_url']: result for filing, result in zip(filings, results)}, errors
+
+def download_sec_filings(filings, client=None, store=None, classes=None, max_workers=8, max_filings=4):
+    """
+    Download many filings concurrently under the client's shared rate limit
+    
+    Filing manifests are read max_filings at a time, and the documents of
+    all filings share one pool of max_workers download threads.
+    
+    Args:
+        filings (list): Filing URLs, or filing dicts from get_sp500_sec_filings
+                        (their primary_document is then used)
+        client (EdgarClient): EDGAR client to use (default: shared client)
+        store (FilingStore): Local filing store (default: FilingStore())
+        classes (list): Document classes to download (default: see download_sec_filing)
+        max_workers (int): Documents downloaded concurrently (default: 8)
+        max_filings (int): Filings processed concurrently (default: 4)
+        
+    Returns:
+        dict: filing URL -> {document class: [local paths]}, or None for filings that failed
+    """
+    return _download_filings(filings, client, store, classes, max_workers, max_filings)[0]
+
+def _parse_filing_files(files, html_engine='auto', strict=False):
+    """
+    Parse downloaded filing files into DataFrames
+    
+    HTML extraction errors are raised. A fact table that fails to parse is
+    reported and left as None, unless strict is set.
+    
+    Args:
+        files (dict): {document class: [local paths]} as returned by download_sec_filing
+        html_engine (str): HTML extraction engine, 'lxml', 'bs4' or 'auto' (default: 'auto')
+        strict (bool): Raise XBRL parse errors too (default: False)
+        
+    Returns:
+        dict: 'xbrl_data', 'text_blocks', 'footnotes' and 'sections' DataFrames (when available)
+    """
+    metrics = get_default_metrics()
+    parse_ixbrl_file = parse_ixbrl if strict else parse_ixbrl_to_dataframe
+    parse_xbrl_file = parse_xbrl if strict else parse_xbrl_to_dataframe
+    all_data = {}
+    html_file = (files.get('primary') or [None])[0]
+    if html_file and not document_name(html_file).endswith(('.htm', '.html')):
+        html_file = None
+    
+    # Documents are read through streaming readers, so compressed ones are
+    # never decompressed to disk
+    # Facts embedded in an inline XBRL document need no separate instance;
+    # otherwise parse the XBRL instance if available
+    if html_file and _is_inline_document(html_file):
+        # The lxml text extraction rides along on the same pass over the document
+        text_extractor = HtmlTextExtractor() if html_engine in ('auto', 'lxml') else None
+        with open_document(html_file) as f, metrics.timed('parse_ixbrl'):
+            all_data['xbrl_data'] = parse_ixbrl_file(f, handler=text_extractor)
+        if text_extractor is not None and all_data['xbrl_data'] is not None:
+            all_data.update(text_extractor.result())
+            return all_data
+    elif files.get('xbrl_instance'):
+        with open_document(files['xbrl_instance'][0]) as f, metrics.timed('parse_xbrl'):
+            xbrl_df = parse_xbrl_file(f)
+        all_data['xbrl_data'] = xbrl_df
+    
+    # Parse HTML file for text blocks, footnotes and Item sections
+    if html_file:
+        with open_document(html_file) as f, metrics.timed('parse_html'):
+            all_data.update(extract_html_text(f, engine=html_engine))
+    
+    return all_data
+
+def parse_stored_filing(filing_url, store=None, html_engine='auto', primary_document=None):
+    """
+    Parse a filing straight from the local filing store, raising on failure
+    
+    Unlike parse_sec_filing, nothing is downloaded and every error, including
+    an XBRL instance that fails to parse, is raised to the caller.
+    
+    Args:
+        filing_url (str): EDGAR filing URL identifying the filing
+        store (FilingStore): Local filing store (default: FilingStore())
+        html_engine (str): HTML extraction engine (default: 'auto')
+        primary_document (str): The filing's primary document (default: unknown)
+        
+    Returns:
+        dict: Parsed filing data (see parse_sec_filing)
+    """
+    documents = (store or FilingStore()).documents(*_filing_key(filing_url))
+    files = _files_by_class(documents, primary_document)
+    if not files:
+        raise FileNotFoundError(f"No stored documents for {filing_url}")
+    return _parse_filing_files(files, html_engine, strict=True)
+
+def parse_sec_filing(filing_url, client=None, store=None, offline=False, html_engine='auto',
+                     primary_document=None, text_index=None, filing=None):
     """
     Main function to download and parse SEC filing files
+    
+    Only the primary document and XBRL instance are downloaded (see
+    download_sec_filing). With offline=True the filing is parsed from the
+    local filing store only, without touching the network. The primary
+    document is read with the streaming lxml extractor when lxml is
+    installed; pass html_engine='bs4' for the original BeautifulSoup
+    extraction. Pass the filing's primary_document when known so it does
+    not have to be guessed.
+    
+    With a TextIndex, the filing's text blocks, footnotes and Item sections
+    are added to the full-text index as they are parsed; pass the filing
+    dict from get_sp500_sec_filings as filing= so its form type and filing
+    date can be used as search filters.
     """
     try:
-        # Download all filing files
-        files = download_sec_filing(filing_url)
+        # Download all filing files (or pick them up from the local store)
+        if offline:
+            documents = (store or FilingStore()).documents(*_filing_key(filing_url))
+            files = _files_by_class(documents, primary_document)
+        else:
+            files = download_sec_filing(filing_url, client=client, store=store,
+                                        primary_document=primary_document)
         if not files:
             return None
-            
-        all_data = {}
-        
-        # Parse XBRL file if available
-        if 'xml' in files:
-            xbrl_df = parse_xbrl_to_dataframe(files['xml'])
-            all_data['xbrl_data'] = xbrl_df
         
-        # Parse HTML file for text blocks and footnotes
-        if 'htm' in files or 'html' in files:
-            html_file = files.get('htm') or files.get('html')
-            with open(html_file, 'r', encoding='utf-8') as file:
-                soup = BeautifulSoup(file, 'html.parser')
-                
-            # Extract text blocks and footnotes
-            text_blocks = []
-            footnotes = []
-            
-            # Find all div elements that might contain text blocks or footnotes
-            for div in soup.find_all('div', class_=['textBlock', 'footnote']):
-                block_data = {
-                    'text': div.get_text(strip=True),
-                    'type': 'text_block' if 'textBlock' in div.get('class', []) else 'footnote',
-                    'id': div.get('id', ''),
-                }
-                if block_data['type'] == 'text_block':
-                    text_blocks.append(block_data)
-                else:
-                    footnotes.append(block_data)
-            
-            all_data['text_blocks'] = pd.DataFrame(text_blocks)
-            all_data['footnotes'] = pd.DataFrame(footnotes)
-        
-        return all_data
+        metrics = get_default_metrics()
+        with metrics.timed('parse'):
+            parsed = _parse_filing_files(files, html_engine)
+        if text_index is not None:
+            with metrics.timed('index'):
+                text_index.add_filing(dict(filing or {}, filing_url=filing_url), parsed)
+        return parsed
         
     except Exception as e:
-        print(f"Error parsing SEC filing: {str(e)}")
-        return None
\ No newline at end of file
+        get_default_metrics().error('filing_parse_failed', f"Error parsing SEC filing: {str(e)}", e,
+                                    filing_url=filing_url)
+        return None
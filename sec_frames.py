@@ -0,0 +1,184 @@
+import asyncio
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from edgar_client import get_default_client, run_coroutine
+from edgar_metrics import get_default_metrics
+
+
+FRAMES_URL = "https://data.sec.gov/api/xbrl/frames/{taxonomy}/{tag}/{unit}/{period}.json"
+FRAME_FIELDS = ['accn', 'cik', 'entityName', 'loc', 'start', 'end', 'val']
+FRAMES_COLUMNS = ['taxonomy', 'tag', 'unit', 'period', 'cik', 'entity_name', 'accn', 'loc',
+                  'start', 'end', 'value']
+
+
+def frame_periods(start_year=2009, end_year=None, annual=True, quarterly=True, instant=True):
+    """
+    List frame period codes for a range of calendar years
+
+    Args:
+        start_year (int): First calendar year (default: 2009)
+        end_year (int): Last calendar year (default: current year)
+        annual (bool): Include annual duration frames, e.g. CY2019 (default: True)
+        quarterly (bool): Include quarterly duration frames, e.g. CY2019Q1 (default: True)
+        instant (bool): Include quarter-end instant frames, e.g. CY2019Q4I (default: True)
+
+    Returns:
+        list: Period codes in chronological order
+    """
+    end_year = end_year or datetime.now().year
+    periods = []
+    for year in range(start_year, end_year + 1):
+        if annual:
+            periods.append(f"CY{year}")
+        for quarter in range(1, 5):
+            if quarterly:
+                periods.append(f"CY{year}Q{quarter}")
+            if instant:
+                periods.append(f"CY{year}Q{quarter}I")
+    return periods
+
+
+def _frames_table(responses):
+    """
+    Build one long DataFrame from (taxonomy, tag, unit, period, frames JSON) tuples
+
+    Entries are concatenated once and the grid coordinates are broadcast as
+    categorical codes, instead of being copied into every entry.
+    """
+    entries = []
+    labels = []
+    sizes = []
+    for taxonomy, tag, unit, period, data in responses:
+        rows = data.get('data', [])
+        entries.extend(rows)
+        labels.append((taxonomy, tag, unit, period))
+        sizes.append(len(rows))
+
+    table = pd.DataFrame.from_records(entries, columns=FRAME_FIELDS) if entries else pd.DataFrame(columns=FRAME_FIELDS)
+    group_codes = np.repeat(np.arange(len(labels), dtype=np.int32), sizes)
+
+    def broadcast(position):
+        codes, uniques = pd.factorize(pd.Series([label[position] for label in labels], dtype=object))
+        return pd.Categorical.from_codes(codes[group_codes], categories=uniques)
+
+    return pd.DataFrame({
+        'taxonomy': broadcast(0),
+        'tag': broadcast(1),
+        'unit': broadcast(2),
+        'period': broadcast(3),
+        'cik': pd.to_numeric(table['cik'], errors='coerce').astype('Int64'),
+        'entity_name': table['entityName'].astype(object),
+        'accn': table['accn'].astype(object),
+        'loc': table['loc'].astype('category'),
+        'start': pd.to_datetime(table['start'], errors='coerce').astype('datetime64[ns]'),
+        'end': pd.to_datetime(table['end'], errors='coerce').astype('datetime64[ns]'),
+        'value': pd.to_numeric(table['val'], errors='coerce').astype('float64'),
+    }, columns=FRAMES_COLUMNS)
+
+
+async def _fetch_frames_async(tags, units, periods, taxonomy, client, max_concurrency):
+    """
+    Fetch every grid cell
+
+    Returns:
+        tuple: ((taxonomy, tag, unit, period, frames JSON) tuples of the cells fetched,
+                (tag, unit, period) of the cells that failed; 404s are neither)
+    """
+    client = client or get_default_client()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    failed = []
+
+    async def fetch(tag, unit, period):
+        url = FRAMES_URL.format(taxonomy=taxonomy, tag=tag, unit=unit, period=period)
+        try:
+            # Through the client's cache; a 404 means no frame for this cell
+            async with semaphore:
+                data = await client.get_json_async(url, missing_ok=True)
+            if data is None:
+                return None
+            return taxonomy, tag, unit, period, data
+        except Exception as e:
+            get_default_metrics().error('frame_fetch_failed', f"Error fetching frame {url}: {str(e)}", e, url=url)
+            failed.append((tag, unit, period))
+            return None
+
+    grid = [(tag, unit, period) for tag in tags for unit in units for period in periods]
+    responses = await asyncio.gather(*(fetch(*cell) for cell in grid))
+    return [response for response in responses if response is not None], failed
+
+
+async def fetch_frames_grid_async(tags, units=('USD',), periods=None, taxonomy='us-gaap',
+                                  client=None, max_concurrency=10):
+    """
+    Fetch a (tag x unit x period) grid of frames concurrently
+
+    Every request draws from the client's shared token bucket and goes through
+    its HTTP cache, if any. Grid cells with no frame (HTTP 404, e.g. an
+    instant period for a duration concept) are skipped quietly; those 404s
+    are cached too.
+
+    Args:
+        tags (list): Concept names, e.g. ['NetIncomeLoss', 'Assets']
+        units (list): Units of measure, e.g. ['USD', 'shares', 'USD-per-shares'] (default: ['USD'])
+        periods (list): Frame periods (default: frame_periods() from 2009 to this year)
+        taxonomy (str): Taxonomy of the tags (default: 'us-gaap')
+        client (EdgarClient): EDGAR client to use (default: shared client)
+        max_concurrency (int): Maximum in-flight requests (default: 10)
+
+    Returns:
+        pandas.DataFrame: One row per company per grid cell, with FRAMES_COLUMNS
+    """
+    periods = periods if periods is not None else frame_periods()
+    responses, _ = await _fetch_frames_async(tags, units, periods, taxonomy, client, max_concurrency)
+    return _frames_table(responses)
+
+
+def fetch_frames_grid(tags, units=('USD',), periods=None, taxonomy='us-gaap', client=None, max_concurrency=10):
+    """
+    Fetch a (tag x unit x period) grid of frames concurrently
+
+    See fetch_frames_grid_async for arguments.
+
+    Returns:
+        pandas.DataFrame: One row per company per grid cell, with FRAMES_COLUMNS
+    """
+    return run_coroutine(fetch_frames_grid_async(
+        tags, units=units, periods=periods, taxonomy=taxonomy,
+        client=client, max_concurrency=max_concurrency
+    ))
+
+
+def fetch_sec_frames_data(us_gaap_tags, start_year=2009, end_year=None, unit='USD', client=None,
+                          max_concurrency=10):
+    """
+    Fetches financial data from SEC EDGAR API frames for specified US GAAP tags
+
+    Args:
+        us_gaap_tags (list): List of US GAAP taxonomy tags to fetch
+        start_year (int, optional): First calendar year (default: 2009)
+        end_year (int, optional): Last calendar year (default: current year)
+        unit (str, optional): Unit of measure (default: 'USD')
+        client (EdgarClient, optional): EDGAR client to use (default: shared client)
+        max_concurrency (int, optional): Maximum in-flight requests (default: 10)
+
+    Returns:
+        dict: Dictionary with US GAAP tags as keys and their annual (CY####) frame
+              entries as values; each raw entry also carries its period under 'frame'.
+              As before, a tag whose data could not be fetched maps to None (any
+              failed request other than a 404 for a year with no frame)
+    """
+    periods = frame_periods(start_year, end_year, quarterly=False, instant=False)
+    responses, failed = run_coroutine(_fetch_frames_async(
+        us_gaap_tags, [unit], periods, 'us-gaap', client, max_concurrency
+    ))
+
+    results = {tag: [] for tag in us_gaap_tags}
+    for taxonomy, tag, unit, period, data in responses:
+        results[tag].extend(dict(entry, frame=period) for entry in data.get('data', []))
+    # Partial data is not passed off as complete
+    for tag, unit, period in failed:
+        results[tag] = None
+    return results
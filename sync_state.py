@@ -0,0 +1,142 @@
+import json
+import os
+import tempfile
+import threading
+
+
+def watermark_key(cik, filing_types=None):
+    """
+    Get the state key of a CIK crawled for a set of filing types
+
+    Watermarks are kept per (CIK, filing types), so a crawl for other forms
+    does not skip filings a narrower crawl never looked at.
+
+    Args:
+        cik (str): Company CIK
+        filing_types (list): Filing types of the crawl (default: None, all forms)
+
+    Returns:
+        str: e.g. '0000320193|10-K,10-Q'
+    """
+    types = ','.join(sorted(set(filing_types))) if filing_types else '*'
+    return f"{str(cik).zfill(10)}|{types}"
+
+
+class WatermarkStore:
+    """
+    Watermarks of the newest filing already processed, per CIK and filing types
+
+    For each CIK and set of filing types the store keeps the latest filing
+    date seen, the accession numbers filed on that date (EDGAR accession
+    numbers are not ordered within a day) and the most recent accession
+    number. State is a small JSON file written atomically, so it survives
+    process restarts.
+    """
+
+    def __init__(self, path='sec_sync_state.json'):
+        """
+        Args:
+            path (str): JSON file holding the watermarks (default: sec_sync_state.json)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._state = json.load(f)
+        except FileNotFoundError:
+            self._state = {}
+
+    def get(self, cik, filing_types=None):
+        """
+        Get the watermark for a CIK crawled for a set of filing types
+
+        Args:
+            cik (str): Company CIK
+            filing_types (list): Filing types of the crawl (default: None, all forms)
+
+        Returns:
+            dict: {'filing_date', 'accession_numbers', 'last_accession'} or None
+        """
+        return self._state.get(watermark_key(cik, filing_types))
+
+    def start_date(self, cik, start_date, filing_types=None):
+        """
+        Move a crawl's start date forward to a CIK's watermark
+
+        Args:
+            cik (str): Company CIK
+            start_date (str): Requested start date in YYYY-MM-DD format
+            filing_types (list): Filing types of the crawl (default: None, all forms)
+
+        Returns:
+            str: The later of start_date and the watermark date
+        """
+        watermark = self.get(cik, filing_types)
+        if watermark is None:
+            return start_date
+        return max(start_date, watermark['filing_date'])
+
+    def filter_new(self, filings, filing_types=None):
+        """
+        Drop filings at or before their CIK's watermark
+
+        Args:
+            filings (list): Filing dicts with 'cik', 'filing_date' and 'accession_number'
+            filing_types (list): Filing types of the crawl (default: None, all forms)
+
+        Returns:
+            list: Filings not yet processed
+        """
+        new_filings = []
+        for filing in filings:
+            watermark = self.get(filing['cik'], filing_types)
+            if watermark is not None:
+                if filing['filing_date'] < watermark['filing_date']:
+                    continue
+                if (filing['filing_date'] == watermark['filing_date'] and
+                        filing['accession_number'] in watermark['accession_numbers']):
+                    continue
+            new_filings.append(filing)
+        return new_filings
+
+    def advance(self, filings, filing_types=None):
+        """
+        Move watermarks forward past a batch of processed filings
+
+        Args:
+            filings (list): Filing dicts with 'cik', 'filing_date' and 'accession_number'
+            filing_types (list): Filing types of the crawl that returned them
+                                 (default: None, all forms)
+        """
+        with self._lock:
+            for filing in filings:
+                key = watermark_key(filing['cik'], filing_types)
+                filing_date = filing['filing_date']
+                watermark = self._state.get(key)
+
+                if watermark is None or filing_date > watermark['filing_date']:
+                    self._state[key] = {
+                        'filing_date': filing_date,
+                        'accession_numbers': [filing['accession_number']],
+                        'last_accession': filing['accession_number'],
+                    }
+                elif (filing_date == watermark['filing_date'] and
+                        filing['accession_number'] not in watermark['accession_numbers']):
+                    watermark['accession_numbers'].append(filing['accession_number'])
+                    watermark['last_accession'] = max(watermark['accession_numbers'])
+
+    def save(self):
+        """
+        Atomically write the watermarks to disk
+        """
+        with self._lock:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(self._state, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
@@ -0,0 +1,7 @@
+import os
+
+# Small recorded inputs the tests run against, so nothing touches sec.gov
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+REPLAY_FIXTURES_DIR = os.path.join(FIXTURES_DIR, 'replay')
+
+USER_AGENT = 'SEC Data Pull Tests tests@example.com'
@@ -0,0 +1,35 @@
+import pytest
+
+from edgar_client import EdgarClient
+from edgar_metrics import Metrics, get_default_metrics, set_default_metrics
+from edgar_replay_server import ReplayServer
+from tests import REPLAY_FIXTURES_DIR, USER_AGENT
+
+
+@pytest.fixture
+def events():
+    """
+    Capture the events emitted through the process-wide metrics registry
+    """
+    records = []
+    previous = get_default_metrics()
+    set_default_metrics(Metrics(sinks=[records.append]))
+    yield records
+    set_default_metrics(previous)
+
+
+@pytest.fixture
+def replay_server():
+    """
+    Replay server over tests/fixtures/replay, without the SEC rate limit
+    """
+    with ReplayServer(REPLAY_FIXTURES_DIR, rate_limit=None) as server:
+        yield server
+
+
+@pytest.fixture
+def client(replay_server):
+    """
+    EdgarClient pointed at the replay server, with its own metrics registry
+    """
+    return EdgarClient(user_agent=USER_AGENT, base_url=replay_server.base_url, metrics=Metrics())
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from batch_parser import parse_filings_batch, run_batch
+from filing_store import FilingStore
+
+FILING = {
+    'filing_url': 'https://www.sec.gov/Archives/edgar/data/0000320193/000032019323000106',
+    'primary_document': 'aapl-20230930.htm',
+}
+MISSING_FILING_URL = 'https://www.sec.gov/Archives/edgar/data/0000320193/000032019399000001'
+# index.json lists a primary document the server does not have
+INCOMPLETE_FILING_URL = 'https://www.sec.gov/Archives/edgar/data/0000320193/000032019323000077'
+
+
+def double_or_crash(item):
+    # A worker that dies outright (segfault, OOM kill) breaks the whole pool
+    if item == 'crash':
+        os._exit(1)
+    return item * 2
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_crashed_worker_fails_only_its_chunk(ordered):
+    items = [1, 2, 'crash', 3, 4, 5]
+    results = list(run_batch(double_or_crash, items, max_workers=2, chunksize=1, ordered=ordered))
+
+    by_source = {result.source: result for result in results}
+    assert len(results) == len(items)
+    assert 'BrokenProcessPool' in by_source['crash'].error
+    assert {source: result.data for source, result in by_source.items() if source != 'crash'} == {
+        1: 2, 2: 4, 3: 6, 4: 8, 5: 10}
+    if ordered:
+        assert [result.source for result in results] == items
+
+
+def test_parse_filings_batch_reports_download_failures(client, tmp_path, events):
+    store = FilingStore(str(tmp_path / 'sec_filings'))
+    filings = [FILING, MISSING_FILING_URL, INCOMPLETE_FILING_URL]
+    results = list(parse_filings_batch(filings, max_workers=1, client=client, store=store))
+
+    assert [result.source for result in results] == filings
+    parsed, missing, incomplete = results
+    assert parsed.error is None
+    assert parsed.data['xbrl_data'] is not None
+    assert missing.data is None
+    assert '404' in missing.error
+    assert incomplete.data is None
+    assert incomplete.error.startswith(f'Incomplete download of {INCOMPLETE_FILING_URL}')
+    assert 'aapl-20230701.htm' in incomplete.error
@@ -0,0 +1,100 @@
+import json
+import os
+import zipfile
+
+import pandas as pd
+
+from bulk_ingest import read_companyfacts_zip, read_submissions_zip
+from companyfacts import COMPANYFACTS_COLUMNS, concat_companyfacts, flatten_companyfacts
+from tests import FIXTURES_DIR, REPLAY_FIXTURES_DIR
+
+# Apple (recent filings plus one overflow page), Microsoft, and a truncated
+# CIK0000000002.json member
+SUBMISSIONS_ZIP = os.path.join(FIXTURES_DIR, 'submissions.zip')
+COMPANYFACTS_FIXTURE = os.path.join(REPLAY_FIXTURES_DIR, 'data.sec.gov', 'api', 'xbrl', 'companyfacts',
+                                    'CIK0000320193.json')
+MICROSOFT_FACTS = {'cik': 789019, 'entityName': 'MICROSOFT CORP', 'facts': {'us-gaap': {
+    'NetIncomeLoss': {'units': {'USD': [{'end': '2023-06-30', 'val': 72361000000, 'form': '10-K'}]}}}}}
+
+
+def read(**kwargs):
+    kwargs.setdefault('start_date', '2010-01-01')
+    kwargs.setdefault('end_date', '2024-12-31')
+    return read_submissions_zip(SUBMISSIONS_ZIP, max_workers=1, **kwargs)
+
+
+def test_reads_recent_filings_and_overflow_pages(events):
+    filings = read()
+
+    assert [(f['ticker'], f['filing_type'], f['filing_date']) for f in filings] == [
+        ('AAPL', '10-K', '2023-11-03'),
+        ('AAPL', '10-Q', '2023-08-04'),
+        ('AAPL', '10-K', '2014-10-27'),
+        ('AAPL', '10-Q', '2014-07-23'),
+        ('MSFT', '10-K', '2023-07-27'),
+    ]
+    overflow = filings[2]
+    assert overflow['cik'] == '0000320193'
+    assert overflow['company_name'] == 'Apple Inc.'
+    assert overflow['primary_document'] == 'd783162d10k.htm'
+    assert overflow['filing_url'] == 'https://www.sec.gov/Archives/edgar/data/0000320193/000119312514383437'
+
+
+def test_filters_by_form_type_date_and_cik(events):
+    assert read(filing_types=['8-K'], ciks=['320193'])[0]['accession_number'] == '0000320193-23-000075'
+    assert read(start_date='2014-07-01', end_date='2014-12-31', ciks=[320193]) == read(
+        start_date='2014-07-01', end_date='2014-12-31', ciks=['0000320193'])
+    assert {f['ticker'] for f in read(ciks=['789019'])} == {'MSFT'}
+    assert read(start_date='2015-01-01', end_date='2022-12-31') == []
+
+
+def test_bad_member_is_reported_without_losing_the_chunk(events):
+    filings = read(chunksize=10)
+
+    assert {f['ticker'] for f in filings} == {'AAPL', 'MSFT'}
+    failures = [event for event in events if event['event'] == 'bulk_member_failed']
+    assert [event['member'] for event in failures] == ['CIK0000000002.json']
+    assert not [event for event in events if event['event'] == 'bulk_chunk_failed']
+
+
+def test_as_dataframe(events):
+    frame = read(as_dataframe=True)
+    assert len(frame) == 5
+    assert {'ticker', 'filing_url', 'primary_document'} <= set(frame.columns)
+
+
+def companyfacts_zip(tmp_path):
+    # Apple, Microsoft, a truncated member and a file that is not a company
+    with open(COMPANYFACTS_FIXTURE, 'r', encoding='utf-8') as f:
+        apple = json.load(f)
+    path = str(tmp_path / 'companyfacts.zip')
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('CIK0000789019.json', json.dumps(MICROSOFT_FACTS))
+        archive.writestr('CIK0000320193.json', json.dumps(apple))
+        archive.writestr('CIK0000000002.json', '{"cik": 2, "facts": {')
+        archive.writestr('README.txt', 'not a company')
+    return path, apple
+
+
+def test_read_companyfacts_zip(tmp_path, events):
+    path, apple = companyfacts_zip(tmp_path)
+
+    facts = read_companyfacts_zip(path, max_workers=1, chunksize=2)
+
+    # Companies come back in CIK order, as flatten_companyfacts builds them
+    expected = concat_companyfacts([flatten_companyfacts(apple), flatten_companyfacts(MICROSOFT_FACTS)])
+    pd.testing.assert_frame_equal(facts, expected)
+    assert list(facts.columns) == COMPANYFACTS_COLUMNS
+    failures = [event for event in events if event['event'] == 'bulk_member_failed']
+    assert [event['member'] for event in failures] == ['CIK0000000002.json']
+
+
+def test_read_companyfacts_zip_filters_by_cik(tmp_path, events):
+    path, apple = companyfacts_zip(tmp_path)
+
+    facts = read_companyfacts_zip(path, ciks=[789019], max_workers=1)
+
+    assert facts['cik'].unique().tolist() == [789019]
+    assert facts['concept'].tolist() == ['NetIncomeLoss']
+    assert read_companyfacts_zip(path, ciks=['0000000001'], max_workers=1).empty
+    assert not events
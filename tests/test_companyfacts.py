@@ -0,0 +1,86 @@
+import asyncio
+import json
+import os
+
+import pandas as pd
+
+from companyfacts import (COMPANYFACTS_COLUMNS, concat_companyfacts, fetch_company_concept, fetch_company_facts,
+                          flatten_companyfacts)
+from tests import REPLAY_FIXTURES_DIR
+
+COMPANYFACTS_FIXTURE = os.path.join(REPLAY_FIXTURES_DIR, 'data.sec.gov', 'api', 'xbrl', 'companyfacts',
+                                    'CIK0000320193.json')
+
+
+def load_companyfacts():
+    with open(COMPANYFACTS_FIXTURE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_flatten_companyfacts():
+    facts = flatten_companyfacts(load_companyfacts())
+
+    assert list(facts.columns) == COMPANYFACTS_COLUMNS
+    assert len(facts) == 5
+    assert facts['cik'].unique().tolist() == [320193]
+    assert facts['concept'].tolist() == ['EntityCommonStockSharesOutstanding', 'Revenues', 'Revenues',
+                                         'Assets', 'Assets']
+    assert facts['unit'].tolist() == ['shares', 'USD', 'USD', 'USD', 'USD']
+    for column in ('taxonomy', 'concept', 'unit', 'form', 'frame'):
+        assert str(facts[column].dtype) == 'category'
+    assert list(facts['taxonomy'].cat.categories) == ['dei', 'us-gaap']
+
+    revenues = facts[facts['concept'] == 'Revenues'].iloc[1]
+    assert revenues['value'] == 383285e6
+    assert str(revenues['start'].date()) == '2022-09-25'
+    assert revenues['fy'] == 2023
+    assert revenues['frame'] == 'CY2023'
+    # Instants have no start; facts not in a frame have none
+    assets = facts[facts['concept'] == 'Assets'].iloc[1]
+    assert pd.isna(assets['start'])
+    assert pd.isna(assets['frame'])
+
+
+def test_flatten_empty():
+    facts = flatten_companyfacts({})
+    assert facts.empty
+    assert list(facts.columns) == COMPANYFACTS_COLUMNS
+
+
+def test_concat_keeps_categoricals():
+    apple = flatten_companyfacts(load_companyfacts())
+    other = flatten_companyfacts({'cik': 789019, 'entityName': 'MICROSOFT CORP', 'facts': {'us-gaap': {
+        'NetIncomeLoss': {'units': {'USD': [{'end': '2023-06-30', 'val': 72361000000, 'form': '10-K'}]}}}}})
+
+    combined = concat_companyfacts([apple, None, other])
+
+    assert len(combined) == 6
+    assert str(combined['concept'].dtype) == 'category'
+    assert str(combined['entity_name'].dtype) == 'category'
+    assert concat_companyfacts([]).empty
+
+
+def test_fetch_company_facts(client, events):
+    facts = fetch_company_facts(['320193', 789019], client=client)
+
+    pd.testing.assert_frame_equal(facts, flatten_companyfacts(load_companyfacts()))
+    # Microsoft has no fixture: reported and left out
+    assert [event['url'] for event in events if event['event'] == 'companyfacts_fetch_failed'] == [
+        'https://data.sec.gov/api/xbrl/companyfacts/CIK0000789019.json']
+
+
+def test_fetch_company_concept(client):
+    facts = fetch_company_concept(320193, 'Assets', client=client)
+
+    assert facts['concept'].tolist() == ['Assets', 'Assets']
+    assert facts['taxonomy'].tolist() == ['us-gaap', 'us-gaap']
+    assert facts['entity_name'].tolist() == ['Apple Inc.', 'Apple Inc.']
+    assert facts['value'].tolist() == [352755e6, 352583e6]
+
+
+def test_fetch_inside_running_event_loop(client):
+    # e.g. a Jupyter cell
+    async def notebook_cell():
+        return fetch_company_concept('320193', 'Assets', client=client)
+
+    assert len(asyncio.run(notebook_cell())) == 2
@@ -0,0 +1,81 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from edgar_client import EdgarClient, TokenBucket
+from edgar_metrics import Metrics
+from edgar_replay_server import ReplayServer
+from tests import REPLAY_FIXTURES_DIR, USER_AGENT
+
+SUBMISSIONS_URL = 'https://data.sec.gov/submissions/CIK0000320193.json'
+
+
+def test_429_is_retried_after_retry_after():
+    # A server allowing 1 request per second throttles the second request;
+    # the client waits out Retry-After and gets the fixture on its retry
+    with ReplayServer(REPLAY_FIXTURES_DIR, rate_limit=1, retry_after=1) as server:
+        client = EdgarClient(user_agent=USER_AGENT, base_url=server.base_url, rate_limit=100, metrics=Metrics())
+        responses = [client.get_json(SUBMISSIONS_URL) for _ in range(2)]
+
+        assert [data['name'] for data in responses] == ['Apple Inc.', 'Apple Inc.']
+        assert server.stats.snapshot()['by_status'] == {'200': 2, '429': 1}
+        assert client.metrics.value('http_retries_total', endpoint='submissions', status=429) == 1
+        assert client.metrics.value('http_throttled_total', endpoint='submissions') == 1
+
+
+def test_429_is_returned_after_max_retries():
+    with ReplayServer(REPLAY_FIXTURES_DIR, rate_limit=None, error_rate=1.0, error_statuses=(429,),
+                      retry_after=0) as server:
+        client = EdgarClient(user_agent=USER_AGENT, base_url=server.base_url, max_retries=2, metrics=Metrics())
+        response = client.get(SUBMISSIONS_URL)
+
+        assert response.status_code == 429
+        assert server.stats.snapshot()['requests'] == 3
+        assert client.metrics.value('http_retries_total', endpoint='submissions', status=429) == 2
+
+
+def test_negative_max_retries_is_rejected():
+    with pytest.raises(ValueError, match='max_retries'):
+        EdgarClient(user_agent=USER_AGENT, max_retries=-1)
+
+
+@pytest.mark.parametrize('user_agent', [None, '', '   ', 'Your Name (your.email@domain.com)',
+                                        'Sample Company Name admin@company.com'])
+def test_missing_or_placeholder_user_agent_is_rejected(monkeypatch, user_agent):
+    monkeypatch.delenv('SEC_USER_AGENT', raising=False)
+    with pytest.raises(ValueError, match='User-Agent'):
+        EdgarClient(user_agent=user_agent)
+
+
+def test_user_agent_falls_back_to_environment(monkeypatch):
+    monkeypatch.setenv('SEC_USER_AGENT', USER_AGENT)
+    assert EdgarClient().session.headers['User-Agent'] == USER_AGENT
+
+    monkeypatch.setenv('SEC_USER_AGENT', 'your name (your.email@domain.com)')
+    with pytest.raises(ValueError, match='User-Agent'):
+        EdgarClient()
+
+
+def test_token_bucket_paces_acquires():
+    bucket = TokenBucket(rate=20, capacity=1)
+
+    started = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+
+    # The first token is available at once, every later one 1/rate apart
+    assert time.monotonic() - started >= 5 / 20
+
+
+def test_concurrent_requests_share_the_rate_limit(replay_server):
+    client = EdgarClient(user_agent=USER_AGENT, base_url=replay_server.base_url, rate_limit=20,
+                         metrics=Metrics())
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        statuses = list(executor.map(lambda _: client.get(SUBMISSIONS_URL).status_code, range(11)))
+
+    assert statuses == [200] * 11
+    # Threads draw from one bucket, so 11 requests need at least 10 / rate seconds
+    assert time.monotonic() - started >= 10 / 20
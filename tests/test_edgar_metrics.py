@@ -0,0 +1,149 @@
+import io
+import json
+
+import pytest
+import requests
+
+from edgar_metrics import (ConsoleSink, JsonLogSink, Metrics, endpoint_for, prometheus_text,
+                           start_prometheus_server, write_prometheus)
+
+
+@pytest.mark.parametrize('url, endpoint', [
+    ('https://data.sec.gov/submissions/CIK0000320193.json', 'submissions'),
+    ('https://data.sec.gov/api/xbrl/companyfacts/CIK0000320193.json', 'companyfacts'),
+    ('https://data.sec.gov/api/xbrl/frames/us-gaap/Assets/USD/CY2023Q4I.json', 'frames'),
+    ('https://www.sec.gov/files/company_tickers_exchange.json', 'company_tickers'),
+    ('https://www.sec.gov/Archives/edgar/data/320193/000032019323000106/index.json', 'filing_index'),
+    ('https://www.sec.gov/Archives/edgar/data/320193/000032019323000106/aapl-20230930.htm', 'filing_document'),
+    ('https://www.sec.gov/cgi-bin/browse-edgar', 'other'),
+])
+def test_endpoint_for(url, endpoint):
+    assert endpoint_for(url) == endpoint
+
+
+def test_counters():
+    metrics = Metrics()
+    metrics.inc('http_requests_total', endpoint='submissions', status=200)
+    metrics.inc('http_requests_total', endpoint='submissions', status=200)
+    metrics.inc('http_requests_total', endpoint='frames', status=404)
+    metrics.inc('http_response_bytes_total', 512, endpoint='frames')
+
+    assert metrics.value('http_requests_total', status=200, endpoint='submissions') == 2
+    assert metrics.value('http_requests_total', endpoint='submissions', status='200') == 2
+    assert metrics.value('http_requests_total', endpoint='filing_index', status=200) == 0
+    assert metrics.total('http_requests_total') == 3
+    assert metrics.total('http_requests_total', endpoint='frames') == 1
+    assert metrics.value('http_response_bytes_total', endpoint='frames') == 512
+
+    metrics.reset()
+    assert metrics.snapshot() == {'counters': [], 'histograms': []}
+
+
+def test_timed_stages():
+    metrics = Metrics(buckets=(0.5, 60.0))
+    with metrics.timed('parse'):
+        pass
+    with pytest.raises(KeyError):
+        with metrics.timed('parse'):
+            raise KeyError('concept')
+
+    histogram, = metrics.snapshot()['histograms']
+    assert histogram['name'] == 'stage_seconds'
+    assert histogram['labels'] == {'stage': 'parse'}
+    assert histogram['count'] == 2
+    assert histogram['buckets'] == {0.5: 2, 60.0: 2}
+    assert metrics.value('stage_errors_total', stage='parse') == 1
+
+
+def test_events_reach_every_sink():
+    records = []
+
+    def broken_sink(record):
+        raise RuntimeError('sink is down')
+
+    metrics = Metrics(sinks=[broken_sink, records.append])
+    metrics.error('ticker_failed', 'Error processing AAPL: timed out', TimeoutError('timed out'), ticker='AAPL')
+
+    record, = records
+    assert record['event'] == 'ticker_failed'
+    assert record['level'] == 'error'
+    assert record['message'] == 'Error processing AAPL: timed out'
+    assert (record['error'], record['error_type'], record['ticker']) == ('timed out', 'TimeoutError', 'AAPL')
+    assert metrics.value('events_total', event='ticker_failed', level='error') == 1
+
+
+def test_console_sink_filters_by_level():
+    stream = io.StringIO()
+    metrics = Metrics(sinks=[ConsoleSink(level='warning', stream=stream)])
+    metrics.event('http_retry', message='Retrying')
+    metrics.event('cik_not_found', level='warning', message='No CIK found for ticker: ZZZZ')
+    metrics.event('bulk_chunk_failed', level='error')
+
+    assert stream.getvalue() == 'No CIK found for ticker: ZZZZ\nbulk_chunk_failed\n'
+
+
+def test_json_log_sink(tmp_path):
+    path = tmp_path / 'logs' / 'events.jsonl'
+    sink = JsonLogSink(str(path), level='info')
+    metrics = Metrics(sinks=[sink])
+    metrics.event('debug_only', level='debug')
+    metrics.event('http_retry', message='Retrying', attempt=1)
+    metrics.event('document_download_failed', level='error', url='https://www.sec.gov/')
+    sink.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line['event'] for line in lines] == ['http_retry', 'document_download_failed']
+    assert lines[0]['attempt'] == 1
+
+
+def test_prometheus_text():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.inc('http_requests_total', endpoint='submissions', status=200)
+    metrics.inc('http_errors_total', endpoint='frames', error='Connection "reset"')
+    metrics.observe('http_request_seconds', 0.25, endpoint='submissions')
+
+    assert prometheus_text(metrics) == '\n'.join([
+        '# HELP edgar_http_errors_total Requests that failed without a response',
+        '# TYPE edgar_http_errors_total counter',
+        'edgar_http_errors_total{endpoint="frames",error="Connection \\"reset\\""} 1',
+        '# HELP edgar_http_requests_total HTTP responses received from EDGAR',
+        '# TYPE edgar_http_requests_total counter',
+        'edgar_http_requests_total{endpoint="submissions",status="200"} 1',
+        '# HELP edgar_http_request_seconds EDGAR request latency (streamed responses: until headers)',
+        '# TYPE edgar_http_request_seconds histogram',
+        'edgar_http_request_seconds_bucket{endpoint="submissions",le="0.1"} 0',
+        'edgar_http_request_seconds_bucket{endpoint="submissions",le="1.0"} 1',
+        'edgar_http_request_seconds_bucket{endpoint="submissions",le="+Inf"} 1',
+        'edgar_http_request_seconds_sum{endpoint="submissions"} 0.25',
+        'edgar_http_request_seconds_count{endpoint="submissions"} 1',
+    ]) + '\n'
+
+
+def test_write_and_serve_prometheus(tmp_path):
+    metrics = Metrics()
+    metrics.inc('http_throttled_total', endpoint='submissions')
+
+    path = tmp_path / 'edgar.prom'
+    write_prometheus(str(path), metrics)
+    assert path.read_text() == prometheus_text(metrics)
+
+    server = start_prometheus_server(port=0, metrics=metrics)
+    try:
+        base_url = f'http://127.0.0.1:{server.server_address[1]}'
+        response = requests.get(f'{base_url}/metrics', timeout=5)
+        assert response.status_code == 200
+        assert response.text == prometheus_text(metrics)
+        assert requests.get(f'{base_url}/other', timeout=5).status_code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_client_records_requests(client):
+    client.get_json('https://data.sec.gov/submissions/CIK0000320193.json')
+
+    metrics = client.metrics
+    assert metrics.value('http_requests_total', endpoint='submissions', status=200) == 1
+    assert metrics.value('http_response_bytes_total', endpoint='submissions') > 0
+    histogram, = [h for h in metrics.snapshot()['histograms'] if h['name'] == 'http_request_seconds']
+    assert histogram['labels'] == {'endpoint': 'submissions'}
@@ -0,0 +1,95 @@
+import os
+
+import pandas as pd
+import pytest
+
+from fact_warehouse import FactWarehouse
+from filing_store import FilingStore
+from sec_filing_parser import parse_sec_filing
+
+FILING = {
+    'cik': '0000320193',
+    'accession_number': '0000320193-23-000106',
+    'filing_type': '10-K',
+    'filing_date': '2023-11-03',
+    'filing_url': 'https://www.sec.gov/Archives/edgar/data/0000320193/000032019323000106',
+    'primary_document': 'aapl-20230930.htm',
+}
+
+
+@pytest.fixture
+def parsed(client, tmp_path):
+    return parse_sec_filing(FILING['filing_url'], client=client, store=FilingStore(str(tmp_path / 'store')),
+                            primary_document=FILING['primary_document'])
+
+
+@pytest.fixture
+def warehouse(tmp_path):
+    return FactWarehouse(str(tmp_path / 'warehouse'))
+
+
+def facts_frame(concepts, values, **columns):
+    return pd.DataFrame(dict({'concept': concepts, 'value': values, 'context_ref': 'c1'}, **columns))
+
+
+def test_round_trip(warehouse, parsed):
+    written = warehouse.write_filing(FILING, parsed)
+
+    assert [os.path.relpath(path, warehouse.root) for path in written] == [
+        os.path.join(table, 'cik=320193', 'fiscal_year=2023', '000032019323000106.parquet')
+        for table in ('facts', 'text_blocks', 'footnotes')
+    ]
+    facts = warehouse.read()
+    assert len(facts) == len(parsed['xbrl_data'])
+    assert set(facts['accession_number']) == {FILING['accession_number']}
+    assert facts.set_index('concept').loc['Revenues', 'value'] == 383285e6
+    assert warehouse.read('text_blocks')['id'].tolist() == ['tb1']
+
+
+def test_append_skips_existing_accession(warehouse, parsed):
+    warehouse.write_filing(FILING, parsed)
+
+    assert warehouse.has_accession('320193', '000032019323000106')
+    assert warehouse.write_filing(FILING, parsed) == []
+    assert len(warehouse.read()) == len(parsed['xbrl_data'])
+
+
+def test_filters_are_pushed_down(warehouse, parsed):
+    warehouse.write_filing(FILING, parsed)
+    other = dict(FILING, cik='789019', accession_number='0000950170-23-035122', filing_type='10-Q')
+    warehouse.write_filing(other, {'xbrl_data': facts_frame(['Revenues'], [211915e6],
+                                                            end=pd.Timestamp('2023-06-30'))}, fiscal_year=2023)
+
+    assert warehouse.read(ciks=['789019'])['value'].tolist() == [211915e6]
+    assert warehouse.read(concepts=['Revenues'])['cik'].tolist() == [320193, 789019]
+    assert warehouse.read(form_types=['10-Q'], columns=['concept'])['concept'].tolist() == ['Revenues']
+    dated = warehouse.read(start_date='2023-09-01', end_date='2023-12-31')
+    assert set(dated['cik']) == {320193}
+    assert warehouse.read(end_date='2023-07-31')['cik'].tolist() == [789019]
+
+
+def test_fiscal_year_prefers_dei_cover_facts(warehouse):
+    facts = facts_frame(['DocumentFiscalYearFocus', 'Revenues'], [None, 1.0],
+                        value_text=['2022', None],
+                        start=[pd.NaT, pd.Timestamp('2022-10-01')], end=[pd.NaT, pd.Timestamp('2023-09-30')])
+
+    written = warehouse.write_filing(FILING, {'xbrl_data': facts})
+
+    assert 'fiscal_year=2022' in written[0]
+
+
+def test_string_values_are_split_into_value_text(warehouse):
+    # Fact tables from parse_xbrl(compact=False) hold every value as a string
+    facts = facts_frame(['Assets', 'DocumentType'], ['352583000000', '10-K'])
+
+    warehouse.write_filing(FILING, {'xbrl_data': facts}, fiscal_year=2023)
+
+    stored = warehouse.read().set_index('concept')
+    assert stored.loc['Assets', 'value'] == 352583e6
+    assert pd.isna(stored.loc['Assets', 'value_text'])
+    assert pd.isna(stored.loc['DocumentType', 'value'])
+    assert stored.loc['DocumentType', 'value_text'] == '10-K'
+
+
+def test_read_empty_warehouse(warehouse):
+    assert warehouse.read().empty
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from filing_store import FilingStore, document_name, open_document
+
+CIK = '320193'
+ACCESSION = '0000320193-23-000106'
+CONTENT = b'<html><body>' + b'<p>Net sales by category.</p>' * 200 + b'</body></html>'
+SUFFIXES = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+@pytest.fixture(params=[None, 'gzip', 'zstd'])
+def compression(request):
+    if request.param == 'zstd':
+        pytest.importorskip('zstandard')
+    return request.param
+
+
+def read(path):
+    with open_document(path) as f:
+        return f.read()
+
+
+def commit_partial(store, filename, content):
+    # What _stream_document leaves behind before committing a download
+    partial_path = store.partial_path(CIK, ACCESSION, filename)
+    os.makedirs(os.path.dirname(partial_path), exist_ok=True)
+    with open(partial_path, 'wb') as f:
+        f.write(content)
+    return store.commit(CIK, ACCESSION, filename, url=f'https://www.sec.gov/{filename}')
+
+
+def test_write_round_trip(tmp_path, compression):
+    store = FilingStore(str(tmp_path), compression=compression)
+
+    path = store.write(CIK, ACCESSION, 'aapl-20230930.htm', CONTENT)
+
+    assert path.endswith('aapl-20230930.htm' + SUFFIXES[compression])
+    assert document_name(path) == 'aapl-20230930.htm'
+    assert read(path) == CONTENT
+    entry = store.manifest(CIK, ACCESSION)['aapl-20230930.htm']
+    assert entry['compression'] == compression
+    assert entry['raw_size'] == len(CONTENT)
+    assert entry['size'] == os.path.getsize(path)
+    if compression:
+        assert entry['size'] < len(CONTENT)
+    assert store.has(CIK, ACCESSION, 'aapl-20230930.htm')
+
+
+def test_commit_round_trip(tmp_path, compression):
+    store = FilingStore(str(tmp_path), compression=compression)
+
+    path = commit_partial(store, 'aapl-20230930.htm', CONTENT)
+
+    assert read(path) == CONTENT
+    assert not os.path.exists(store.partial_path(CIK, ACCESSION, 'aapl-20230930.htm'))
+    assert store.documents(CIK, ACCESSION) == {'aapl-20230930.htm': path}
+
+
+def test_manifest_mixes_compressed_and_raw_documents(tmp_path, compression):
+    root = str(tmp_path)
+    FilingStore(root).write(CIK, ACCESSION, 'index.json', b'{"directory": {}}')
+    commit_partial(FilingStore(root, compression='gzip'), 'aapl-20230930.htm', CONTENT)
+    FilingStore(root, compression=compression).write(CIK, ACCESSION, 'ex21.htm', b'<p>Subsidiaries</p>')
+
+    store = FilingStore(root)
+    documents = store.documents(CIK, ACCESSION)
+
+    assert sorted(documents) == ['aapl-20230930.htm', 'ex21.htm', 'index.json']
+    assert documents['aapl-20230930.htm'].endswith('.gz')
+    assert documents['ex21.htm'].endswith('ex21.htm' + SUFFIXES[compression])
+    assert read(documents['index.json']) == b'{"directory": {}}'
+    assert read(documents['aapl-20230930.htm']) == CONTENT
+    assert read(documents['ex21.htm']) == b'<p>Subsidiaries</p>'
+
+
+def test_recompressing_removes_the_old_copy(tmp_path):
+    root = str(tmp_path)
+    raw_path = FilingStore(root).write(CIK, ACCESSION, 'aapl-20230930.htm', CONTENT)
+
+    gzip_path = FilingStore(root, compression='gzip').write(CIK, ACCESSION, 'aapl-20230930.htm', CONTENT)
+
+    assert not os.path.exists(raw_path)
+    assert FilingStore(root).documents(CIK, ACCESSION) == {'aapl-20230930.htm': gzip_path}
+
+
+def test_unknown_compression(tmp_path):
+    with pytest.raises(ValueError):
+        FilingStore(str(tmp_path), compression='brotli')
@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from frames_panel import FramesPanel, build_frames_panel, load_or_build_panel
+from sec_frames import fetch_frames_grid
+
+PERIODS = ['CY2023Q4I', 'CY2022', 'CY2023', 'CY2022Q4I']
+
+
+@pytest.fixture
+def frames(client):
+    return fetch_frames_grid(['Assets', 'Revenues'], periods=PERIODS, client=client)
+
+
+@pytest.fixture
+def panel(frames):
+    return build_frames_panel(frames)
+
+
+def assert_panels_equal(left, right):
+    assert left.ciks.tolist() == right.ciks.tolist()
+    assert left.periods.tolist() == right.periods.tolist()
+    assert left.tags == right.tags
+    for tag in left.tags:
+        np.testing.assert_array_equal(left.get(tag), right.get(tag))
+
+
+def test_build_frames_panel(panel):
+    assert panel.ciks.tolist() == [320193, 789019]
+    # Periods are ordered chronologically, not as requested
+    assert panel.periods.tolist() == ['CY2022', 'CY2022Q4I', 'CY2023', 'CY2023Q4I']
+    assert panel.tags == ['Assets', 'Revenues']
+
+    np.testing.assert_array_equal(panel.get('Assets'), [
+        [np.nan, 346747e6, np.nan, 353514e6],
+        [np.nan, 364552e6, np.nan, 470558e6],
+    ])
+    np.testing.assert_array_equal(panel.cross_section('Revenues', 'CY2023'), [383285e6, 211915e6])
+    assert np.isnan(panel.cross_section('Revenues', 'CY2022')[1])
+
+
+def test_lookups(panel):
+    assert panel.cik_codes(['0000789019', 320193, 1]).tolist() == [1, 0, -1]
+    assert panel.period_code('CY2023') == 2
+    assert panel.period_code('CY2019') == -1
+
+    frame = panel.to_frame('Revenues')
+    assert frame.index.name == 'cik'
+    assert frame.loc[320193, 'CY2022'] == 394328e6
+
+
+def test_lookups_on_empty_panel():
+    panel = FramesPanel(np.array([], dtype=np.int64), np.array([], dtype=str), {})
+
+    assert panel.cik_codes(['0000320193', 789019]).tolist() == [-1, -1]
+    assert panel.cik_codes([]).tolist() == []
+    assert panel.period_code('CY2023') == -1
+
+
+def test_unit_filter_and_mixed_units(frames):
+    mixed = pd.concat([frames, frames.head(1).assign(unit='shares', tag='Assets')], ignore_index=True)
+
+    with pytest.raises(ValueError, match='several units'):
+        build_frames_panel(mixed)
+    assert build_frames_panel(mixed, unit='USD').tags == ['Assets', 'Revenues']
+
+
+def test_save_and_load(panel, tmp_path):
+    path = str(tmp_path / 'panels' / 'panel.npz')
+    panel.save(path)
+
+    assert_panels_equal(FramesPanel.load(path), panel)
+    assert os.listdir(os.path.dirname(path)) == ['panel.npz']
+
+
+def test_load_or_build_panel(panel, tmp_path):
+    path = str(tmp_path / 'panel.npz')
+    builds = []
+
+    def build():
+        builds.append(1)
+        return panel
+
+    first = load_or_build_panel(path, build)
+    second = load_or_build_panel(path, build)
+
+    assert len(builds) == 1
+    assert_panels_equal(second, first)
+    load_or_build_panel(path, build, max_age=0)
+    assert len(builds) == 2
@@ -0,0 +1,96 @@
+import io
+
+import pytest
+
+from html_extract import SECTION_COLUMNS, TEXT_COLUMNS, extract_html_text
+
+# A table of contents repeats the Item headings ahead of the real sections
+DOCUMENT = b'''<html><head><title>10-K</title><style>p { margin: 0 }</style></head><body>
+<table>
+<tr><td>Item 1.</td><td>Business</td></tr>
+</table>
+<p>Item 1. Business</p>
+<p>Item 7. MD&amp;A</p>
+<p>Item 1. Business</p>
+<p>The Company designs <b>smartphones</b>,&nbsp;tablets and wearables.</p>
+<div class="textBlock" id="tb1"><p>Revenue Recognition</p><p>Net sales consist of <i>hardware</i> and services.</p></div>
+<p>Item 7. Management&#8217;s Discussion and Analysis</p>
+<table><tr><td>Net sales</td><td>383,285</td></tr></table>
+<div class="footnote extra" id="fn1"><p>(1) Includes deferred revenue.</p></div>
+<div class="footnote"><script>var x = 1;</script><p>(2) Unaudited.</p></div>
+</body></html>
+'''
+
+
+def extract(**kwargs):
+    return extract_html_text(io.BytesIO(DOCUMENT), **kwargs)
+
+
+def test_text_blocks_and_footnotes():
+    result = extract(engine='lxml')
+
+    assert list(result['text_blocks'].columns) == TEXT_COLUMNS
+    assert result['text_blocks'].to_dict('records') == [{
+        'text': 'Revenue Recognition Net sales consist of hardware and services.',
+        'type': 'text_block',
+        'id': 'tb1',
+    }]
+    assert result['footnotes'][['text', 'id']].values.tolist() == [
+        ['(1) Includes deferred revenue.', 'fn1'],
+        ['(2) Unaudited.', ''],
+    ]
+
+
+def test_item_sections():
+    sections = extract(engine='lxml')['sections']
+
+    assert list(sections.columns) == SECTION_COLUMNS
+    # The table-of-contents entries lose to the headings with the most text
+    assert sections['item'].tolist() == ['1', '7']
+    business, mdna = sections.to_dict('records')
+    assert business['title'] == 'Business'
+    assert business['text'].startswith('The Company designs smartphones, tablets and wearables.')
+    assert mdna['title'] == 'Management’s Discussion and Analysis'
+    assert mdna['text'].startswith('Net sales 383,285')
+
+
+def test_inline_text_next_to_blocks_keeps_document_order():
+    document = (b'<html><body><div>Item 1. Business</div>'
+                b'<div><span>Lead</span><p>para</p> tail text</div>'
+                b'<div>Outer <b>intro</b><div><p>inner</p> after</div> end</div>'
+                b'<div>Item 2. Properties</div><p>a <b>b</b> c</p></body></html>')
+
+    sections = extract_html_text(io.BytesIO(document), engine='lxml')['sections']
+
+    assert sections[['item', 'text']].values.tolist() == [
+        ['1', 'Lead para tail text Outer intro inner after end'],
+        ['2', 'a b c'],
+    ]
+
+
+def test_sections_can_be_skipped():
+    assert 'sections' not in extract(engine='lxml', sections=False)
+
+
+def test_engines_find_the_same_records():
+    lxml_result = extract(engine='lxml')
+    bs4_result = extract(engine='bs4')
+
+    assert 'sections' not in bs4_result
+    for table in ('text_blocks', 'footnotes'):
+        assert bs4_result[table][['type', 'id']].equals(lxml_result[table][['type', 'id']])
+    # bs4 keeps get_text(strip=True) text, without the spaces between strings
+    assert bs4_result['text_blocks']['text'].tolist() == [
+        'Revenue RecognitionNet sales consist ofhardwareand services.']
+
+
+def test_reads_paths(tmp_path):
+    path = tmp_path / 'aapl-20230930.htm'
+    path.write_bytes(DOCUMENT)
+
+    assert extract_html_text(str(path))['sections'].equals(extract()['sections'])
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError, match='Unknown HTML engine'):
+        extract(engine='regex')
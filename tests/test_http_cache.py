@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+from edgar_client import EdgarClient
+from edgar_metrics import Metrics
+from http_cache import HttpCache
+from tests import USER_AGENT
+
+SUBMISSIONS_URL = 'https://data.sec.gov/submissions/CIK0000320193.json'
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return HttpCache(str(tmp_path / 'cache'))
+
+
+def cached_client(replay_server, cache):
+    return EdgarClient(user_agent=USER_AGENT, base_url=replay_server.base_url, cache=cache, metrics=Metrics())
+
+
+def test_ttl_for_uses_longest_prefix(tmp_path):
+    cache = HttpCache(str(tmp_path), ttls={'https://data.sec.gov/': 10, 'https://data.sec.gov/api/xbrl/': 60},
+                      default_ttl=1)
+
+    assert cache.ttl_for('https://data.sec.gov/api/xbrl/frames/us-gaap/Assets/USD/CY2023Q4I.json') == 60
+    assert cache.ttl_for(SUBMISSIONS_URL) == 10
+    assert cache.ttl_for('https://www.sec.gov/files/company_tickers.json') == 1
+
+
+def test_store_and_lookup(cache):
+    assert cache.lookup(SUBMISSIONS_URL) is None
+    assert cache.conditional_headers(None) == {}
+
+    cache.store(SUBMISSIONS_URL, b'{"name": "Apple Inc."}',
+                {'ETag': '"abc"', 'Last-Modified': 'Fri, 03 Nov 2023 18:00:00 GMT'})
+
+    entry = cache.lookup(SUBMISSIONS_URL)
+    assert entry['size'] == 22
+    assert cache.is_fresh(entry)
+    assert cache.read(SUBMISSIONS_URL) == b'{"name": "Apple Inc."}'
+    assert cache.conditional_headers(entry) == {
+        'If-None-Match': '"abc"', 'If-Modified-Since': 'Fri, 03 Nov 2023 18:00:00 GMT'}
+
+    # Past its TTL an entry is stale until revalidated
+    entry['stored_at'] -= cache.ttl_for(SUBMISSIONS_URL) + 1
+    assert not cache.is_fresh(entry)
+    cache.revalidated(SUBMISSIONS_URL)
+    assert cache.is_fresh(cache.lookup(SUBMISSIONS_URL))
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=10)
+    cache.store('https://www.sec.gov/a', b'aaaa', {})
+    time.sleep(0.01)
+    cache.store('https://www.sec.gov/b', b'bbbb', {})
+    time.sleep(0.01)
+    cache.read('https://www.sec.gov/a')
+    time.sleep(0.01)
+
+    cache.store('https://www.sec.gov/c', b'cccc', {})
+
+    assert cache.lookup('https://www.sec.gov/b') is None
+    assert cache.read('https://www.sec.gov/a') == b'aaaa'
+    assert cache.read('https://www.sec.gov/c') == b'cccc'
+
+
+def test_clear(cache):
+    cache.store(SUBMISSIONS_URL, b'{}', {})
+    cache.clear()
+    assert cache.lookup(SUBMISSIONS_URL) is None
+
+
+def test_fresh_entry_is_served_without_a_request(replay_server, cache):
+    client = cached_client(replay_server, cache)
+
+    first = client.get_json(SUBMISSIONS_URL)
+    second = client.get_json(SUBMISSIONS_URL)
+
+    assert second == first
+    assert replay_server.stats.snapshot()['requests'] == 1
+    assert client.metrics.value('http_cache_total', endpoint='submissions', result='miss') == 1
+    assert client.metrics.value('http_cache_total', endpoint='submissions', result='hit') == 1
+
+
+def test_stale_entry_is_revalidated_with_conditional_get(replay_server, tmp_path):
+    client = cached_client(replay_server, HttpCache(str(tmp_path), ttls={}))
+
+    first = client.get_json(SUBMISSIONS_URL)
+    second = client.get_json(SUBMISSIONS_URL)
+
+    assert second == first
+    assert replay_server.stats.snapshot()['by_status'] == {'200': 1, '304': 1}
+    assert client.metrics.value('http_cache_total', endpoint='submissions', result='revalidated') == 1
+
+
+def test_missing_ok_caches_404(replay_server, cache):
+    client = cached_client(replay_server, cache)
+    url = 'https://data.sec.gov/submissions/CIK0000000001.json'
+
+    assert client.get_json(url, missing_ok=True) is None
+    assert client.get_json(url, missing_ok=True) is None
+    assert replay_server.stats.snapshot()['by_status'] == {'404': 1}
@@ -0,0 +1,114 @@
+import json
+import os
+
+import pytest
+
+from sec import _filter_filings_frame, _overflow_page_urls, extract_filings, get_sp500_sec_filings
+from tests import REPLAY_FIXTURES_DIR
+
+# GOOGL resolves to a CIK without a submissions fixture, so its request fails
+TICKERS = ['AAPL', 'GOOGL', 'MSFT']
+
+
+def load_submissions(cik):
+    with open(os.path.join(REPLAY_FIXTURES_DIR, 'data.sec.gov', 'submissions', f'CIK{cik}.json')) as f:
+        return json.load(f)
+
+
+def loop_filter(recent, filing_types, start_date, end_date):
+    # The per-row loop extract_filings used before the vectorized filter
+    matches = []
+    for filing in recent.get('accessionNumber', []):
+        filing_index = recent['accessionNumber'].index(filing)
+        filing_type = recent['form'][filing_index]
+        filing_date = recent['filingDate'][filing_index]
+        if filing_type in filing_types and start_date <= filing_date <= end_date:
+            matches.append((filing, filing_type, filing_date))
+    return matches
+
+
+def crawl(client, **kwargs):
+    return get_sp500_sec_filings(['10-K', '10-Q'], start_date='2023-01-01', end_date='2024-12-31',
+                                 client=client, tickers=TICKERS, **kwargs)
+
+
+@pytest.mark.parametrize('concurrent', [False, True])
+def test_failing_cik_does_not_stop_the_crawl(client, events, concurrent):
+    filings = crawl(client, concurrent=concurrent)
+
+    assert [(f['ticker'], f['accession_number']) for f in filings] == [
+        ('AAPL', '0000320193-23-000106'),
+        ('MSFT', '0000950170-24-087843'),
+        ('MSFT', '0000950170-24-048288'),
+        ('MSFT', '0000950170-24-008814'),
+        ('MSFT', '0000950170-23-054855'),
+    ]
+    failures = [event for event in events if event['event'] == 'ticker_failed']
+    assert [event['ticker'] for event in failures] == ['GOOGL']
+
+
+def test_concurrent_crawl_matches_sequential(client):
+    sequential = crawl(client, as_dataframe=True)
+    concurrent = crawl(client, as_dataframe=True, concurrent=True, max_concurrency=3)
+
+    assert len(sequential) == 5
+    assert concurrent.equals(sequential)
+
+
+@pytest.mark.parametrize('filing_types, start_date, end_date', [
+    (['10-K', '10-Q'], '2023-01-01', '2024-12-31'),
+    (['10-K'], '2023-01-01', '2024-12-31'),
+    (['8-K', '10-Q'], '2023-10-24', '2024-01-30'),  # both ends are inclusive
+    (['10-Q'], '2024-01-31', '2024-04-25'),
+    (['S-1'], '2000-01-01', '2099-12-31'),
+])
+def test_filter_matches_row_loop(filing_types, start_date, end_date):
+    recent = load_submissions('0000789019')['filings']['recent']
+
+    frame = _filter_filings_frame(recent, filing_types, start_date, end_date)
+
+    expected = loop_filter(recent, filing_types, start_date, end_date)
+    assert frame[['accession_number', 'filing_type', 'filing_date']].values.tolist() == [
+        list(match) for match in expected
+    ]
+    primary_documents = dict(zip(recent['accessionNumber'], recent['primaryDocument']))
+    assert frame['primary_document'].tolist() == [primary_documents[match[0]] for match in expected]
+
+
+def test_filter_empty_submissions():
+    frame = _filter_filings_frame({}, ['10-K'], '2023-01-01', '2023-12-31')
+
+    assert loop_filter({}, ['10-K'], '2023-01-01', '2023-12-31') == []
+    assert frame.empty
+    assert list(frame.columns) == ['accession_number', 'filing_type', 'filing_date', 'primary_document']
+    assert extract_filings({}, 'AAPL', '0000320193', ['10-K'], '2023-01-01', '2023-12-31') == []
+
+
+def test_overflow_page_urls_skip_pages_outside_window():
+    data = load_submissions('0000789019')
+
+    assert _overflow_page_urls(data, '2023-01-01', '2024-12-31') == [
+        'https://data.sec.gov/submissions/CIK0000789019-submissions-001.json',
+    ]
+    assert len(_overflow_page_urls(data, '1990-01-01', '2024-12-31')) == 2
+    assert _overflow_page_urls(data, '2024-01-01', '2024-12-31') == []
+
+
+@pytest.mark.parametrize('concurrent', [False, True])
+def test_full_history_merges_overflow_pages(client, replay_server, events, concurrent):
+    filings = get_sp500_sec_filings(['10-K', '10-Q'], start_date='2023-01-01', end_date='2024-12-31',
+                                    client=client, tickers=['MSFT'], full_history=True, concurrent=concurrent)
+
+    # Older filings come from page 001; the one listed on both is kept once
+    assert [(f['filing_date'], f['accession_number']) for f in filings] == [
+        ('2024-07-30', '0000950170-24-087843'),
+        ('2024-04-25', '0000950170-24-048288'),
+        ('2024-01-30', '0000950170-24-008814'),
+        ('2023-10-24', '0000950170-23-054855'),
+        ('2023-07-27', '0000950170-23-035122'),
+        ('2023-04-25', '0000950170-23-014423'),
+    ]
+    assert filings[4]['primary_document'] == 'msft-20230630.htm'
+    # Page 002 lies before the window and is never requested
+    assert replay_server.stats.snapshot()['by_status'] == {'200': 3}
+    assert not [event for event in events if event['event'] == 'submissions_page_failed']
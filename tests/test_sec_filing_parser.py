@@ -0,0 +1,151 @@
+import os
+import shutil
+
+import pytest
+
+from edgar_metrics import endpoint_for
+from filing_store import FilingStore, parse_filing_url
+from sec_filing_parser import download_sec_filing, parse_sec_filing
+from tests import REPLAY_FIXTURES_DIR
+
+FILING_URL = 'https://www.sec.gov/Archives/edgar/data/0000320193/000032019323000106'
+PRIMARY_DOCUMENT = 'aapl-20230930.htm'
+PRIMARY_FIXTURE = os.path.join(REPLAY_FIXTURES_DIR, 'www.sec.gov', 'Archives', 'edgar', 'data', '320193',
+                               '000032019323000106', PRIMARY_DOCUMENT)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FilingStore(str(tmp_path / 'sec_filings'))
+
+
+def read_fixture():
+    with open(PRIMARY_FIXTURE, 'rb') as f:
+        return f.read()
+
+
+def fixture_etag():
+    # The replay server derives its ETags from the fixture's size and mtime
+    stat = os.stat(PRIMARY_FIXTURE)
+    return f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+
+
+def write_partial(store, content, validator=None):
+    # What an interrupted download leaves behind in the store
+    cik, accession = parse_filing_url(FILING_URL)[:2]
+    path = store.partial_path(cik, accession, PRIMARY_DOCUMENT)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    if validator:
+        with open(store.partial_validator_path(cik, accession, PRIMARY_DOCUMENT), 'w') as f:
+            f.write(validator)
+
+
+def test_download_skips_instance_of_inline_filing(client, store, replay_server):
+    files = download_sec_filing(FILING_URL, client=client, store=store, primary_document=PRIMARY_DOCUMENT)
+
+    # The instance and exhibit are listed in index.json but not fetched
+    assert list(files) == ['primary']
+    with open(files['primary'][0], 'rb') as f:
+        assert f.read() == read_fixture()
+    assert replay_server.stats.snapshot()['by_status'] == {'200': 2}
+
+
+def test_download_resumes_partial_document_with_range(client, store, replay_server):
+    content = read_fixture()
+    write_partial(store, content[:1000], fixture_etag())
+
+    files = download_sec_filing(FILING_URL, client=client, store=store, primary_document=PRIMARY_DOCUMENT)
+
+    with open(files['primary'][0], 'rb') as f:
+        assert f.read() == content
+    assert replay_server.stats.snapshot()['by_status'] == {'200': 1, '206': 1}
+    # Only the missing tail was transferred
+    endpoint = endpoint_for(f'{FILING_URL}/{PRIMARY_DOCUMENT}')
+    assert client.metrics.value('http_response_bytes_total', endpoint=endpoint) == len(content) - 1000
+
+
+def test_download_commits_complete_partial_document(client, store, replay_server):
+    content = read_fixture()
+    write_partial(store, content, fixture_etag())
+
+    files = download_sec_filing(FILING_URL, client=client, store=store, primary_document=PRIMARY_DOCUMENT)
+
+    with open(files['primary'][0], 'rb') as f:
+        assert f.read() == content
+    assert replay_server.stats.snapshot()['by_status'] == {'200': 1, '416': 1}
+
+
+def test_download_refetches_oversized_partial_document(client, store, replay_server):
+    # A 416 for a partial file larger than the document (e.g. it changed
+    # upstream) must not commit the stale bytes
+    content = read_fixture()
+    write_partial(store, content + b'stale tail', fixture_etag())
+
+    files = download_sec_filing(FILING_URL, client=client, store=store, primary_document=PRIMARY_DOCUMENT)
+
+    with open(files['primary'][0], 'rb') as f:
+        assert f.read() == content
+    assert replay_server.stats.snapshot()['by_status'] == {'200': 2, '416': 1}
+
+
+def test_download_restarts_when_document_changed_since_partial(client, store, replay_server, tmp_path):
+    fixtures_dir = str(tmp_path / 'replay')
+    shutil.copytree(REPLAY_FIXTURES_DIR, fixtures_dir)
+    replay_server.fixtures_dir = fixtures_dir
+    fixture = os.path.join(fixtures_dir, os.path.relpath(PRIMARY_FIXTURE, REPLAY_FIXTURES_DIR))
+    url = f'https://www.sec.gov/Archives/edgar/data/320193/000032019323000106/{PRIMARY_DOCUMENT}'
+
+    # The first attempt is cut off after 1000 bytes
+    with client.get(url, stream=True) as response:
+        write_partial(store, next(response.iter_content(chunk_size=1000)), response.headers['ETag'])
+    # The document is amended upstream before the retry
+    content = read_fixture().replace(b'</body>', b'<p>Amended.</p></body>')
+    with open(fixture, 'wb') as f:
+        f.write(content)
+
+    files = download_sec_filing(FILING_URL, client=client, store=store, primary_document=PRIMARY_DOCUMENT)
+
+    with open(files['primary'][0], 'rb') as f:
+        assert f.read() == content
+    # If-Range did not match, so the server sent the whole new document
+    assert replay_server.stats.snapshot()['by_status'] == {'200': 3}
+    assert client.metrics.value('http_response_bytes_total', endpoint=endpoint_for(url)) == len(content)
+    cik, accession = parse_filing_url(FILING_URL)[:2]
+    assert not os.path.exists(store.partial_validator_path(cik, accession, PRIMARY_DOCUMENT))
+
+
+def test_download_refetches_partial_document_without_validator(client, store, replay_server):
+    content = read_fixture()
+    write_partial(store, b'unverifiable bytes')
+
+    files = download_sec_filing(FILING_URL, client=client, store=store, primary_document=PRIMARY_DOCUMENT)
+
+    with open(files['primary'][0], 'rb') as f:
+        assert f.read() == content
+    assert replay_server.stats.snapshot()['by_status'] == {'200': 2}
+
+
+def test_parse_filing(client, store):
+    parsed = parse_sec_filing(FILING_URL, client=client, store=store, primary_document=PRIMARY_DOCUMENT)
+
+    facts = parsed['xbrl_data'].set_index('concept')
+    assert facts.loc['Revenues', 'value'] == 383285e6
+    assert facts.loc['Assets', 'value'] == 352583e6
+    assert str(facts.loc['Assets', 'instant'].date()) == '2023-09-30'
+    assert facts.loc['DocumentType', 'value_text'] == '10-K'
+    assert parsed['sections']['item'].tolist() == ['1', '7', '8']
+    assert parsed['text_blocks']['id'].tolist() == ['tb1']
+    assert parsed['footnotes']['id'].tolist() == ['fn1']
+
+
+def test_parse_offline_from_store(client, store, replay_server):
+    online = parse_sec_filing(FILING_URL, client=client, store=store, primary_document=PRIMARY_DOCUMENT)
+    replay_server.stats.reset()
+
+    offline = parse_sec_filing(FILING_URL, store=store, offline=True, primary_document=PRIMARY_DOCUMENT)
+
+    assert replay_server.stats.snapshot()['requests'] == 0
+    assert offline['xbrl_data'].equals(online['xbrl_data'])
+    assert offline['sections'].equals(online['sections'])
@@ -0,0 +1,68 @@
+from edgar_client import EdgarClient
+from edgar_metrics import Metrics
+from http_cache import HttpCache
+from sec_frames import FRAMES_COLUMNS, fetch_frames_grid, fetch_sec_frames_data, frame_periods
+from tests import USER_AGENT
+
+# Fixtures hold Assets for CY2022Q4I/CY2023Q4I and Revenues for CY2022/CY2023;
+# every other cell of this grid is a 404
+TAGS = ['Assets', 'Revenues']
+PERIODS = ['CY2022', 'CY2022Q4I', 'CY2023', 'CY2023Q4I']
+
+
+def test_frame_periods():
+    assert frame_periods(2023, 2023) == [
+        'CY2023', 'CY2023Q1', 'CY2023Q1I', 'CY2023Q2', 'CY2023Q2I',
+        'CY2023Q3', 'CY2023Q3I', 'CY2023Q4', 'CY2023Q4I',
+    ]
+    assert frame_periods(2022, 2023, quarterly=False, instant=False) == ['CY2022', 'CY2023']
+
+
+def test_fetch_frames_grid(client, events):
+    frame = fetch_frames_grid(TAGS, periods=PERIODS, client=client)
+
+    assert list(frame.columns) == FRAMES_COLUMNS
+    assert len(frame) == 7
+    assert str(frame['tag'].dtype) == 'category'
+    assets = frame[(frame['tag'] == 'Assets') & (frame['period'] == 'CY2023Q4I')].set_index('cik')
+    assert assets.loc[789019, 'value'] == 470558e6
+    assert str(assets.loc[320193, 'end'].date()) == '2023-12-30'
+    revenues = frame[frame['tag'] == 'Revenues'].set_index(['period', 'cik'])
+    assert str(revenues.loc[('CY2023', 320193), 'start'].date()) == '2022-09-25'
+    # 404 cells are skipped, not reported
+    assert not [event for event in events if event['event'] == 'frame_fetch_failed']
+
+
+def test_fetch_frames_grid_is_served_from_cache(replay_server, tmp_path):
+    client = EdgarClient(user_agent=USER_AGENT, base_url=replay_server.base_url, metrics=Metrics(),
+                         cache=HttpCache(str(tmp_path / 'cache')))
+
+    first = fetch_frames_grid(TAGS, periods=PERIODS, client=client)
+    assert replay_server.stats.snapshot()['by_status'] == {'200': 4, '404': 4}
+    replay_server.stats.reset()
+
+    second = fetch_frames_grid(TAGS, periods=PERIODS, client=client)
+    # Frames, including the 404s, are within their TTL
+    assert replay_server.stats.snapshot()['requests'] == 0
+    assert client.metrics.value('http_cache_total', endpoint='frames', result='hit') == 8
+    assert second.equals(first)
+
+
+def test_fetch_sec_frames_data(client, replay_server):
+    results = fetch_sec_frames_data(['Revenues', 'Assets'], start_year=2022, end_year=2023, client=client)
+
+    assert [entry['frame'] for entry in results['Revenues']] == ['CY2022', 'CY2023', 'CY2023']
+    assert results['Revenues'][1]['val'] == 383285000000
+    # Assets has instant frames only, so no annual data (but no failure either)
+    assert results['Assets'] == []
+
+
+def test_fetch_sec_frames_data_marks_failed_tags_none(replay_server, events):
+    client = EdgarClient(user_agent=USER_AGENT, base_url=replay_server.base_url, max_retries=0,
+                         metrics=Metrics())
+    replay_server.error_rate = 1.0
+
+    results = fetch_sec_frames_data(['Revenues'], start_year=2023, end_year=2023, client=client)
+
+    assert results == {'Revenues': None}
+    assert [event['event'] for event in events] == ['frame_fetch_failed']
@@ -0,0 +1,66 @@
+from sec import get_sp500_sec_filings
+from sync_state import WatermarkStore, watermark_key
+
+
+def filing(accession_number, filing_date, cik='0000320193'):
+    return {'cik': cik, 'accession_number': accession_number, 'filing_date': filing_date}
+
+
+def test_watermark_key():
+    assert watermark_key('320193', ['10-Q', '10-K', '10-K']) == '0000320193|10-K,10-Q'
+    assert watermark_key('0000320193') == '0000320193|*'
+
+
+def test_advance_and_filter_new(tmp_path):
+    store = WatermarkStore(str(tmp_path / 'state.json'))
+    store.advance([filing('0000320193-23-000064', '2023-08-04'), filing('0000320193-23-000106', '2023-11-03'),
+                   filing('0000320193-23-000107', '2023-11-03')], ['10-K'])
+
+    assert store.get('320193', ['10-K']) == {
+        'filing_date': '2023-11-03',
+        'accession_numbers': ['0000320193-23-000106', '0000320193-23-000107'],
+        'last_accession': '0000320193-23-000107',
+    }
+    new = store.filter_new([filing('0000320193-23-000064', '2023-08-04'),
+                            filing('0000320193-23-000106', '2023-11-03'),
+                            filing('0000320193-23-000110', '2023-11-03'),
+                            filing('0000320193-24-000006', '2024-02-02'),
+                            filing('0000789019-23-000014', '2023-01-01', cik='0000789019')], ['10-K'])
+    # Same-day filings not seen yet are kept; other CIKs have no watermark
+    assert [f['accession_number'] for f in new] == [
+        '0000320193-23-000110', '0000320193-24-000006', '0000789019-23-000014']
+
+
+def test_start_date(tmp_path):
+    store = WatermarkStore(str(tmp_path / 'state.json'))
+    assert store.start_date('320193', '2023-01-01', ['10-K']) == '2023-01-01'
+
+    store.advance([filing('0000320193-23-000106', '2023-11-03')], ['10-K'])
+
+    assert store.start_date('320193', '2023-01-01', ['10-K']) == '2023-11-03'
+    assert store.start_date('320193', '2024-01-01', ['10-K']) == '2024-01-01'
+    # A crawl for other forms has its own watermark
+    assert store.start_date('320193', '2023-01-01', ['8-K']) == '2023-01-01'
+
+
+def test_save_and_reload(tmp_path):
+    path = str(tmp_path / 'state.json')
+    store = WatermarkStore(path)
+    store.advance([filing('0000320193-23-000106', '2023-11-03')], ['10-K'])
+    store.save()
+
+    assert WatermarkStore(path).get('320193', ['10-K']) == store.get('320193', ['10-K'])
+    assert not [name for name in tmp_path.iterdir() if name.suffix == '.tmp']
+
+
+def test_incremental_crawl(client, tmp_path, events):
+    store = WatermarkStore(str(tmp_path / 'state.json'))
+
+    def crawl(filing_types):
+        return get_sp500_sec_filings(filing_types, start_date='2023-01-01', end_date='2023-12-31', client=client,
+                                     tickers=['AAPL'], watermarks=store)
+
+    assert [f['accession_number'] for f in crawl(['10-K'])] == ['0000320193-23-000106']
+    assert crawl(['10-K']) == []
+    assert [f['accession_number'] for f in crawl(['10-K', '10-Q'])] == ['0000320193-23-000106']
+    assert WatermarkStore(store.path).get('320193', ['10-K'])['filing_date'] == '2023-11-03'
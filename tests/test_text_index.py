@@ -0,0 +1,117 @@
+import pandas as pd
+import pytest
+
+from filing_store import FilingStore
+from html_extract import SECTION_COLUMNS, TEXT_COLUMNS
+from sec_filing_parser import parse_sec_filing
+from text_index import SEARCH_COLUMNS, TextIndex
+
+APPLE_10K = {'cik': '0000320193', 'accession_number': '0000320193-23-000106', 'filing_type': '10-K',
+             'filing_date': '2023-11-03'}
+APPLE_10Q = {'cik': '0000320193', 'accession_number': '0000320193-23-000077', 'filing_type': '10-Q',
+             'filing_date': '2023-08-04'}
+MICROSOFT_10K = {'cik': '0000789019', 'accession_number': '0000950170-23-035122', 'filing_type': '10-K',
+                 'filing_date': '2023-07-27'}
+
+
+def parsed_filing(text_blocks=(), footnotes=(), sections=()):
+    return {
+        'text_blocks': pd.DataFrame([(text, 'text_block', f'tb{i}') for i, text in enumerate(text_blocks)],
+                                    columns=TEXT_COLUMNS),
+        'footnotes': pd.DataFrame([(text, 'footnote', f'fn{i}') for i, text in enumerate(footnotes)],
+                                  columns=TEXT_COLUMNS),
+        'sections': pd.DataFrame(list(sections), columns=SECTION_COLUMNS),
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = TextIndex(str(tmp_path / 'index.sqlite3'))
+    index.add_filing(APPLE_10K, parsed_filing(
+        text_blocks=['No goodwill impairment was recognized in fiscal 2023.'],
+        footnotes=['Includes deferred revenue recognized during the year.'],
+        sections=[('1A', 'Risk Factors', 'Goodwill impairments could reduce earnings. Impairment tests run yearly.')],
+    ))
+    index.add_filing(APPLE_10Q, parsed_filing(text_blocks=['Goodwill was not impaired during the quarter.']))
+    index.add_filing(MICROSOFT_10K, parsed_filing(
+        text_blocks=['Goodwill impairment reversal is not permitted.', 'Leases are recognized as assets.'],
+    ))
+    yield index
+    index.close()
+
+
+def test_add_filing_is_incremental(index):
+    assert index.stats() == {'filings': 3, 'blocks': 6}
+    assert index.has_accession('000032019323000106')
+    assert index.add_filing(APPLE_10K, parsed_filing(text_blocks=['Indexed again?'])) == 0
+    assert index.stats() == {'filings': 3, 'blocks': 6}
+
+
+def test_search_ranks_and_stems(index):
+    results = index.search('impair*')
+
+    assert list(results.columns) == SEARCH_COLUMNS
+    assert len(results) == 4
+    assert results['score'].is_monotonic_increasing
+    # Porter stemming matches "impairments" and "impaired" too
+    assert set(index.search('impairment')['accession_number']) == {
+        '000032019323000106', '000032019323000077', '000095017023035122'}
+
+
+def test_query_syntax(index):
+    assert index.search('"goodwill impairment" NOT reversal')[['block_id', 'item']].values.tolist() == [
+        ['tb0', ''], ['', '1A']]
+    assert index.search('deferred OR leases')['type'].tolist().count('footnote') == 1
+    assert index.search('NEAR(goodwill earnings, 3)')['item'].tolist() == ['1A']
+    assert index.search('nonexistentterm').empty
+
+
+def test_search_filters(index):
+    assert set(index.search('goodwill', ciks=['789019'])['cik']) == {789019}
+    assert index.search('goodwill', form_types=['10-Q'])['accession_number'].tolist() == ['000032019323000077']
+    assert index.search('goodwill', start_date='2023-08-01', end_date='2023-08-31')['form_type'].tolist() == ['10-Q']
+    assert index.search('goodwill', types=['section'])['item'].tolist() == ['1A']
+    assert len(index.search('goodwill', limit=1)) == 1
+
+
+def test_snippets_highlight_matches(index):
+    snippet = index.search('deferred')['snippet'].iloc[0]
+    assert '[deferred]' in snippet
+
+
+def test_merge_and_reopen(index, tmp_path):
+    before = index.search('goodwill')
+    index.merge(pages=16)
+    index.merge()
+    pd.testing.assert_frame_equal(index.search('goodwill'), before)
+
+    reopened = TextIndex(index.path)
+    try:
+        assert reopened.stats() == index.stats()
+    finally:
+        reopened.close()
+
+
+def test_filing_url_and_dei_form_type(index):
+    parsed = parsed_filing(text_blocks=['Segment information.'])
+    parsed['xbrl_data'] = pd.DataFrame({'concept': ['DocumentType'], 'value_text': ['8-K']})
+
+    index.add_filing({'filing_url': 'https://www.sec.gov/Archives/edgar/data/1018724/000101872423000008'}, parsed)
+
+    result = index.search('segment').iloc[0]
+    assert (result['cik'], result['accession_number'], result['form_type']) == (1018724, '000101872423000008', '8-K')
+    with pytest.raises(ValueError):
+        index.add_filing({'filing_url': 'https://example.com/'}, parsed)
+
+
+def test_parse_sec_filing_indexes_text(client, tmp_path):
+    index = TextIndex(str(tmp_path / 'index.sqlite3'))
+    try:
+        parse_sec_filing('https://www.sec.gov/Archives/edgar/data/0000320193/000032019323000106',
+                         client=client, store=FilingStore(str(tmp_path / 'store')),
+                         primary_document='aapl-20230930.htm', text_index=index, filing=APPLE_10K)
+
+        assert index.stats() == {'filings': 1, 'blocks': 5}
+        assert set(index.search('revenue')['type']) == {'text_block', 'footnote', 'section'}
+    finally:
+        index.close()
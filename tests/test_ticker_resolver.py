@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+from sec import get_ticker_to_cik_mapping
+from ticker_resolver import TickerResolver, load_or_fetch_resolver, normalize_ticker
+
+
+@pytest.fixture
+def resolver(client):
+    return TickerResolver.fetch(client)
+
+
+def test_normalize_ticker():
+    assert normalize_ticker(' brk.b ') == 'BRK-B'
+    assert normalize_ticker('BF/A') == 'BF-A'
+
+
+def test_ticker_lookups(resolver):
+    assert len(resolver) == 7
+    assert resolver.cik('AAPL') == '0000320193'
+    assert resolver.cik('brk.b') == resolver.cik('BRK-B') == '0001067983'
+    assert resolver.cik('ZZZZ') is None
+    assert resolver.company('BRK-A') == {
+        'ticker': 'BRK-A', 'cik': '0001067983', 'name': 'BERKSHIRE HATHAWAY INC',
+        'exchange': 'NYSE', 'share_class': 'A',
+    }
+    assert resolver.company('ZZZZ') is None
+
+
+def test_tickers_for_cik(resolver):
+    assert sorted(record['ticker'] for record in resolver.tickers_for('0001652044')) == ['GOOG', 'GOOGL']
+    assert resolver.tickers_for(1) == []
+
+
+def test_name_prefix_search(resolver):
+    assert [record['ticker'] for record in resolver.search('berkshire')] == ['BRK-A', 'BRK-B']
+    assert [record['ticker'] for record in resolver.search('  a')] == ['GOOG', 'GOOGL', 'AMZN', 'AAPL']
+    assert len(resolver.search('a', limit=2)) == 2
+    assert resolver.search('zz') == []
+
+
+def test_snapshot_round_trip(resolver, tmp_path):
+    path = str(tmp_path / 'company_tickers.snapshot')
+    resolver.save(path)
+
+    loaded = TickerResolver.load(path)
+
+    assert loaded.to_dict() == resolver.to_dict()
+    assert loaded.company('BRK-B') == resolver.company('BRK-B')
+    assert loaded.search('alpha') == resolver.search('alpha')
+    assert loaded.exchanges == ['NYSE', 'Nasdaq']
+
+
+def test_empty_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / 'empty.snapshot')
+    TickerResolver.from_records([]).save(path)
+
+    loaded = TickerResolver.load(path)
+
+    assert len(loaded) == 0
+    assert loaded.to_dict() == {}
+    assert loaded.cik('AAPL') is None
+    assert loaded.search('a') == []
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / 'not-a-snapshot'
+    path.write_bytes(b'{"fields": []}' + b'\0' * 64)
+
+    with pytest.raises(ValueError, match='Not a ticker resolver snapshot'):
+        TickerResolver.load(str(path))
+
+
+def test_from_company_tickers_json():
+    resolver = TickerResolver.from_json({
+        '0': {'cik_str': 320193, 'ticker': 'AAPL', 'title': 'Apple Inc.'},
+        '1': {'cik_str': 789019, 'ticker': 'MSFT', 'title': 'MICROSOFT CORP'},
+    })
+    assert resolver.to_dict() == {'AAPL': '0000320193', 'MSFT': '0000789019'}
+    assert resolver.company('MSFT')['exchange'] == ''
+
+
+def test_load_or_fetch_resolver(client, replay_server, tmp_path):
+    path = str(tmp_path / 'company_tickers.snapshot')
+
+    fetched = load_or_fetch_resolver(path, client=client)
+    loaded = load_or_fetch_resolver(path, client=client)
+
+    assert os.path.exists(path)
+    assert loaded.to_dict() == fetched.to_dict()
+    assert replay_server.stats.snapshot()['requests'] == 1
+    load_or_fetch_resolver(path, client=client, max_age=0)
+    assert replay_server.stats.snapshot()['requests'] == 2
+
+
+def test_ticker_to_cik_mapping(client):
+    mapping = get_ticker_to_cik_mapping(client)
+    assert mapping['AAPL'] == '0000320193'
+    assert mapping['BRK-B'] == '0001067983'
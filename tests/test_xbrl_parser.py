@@ -0,0 +1,197 @@
+import io
+
+import pandas as pd
+import pytest
+
+from html_extract import HtmlTextExtractor, extract_html_text
+from xbrl_parser import (FACT_COLUMNS, FACT_TABLE_COLUMNS, XSI_NIL, _ix_number, is_inline_xbrl, parse_ixbrl,
+                         parse_ixbrl_to_dataframe, parse_xbrl, parse_xbrl_to_dataframe)
+
+# The FY2023 context is declared after the facts that use it
+INSTANCE = b'''<?xml version="1.0" encoding="utf-8"?>
+<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance" xmlns:us-gaap="http://fasb.org/us-gaap/2023"
+    xmlns:dei="http://xbrl.sec.gov/dei/2023" xmlns:iso4217="http://www.xbrl.org/2003/iso4217"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+  <xbrli:context id="I2023"><xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">0000320193</xbrli:identifier></xbrli:entity><xbrli:period><xbrli:instant>2023-09-30</xbrli:instant></xbrli:period></xbrli:context>
+  <xbrli:unit id="usd"><xbrli:measure>iso4217:USD</xbrli:measure></xbrli:unit>
+  <xbrli:unit id="usdPerShare"><xbrli:divide><xbrli:unitNumerator><xbrli:measure>iso4217:USD</xbrli:measure></xbrli:unitNumerator><xbrli:unitDenominator><xbrli:measure>xbrli:shares</xbrli:measure></xbrli:unitDenominator></xbrli:divide></xbrli:unit>
+  <dei:DocumentType contextRef="FY2023">10-K</dei:DocumentType>
+  <us-gaap:Revenues contextRef="FY2023" unitRef="usd" decimals="-6">383285000000</us-gaap:Revenues>
+  <us-gaap:NetIncomeLoss contextRef="FY2023" unitRef="usd" decimals="-6">96995000000</us-gaap:NetIncomeLoss>
+  <us-gaap:EarningsPerShareBasic contextRef="FY2023" unitRef="usdPerShare" decimals="2">6.16</us-gaap:EarningsPerShareBasic>
+  <us-gaap:Assets contextRef="I2023" unitRef="usd" decimals="-6">352583000000</us-gaap:Assets>
+  <us-gaap:Goodwill contextRef="I2023" unitRef="usd" xsi:nil="true"/>
+  <us-gaap:Liabilities contextRef="I2023" unitRef="usd" decimals="-6"> n/a </us-gaap:Liabilities>
+  <xbrli:context id="FY2023"><xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">0000320193</xbrli:identifier></xbrli:entity><xbrli:period><xbrli:startDate>2022-09-25</xbrli:startDate><xbrli:endDate>2023-09-30</xbrli:endDate></xbrli:period></xbrli:context>
+</xbrli:xbrl>
+'''
+# The same facts as INSTANCE, as displayed in an inline XBRL 10-K
+IXBRL = b'''<?xml version="1.0" encoding="utf-8"?>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:ix="http://www.xbrl.org/2013/inlineXBRL"
+    xmlns:xbrli="http://www.xbrl.org/2003/instance" xmlns:ixt="http://www.xbrl.org/inlineXBRL/transformation/2020-02-12"
+    xmlns:us-gaap="http://fasb.org/us-gaap/2023" xmlns:dei="http://xbrl.sec.gov/dei/2023"
+    xmlns:iso4217="http://www.xbrl.org/2003/iso4217" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+<body>
+<div style="display:none"><ix:header><ix:resources>
+<xbrli:context id="I2023"><xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">0000320193</xbrli:identifier></xbrli:entity><xbrli:period><xbrli:instant>2023-09-30</xbrli:instant></xbrli:period></xbrli:context>
+<xbrli:context id="FY2023"><xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">0000320193</xbrli:identifier></xbrli:entity><xbrli:period><xbrli:startDate>2022-09-25</xbrli:startDate><xbrli:endDate>2023-09-30</xbrli:endDate></xbrli:period></xbrli:context>
+</ix:resources></ix:header></div>
+<p>Annual report on Form <ix:nonNumeric name="dei:DocumentType" contextRef="FY2023">10-K</ix:nonNumeric></p>
+<p>Net sales were $<ix:nonFraction name="us-gaap:Revenues" contextRef="FY2023" unitRef="usd" decimals="-6" scale="6" format="ixt:num-dot-decimal">383,285</ix:nonFraction> million
+and net income was $<ix:nonFraction name="us-gaap:NetIncomeLoss" contextRef="FY2023" unitRef="usd" decimals="-6" scale="6" format="ixt:num-dot-decimal">96,995</ix:nonFraction> million,
+or $<ix:nonFraction name="us-gaap:EarningsPerShareBasic" contextRef="FY2023" unitRef="usdPerShare" decimals="2">6.16</ix:nonFraction> per share.</p>
+<table>
+<tr><td>Total assets</td><td><ix:nonFraction name="us-gaap:Assets" contextRef="I2023" unitRef="usd" decimals="-6" scale="6" format="ixt:num-dot-decimal">352,583</ix:nonFraction></td></tr>
+<tr><td>Goodwill</td><td><ix:nonFraction name="us-gaap:Goodwill" contextRef="I2023" unitRef="usd" xsi:nil="true"/></td></tr>
+<tr><td>Total liabilities</td><td><ix:nonFraction name="us-gaap:Liabilities" contextRef="I2023" unitRef="usd" decimals="-6"> n/a </ix:nonFraction></td></tr>
+</table>
+</body>
+</html>
+'''
+CONCEPTS = ['DocumentType', 'Revenues', 'NetIncomeLoss', 'EarningsPerShareBasic', 'Assets', 'Goodwill',
+            'Liabilities']
+
+
+@pytest.fixture
+def instance_path(tmp_path):
+    path = tmp_path / 'aapl-20230930_htm.xml'
+    path.write_bytes(INSTANCE)
+    return str(path)
+
+
+@pytest.mark.parametrize('compact', [True, False])
+def test_lxml_and_bs4_engines_agree(instance_path, compact):
+    lxml_facts = parse_xbrl(instance_path, engine='lxml', compact=compact)
+    bs4_facts = parse_xbrl(instance_path, engine='bs4', compact=compact)
+
+    pd.testing.assert_frame_equal(lxml_facts, bs4_facts)
+    assert lxml_facts['concept'].astype(str).tolist() == CONCEPTS
+
+
+def test_compact_fact_table(instance_path):
+    facts = parse_xbrl(instance_path)
+
+    assert list(facts.columns) == FACT_TABLE_COLUMNS
+    for column in ('concept', 'context_ref', 'unit', 'decimals'):
+        assert str(facts[column].dtype) == 'category'
+    assert facts['value'].dtype == 'float64'
+    # Each distinct context is stored once, however many facts use it
+    assert list(facts['context_ref'].cat.categories) == ['FY2023', 'I2023']
+
+    facts = facts.set_index('concept')
+    assert facts.loc['Revenues', 'value'] == 383285e6
+    assert pd.isna(facts.loc['Revenues', 'value_text'])
+    assert facts.loc['EarningsPerShareBasic', 'value'] == 6.16
+    assert str(facts.loc['Revenues', 'start'].date()) == '2022-09-25'
+    assert str(facts.loc['Revenues', 'end'].date()) == '2023-09-30'
+    assert pd.isna(facts.loc['Revenues', 'instant'])
+    assert str(facts.loc['Assets', 'instant'].date()) == '2023-09-30'
+    assert pd.isna(facts.loc['Assets', 'start'])
+
+
+def test_compact_fact_table_keeps_text(instance_path):
+    facts = parse_xbrl(instance_path).set_index('concept')
+
+    # Non-numeric facts and numeric facts that do not parse keep their text
+    assert facts.loc['DocumentType', 'value_text'] == '10-K'
+    assert pd.isna(facts.loc['DocumentType', 'value'])
+    assert pd.isna(facts.loc['Liabilities', 'value'])
+    assert facts.loc['Liabilities', 'value_text'] == 'n/a'
+    # Nil facts have neither
+    assert pd.isna(facts.loc['Goodwill', 'value'])
+    assert facts.loc['Goodwill', 'value_text'] is None
+
+
+def test_legacy_layout(instance_path):
+    facts = parse_xbrl(instance_path, compact=False).set_index('concept')
+
+    assert list(facts.reset_index().columns) == FACT_COLUMNS
+    assert facts.loc['Revenues', 'value'] == '383285000000'
+    assert facts.loc['Revenues', 'period'] == '2022-09-25 to 2023-09-30'
+    assert facts.loc['Assets', 'period'] == '2023-09-30'
+    assert facts.loc['DocumentType', 'unit'] == ''
+    assert facts.loc['EarningsPerShareBasic', 'decimals'] == '2'
+
+
+@pytest.mark.parametrize('engine', ['lxml', 'bs4'])
+def test_parses_file_objects(instance_path, engine):
+    assert parse_xbrl(io.BytesIO(INSTANCE), engine=engine).equals(parse_xbrl(instance_path, engine=engine))
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError, match='Unknown XBRL engine'):
+        parse_xbrl(io.BytesIO(INSTANCE), engine='sax')
+
+
+def test_parse_errors_are_reported(events):
+    assert parse_xbrl_to_dataframe(io.BytesIO(b'<xbrli:xbrl><unclosed'), engine='lxml') is None
+    assert [event['event'] for event in events] == ['xbrl_parse_failed']
+
+
+@pytest.mark.parametrize('compact', [True, False])
+def test_inline_xbrl_matches_instance(instance_path, compact):
+    inline_facts = parse_ixbrl(io.BytesIO(IXBRL), compact=compact)
+
+    pd.testing.assert_frame_equal(inline_facts, parse_xbrl(instance_path, compact=compact))
+
+
+@pytest.mark.parametrize('text, attrib, expected', [
+    ('383,285', {'scale': '6', 'format': 'ixt:num-dot-decimal'}, '383285000000'),
+    ('1.5', {'scale': '9', 'sign': '-'}, '-1500000000'),
+    ('25', {'scale': '-2'}, '0.25'),
+    ('1.234.567,89', {'format': 'ixt:num-comma-decimal'}, '1234567.89'),
+    ('1 234,5', {'format': 'ixt-sec:numspacecomma'}, '1234.5'),
+    ('\u2014', {'format': 'ixt:fixed-zero'}, '0'),
+    ('-', {'format': 'ixt-sec:numdash'}, '0'),
+    ('Three', {'format': 'ixt-sec:numwordsen'}, '3'),
+    ('1\xa0234', {}, '1234'),
+    ('12', {XSI_NIL: 'true'}, ''),
+    (' n/a ', {}, 'n/a'),
+])
+def test_ix_number(text, attrib, expected):
+    assert _ix_number(text, attrib) == expected
+
+
+def test_inline_continuations_and_exclusions():
+    document = b'''<html xmlns="http://www.w3.org/1999/xhtml" xmlns:ix="http://www.xbrl.org/2013/inlineXBRL"
+        xmlns:xbrli="http://www.xbrl.org/2003/instance"><body>
+    <ix:continuation id="c2">final part.</ix:continuation>
+    <ix:nonNumeric name="us-gaap:CommitmentsDisclosureTextBlock" contextRef="FY2023" continuedAt="c1">First part<ix:exclude> (page 12)</ix:exclude></ix:nonNumeric>
+    <ix:nonNumeric name="us-gaap:LeasesTextBlock" contextRef="FY2023" escape="true"><p>Leases</p></ix:nonNumeric>
+    <ix:continuation id="c1" continuedAt="c2">second part,</ix:continuation>
+    </body></html>'''
+
+    facts = parse_ixbrl(io.BytesIO(document)).set_index('concept')
+
+    assert facts.loc['CommitmentsDisclosureTextBlock', 'value_text'] == 'First part second part, final part.'
+    assert facts.loc['LeasesTextBlock', 'value_text'] == '<p>Leases</p>'
+
+
+def test_inline_text_is_extracted_in_the_same_pass():
+    # Blocks inside facts only reach the text extractor once the fact is read
+    document = IXBRL.replace(b'<p>Annual report', b'''<p>Item 1. Business</p>
+<div class="textBlock" id="tb1"><ix:nonNumeric name="us-gaap:LeasesTextBlock" contextRef="FY2023" escape="true"><p>Leases</p><p>Operating leases.</p></ix:nonNumeric></div>
+<ix:nonNumeric name="us-gaap:RiskFactorsTextBlock" contextRef="FY2023"><p>Item 1A. Risk Factors</p><p>Risks <b>abound</b>.</p></ix:nonNumeric>
+<p>Item 7. MD&amp;A</p>
+<p>Annual report''')
+    extractor = HtmlTextExtractor()
+
+    facts = parse_ixbrl(io.BytesIO(document), handler=extractor)
+
+    assert facts.equals(parse_ixbrl(io.BytesIO(document)))
+    result = extractor.result()
+    expected = extract_html_text(io.BytesIO(document), engine='lxml')
+    for name in ('text_blocks', 'footnotes', 'sections'):
+        assert result[name].equals(expected[name])
+    assert result['sections']['item'].tolist() == ['1', '1A', '7']
+    assert result['text_blocks']['text'].tolist() == ['Leases Operating leases.']
+
+
+def test_is_inline_xbrl(instance_path):
+    assert is_inline_xbrl(io.BytesIO(IXBRL))
+    assert not is_inline_xbrl(instance_path)
+
+
+def test_inline_parse_errors_are_reported(events):
+    assert parse_ixbrl_to_dataframe(io.BytesIO(b''), compact=True) is None
+    assert [event['event'] for event in events] == ['ixbrl_parse_failed']
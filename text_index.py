@@ -0,0 +1,223 @@
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from filing_store import normalize_accession, parse_filing_url
+
+
+SEARCH_COLUMNS = ['cik', 'accession_number', 'form_type', 'filing_date', 'type', 'block_id',
+                  'item', 'score', 'snippet']
+
+# parse_sec_filing table -> record type stored in the index
+INDEXED_TABLES = {'text_blocks': None, 'footnotes': None, 'sections': 'section'}
+
+
+class TextIndex:
+    """
+    Incremental on-disk full-text index over filing text blocks, footnotes and Item sections
+
+    Built on SQLite FTS5: text is tokenized into an inverted index with
+    Porter stemming, queries support phrases ("goodwill impairment"),
+    AND / OR / NOT (binary: a NOT b), NEAR() and prefix terms (impair*),
+    and results are ranked by BM25 with highlighted snippets. Filing
+    metadata (CIK, form, date) is stored alongside each block for filtering.
+
+    Each indexed filing is one transaction, which FTS5 writes as a new index
+    segment; segments are merged incrementally as they accumulate (see
+    merge() for an explicit full merge after large loads).
+    """
+
+    def __init__(self, path='sec_text_index.sqlite3', automerge=8):
+        """
+        Args:
+            path (str): SQLite database file (default: sec_text_index.sqlite3)
+            automerge (int): Merge segments once this many accumulate at one level (default: 8)
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            '''CREATE TABLE IF NOT EXISTS filings (
+                   accession_number TEXT PRIMARY KEY,
+                   cik INTEGER NOT NULL,
+                   form_type TEXT,
+                   filing_date TEXT,
+                   blocks INTEGER NOT NULL,
+                   indexed_at REAL NOT NULL
+               )'''
+        )
+        self._db.execute(
+            '''CREATE VIRTUAL TABLE IF NOT EXISTS blocks USING fts5(
+                   text,
+                   cik UNINDEXED,
+                   accession_number UNINDEXED,
+                   form_type UNINDEXED,
+                   filing_date UNINDEXED,
+                   type UNINDEXED,
+                   block_id UNINDEXED,
+                   item UNINDEXED,
+                   tokenize = 'porter unicode61'
+               )'''
+        )
+        self._db.execute("INSERT INTO blocks (blocks, rank) VALUES ('automerge', ?)", (automerge,))
+        self._db.commit()
+
+    def has_accession(self, accession_number):
+        """
+        Check whether a filing is already indexed
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT 1 FROM filings WHERE accession_number = ?', (normalize_accession(accession_number),)
+            ).fetchone()
+        return row is not None
+
+    def add_filing(self, filing, parsed):
+        """
+        Index a parsed filing's text blocks, footnotes and Item sections
+
+        Filings already in the index are skipped, so re-running a crawl only
+        indexes new filings.
+
+        Args:
+            filing (dict): Filing metadata: 'cik', 'accession_number' (or a
+                           'filing_url' they can be read from), 'filing_type'
+                           and 'filing_date' (optional)
+            parsed (dict): Result of parse_sec_filing
+
+        Returns:
+            int: Number of blocks indexed (0 if the filing was already indexed)
+        """
+        cik, accession = filing.get('cik'), filing.get('accession_number')
+        if cik is None or accession is None:
+            url_parts = parse_filing_url(filing.get('filing_url', ''))
+            if url_parts is None:
+                raise ValueError("Filing needs 'cik' and 'accession_number' or an EDGAR 'filing_url'")
+            cik, accession = cik or url_parts[0], accession or url_parts[1]
+        cik = int(cik)
+        accession = normalize_accession(accession)
+        form_type = filing.get('filing_type') or _document_type(parsed)
+        filing_date = filing.get('filing_date', '')
+
+        rows = []
+        for table, record_type in INDEXED_TABLES.items():
+            df = parsed.get(table)
+            if df is None or df.empty:
+                continue
+            for record in df.to_dict('records'):
+                text = record.get('text') or ''
+                if not text:
+                    continue
+                rows.append((text, cik, accession, form_type, filing_date,
+                             record_type or record.get('type', ''), record.get('id', ''), record.get('item', '')))
+
+        with self._lock:
+            # One transaction per filing: a single new segment in the inverted index
+            with self._db:
+                if self._db.execute(
+                    'SELECT 1 FROM filings WHERE accession_number = ?', (accession,)
+                ).fetchone():
+                    return 0
+                self._db.executemany(
+                    '''INSERT INTO blocks (text, cik, accession_number, form_type, filing_date, type,
+                                           block_id, item)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', rows
+                )
+                self._db.execute(
+                    'INSERT INTO filings VALUES (?, ?, ?, ?, ?, ?)',
+                    (accession, cik, form_type, filing_date, len(rows), time.time())
+                )
+        return len(rows)
+
+    def search(self, query, ciks=None, form_types=None, start_date=None, end_date=None, types=None,
+               limit=20, snippet_tokens=16):
+        """
+        Run a ranked full-text query
+
+        Args:
+            query (str): FTS5 query, e.g. '"goodwill impairment" NOT reversal'
+            ciks (list): Only return blocks from these CIKs (default: all)
+            form_types (list): Only return blocks from these forms, e.g. ['10-K'] (default: all)
+            start_date (str): Earliest filing date in YYYY-MM-DD format (default: None)
+            end_date (str): Latest filing date in YYYY-MM-DD format (default: None)
+            types (list): Only return these block types: 'text_block', 'footnote',
+                          'section' (default: all)
+            limit (int): Maximum number of results (default: 20)
+            snippet_tokens (int): Tokens of context per snippet (default: 16)
+
+        Returns:
+            pandas.DataFrame: Best matches first, with SEARCH_COLUMNS (lower score is better)
+        """
+        clauses = ['blocks MATCH ?']
+        params = [query]
+        for column, values in (('cik', ciks), ('form_type', form_types), ('type', types)):
+            if values is not None:
+                values = [int(value) for value in values] if column == 'cik' else list(values)
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if start_date:
+            clauses.append('filing_date >= ?')
+            params.append(start_date)
+        if end_date:
+            clauses.append('filing_date <= ?')
+            params.append(end_date)
+        params.append(limit)
+
+        sql = f'''SELECT cik, accession_number, form_type, filing_date, type, block_id, item,
+                         bm25(blocks) AS score,
+                         snippet(blocks, 0, '[', ']', '...', {int(snippet_tokens)})
+                  FROM blocks
+                  WHERE {' AND '.join(clauses)}
+                  ORDER BY score
+                  LIMIT ?'''
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return pd.DataFrame(rows, columns=SEARCH_COLUMNS)
+
+    def merge(self, pages=None):
+        """
+        Merge index segments
+
+        Args:
+            pages (int): Do an incremental merge of about this many pages
+                         (default: None, merge everything into one segment)
+        """
+        with self._lock:
+            with self._db:
+                if pages is None:
+                    self._db.execute("INSERT INTO blocks (blocks) VALUES ('optimize')")
+                else:
+                    self._db.execute("INSERT INTO blocks (blocks, rank) VALUES ('merge', ?)", (pages,))
+
+    def stats(self):
+        """
+        Count indexed filings and blocks
+
+        Returns:
+            dict: 'filings' and 'blocks'
+        """
+        with self._lock:
+            filings, blocks = self._db.execute(
+                'SELECT COUNT(*), COALESCE(SUM(blocks), 0) FROM filings'
+            ).fetchone()
+        return {'filings': filings, 'blocks': blocks}
+
+    def close(self):
+        self._db.close()
+
+
+def _document_type(parsed):
+    """
+    Read the form type from the dei:DocumentType fact, when the filing has one
+    """
+    facts = parsed.get('xbrl_data')
+    if facts is None or facts.empty or 'value_text' not in facts:
+        return ''
+    matches = facts.loc[facts['concept'] == 'DocumentType', 'value_text'].dropna()
+    return str(matches.iloc[0]) if len(matches) else ''
@@ -0,0 +1,313 @@
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+from edgar_client import get_default_client
+
+
+COMPANY_TICKERS_EXCHANGE_URL = "https://www.sec.gov/files/company_tickers_exchange.json"
+
+# Snapshot layout: magic, header length, JSON header, then the raw arrays
+SNAPSHOT_MAGIC = b'EDGRTKR1'
+SNAPSHOT_ALIGNMENT = 64
+SNAPSHOT_ARRAYS = ['ticker_keys', 'tickers', 'ciks', 'names', 'exchange_codes',
+                   'name_keys', 'name_rows', 'cik_sorted', 'cik_rows']
+
+
+def normalize_ticker(ticker):
+    """
+    Normalize a ticker the way EDGAR writes it ('brk.b' -> 'BRK-B')
+    """
+    return ticker.strip().upper().replace('.', '-').replace('/', '-')
+
+
+def normalize_name(name):
+    """
+    Normalize a company name for prefix search (upper case, single spaces)
+    """
+    return ' '.join(name.upper().split())
+
+
+def _fixed_width(values):
+    """
+    Encode strings as a fixed-width UTF-8 bytes array (numpy 'S' dtype)
+    """
+    encoded = [value.encode('utf-8') for value in values]
+    width = max([len(value) for value in encoded] + [1])
+    return np.asarray(encoded, dtype=f'S{width}')
+
+
+def _prefix_upper_bound(prefix):
+    # Every key starting with prefix sorts below prefix + 0xFF (0xFF never occurs in UTF-8)
+    return prefix + b'\xff'
+
+
+class TickerResolver:
+    """
+    Indexed ticker <-> CIK <-> company name resolver
+
+    Rows (one per listed ticker) are held in sorted numpy arrays: tickers
+    are binary-searched with np.searchsorted, CIKs through a CIK-sorted
+    permutation, and company names through a sorted array of normalized
+    names, so a name prefix maps to one contiguous range. The arrays can be
+    written to a compact binary snapshot that load() memory-maps without
+    parsing anything.
+    """
+
+    def __init__(self, arrays, exchanges):
+        """
+        Args:
+            arrays (dict): The SNAPSHOT_ARRAYS numpy arrays
+            exchanges (list): Exchange names indexed by exchange_codes
+        """
+        self.arrays = arrays
+        self.exchanges = exchanges
+        for name in SNAPSHOT_ARRAYS:
+            setattr(self, name, arrays[name])
+
+    def __len__(self):
+        return len(self.ciks)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build a resolver from (cik, name, ticker, exchange) records
+
+        Args:
+            records (list): Tuples or lists of (cik, name, ticker, exchange)
+
+        Returns:
+            TickerResolver: Resolver over the records
+        """
+        rows = {}
+        for cik, name, ticker, exchange in records:
+            if ticker:
+                rows.setdefault(normalize_ticker(ticker), (int(cik), name or '', ticker, exchange or ''))
+        keys = sorted(rows)
+        rows = [rows[key] for key in keys]
+
+        exchanges = sorted({row[3] for row in rows})
+        exchange_index = {exchange: i for i, exchange in enumerate(exchanges)}
+        ciks = np.asarray([row[0] for row in rows], dtype=np.int64)
+
+        name_keys = _fixed_width([normalize_name(row[1]) for row in rows])
+        name_rows = np.argsort(name_keys, kind='stable').astype(np.int32)
+        cik_rows = np.argsort(ciks, kind='stable').astype(np.int32)
+
+        return cls({
+            'ticker_keys': _fixed_width(keys),
+            'tickers': _fixed_width([row[2] for row in rows]),
+            'ciks': ciks,
+            'names': _fixed_width([row[1] for row in rows]),
+            'exchange_codes': np.asarray([exchange_index[row[3]] for row in rows], dtype=np.int16),
+            'name_keys': name_keys[name_rows],
+            'name_rows': name_rows,
+            'cik_sorted': ciks[cik_rows],
+            'cik_rows': cik_rows,
+        }, exchanges)
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Build a resolver from company_tickers_exchange.json (or company_tickers.json)
+
+        Args:
+            data (dict): Decoded JSON document
+
+        Returns:
+            TickerResolver: Resolver over every listed ticker
+        """
+        if 'fields' in data:
+            fields = data['fields']
+            columns = [fields.index(field) for field in ('cik', 'name', 'ticker', 'exchange')]
+            records = [[row[i] for i in columns] for row in data.get('data', [])]
+        else:
+            records = [(entry['cik_str'], entry.get('title', ''), entry['ticker'], '')
+                       for entry in data.values()]
+        return cls.from_records(records)
+
+    @classmethod
+    def fetch(cls, client=None):
+        """
+        Download company_tickers_exchange.json and build a resolver
+
+        Args:
+            client (EdgarClient): EDGAR client to use (default: shared client)
+
+        Returns:
+            TickerResolver: Resolver over every listed ticker
+        """
+        client = client or get_default_client()
+        return cls.from_json(client.get_json(COMPANY_TICKERS_EXCHANGE_URL))
+
+    def save(self, path):
+        """
+        Write the resolver to a binary snapshot (written atomically)
+
+        Args:
+            path (str): Snapshot path
+        """
+        arrays = []
+        offset = 0
+        for name in SNAPSHOT_ARRAYS:
+            array = np.ascontiguousarray(self.arrays[name])
+            offset += -offset % SNAPSHOT_ALIGNMENT
+            arrays.append((name, array, offset))
+            offset += array.nbytes
+
+        header = json.dumps({
+            'exchanges': self.exchanges,
+            'arrays': {name: [array.dtype.str, len(array), array_offset] for name, array, array_offset in arrays},
+        }).encode('utf-8')
+        prefix = SNAPSHOT_MAGIC + struct.pack('<Q', len(header)) + header
+        data_start = len(prefix) + (-len(prefix) % SNAPSHOT_ALIGNMENT)
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = os.path.join(directory, '.' + os.path.basename(path) + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(prefix)
+            for name, array, array_offset in arrays:
+                f.seek(data_start + array_offset)
+                f.write(array.tobytes())
+            # Seeking alone does not grow the file, so trailing empty arrays
+            # would point past its end
+            f.truncate(data_start + offset)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Memory-map a binary snapshot
+
+        Arrays are views over the mapped file, so loading costs a header
+        parse and pages are read only as lookups touch them.
+
+        Args:
+            path (str): Snapshot path
+
+        Returns:
+            TickerResolver: The stored resolver
+        """
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if buffer[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"Not a ticker resolver snapshot: {path}")
+        header_start = len(SNAPSHOT_MAGIC) + 8
+        (header_length,) = struct.unpack('<Q', buffer[len(SNAPSHOT_MAGIC):header_start])
+        header = json.loads(buffer[header_start:header_start + header_length].decode('utf-8'))
+        data_start = header_start + header_length
+        data_start += -data_start % SNAPSHOT_ALIGNMENT
+
+        arrays = {
+            name: np.frombuffer(buffer, dtype=np.dtype(dtype), count=count, offset=data_start + offset)
+            for name, (dtype, count, offset) in header['arrays'].items()
+        }
+        return cls(arrays, header['exchanges'])
+
+    def _row(self, ticker):
+        key = normalize_ticker(ticker).encode('utf-8')
+        row = int(np.searchsorted(self.ticker_keys, key))
+        if row < len(self.ticker_keys) and self.ticker_keys[row] == key:
+            return row
+        return -1
+
+    def _record(self, row):
+        ticker = self.tickers[row].decode('utf-8')
+        return {
+            'ticker': ticker,
+            'cik': str(int(self.ciks[row])).zfill(10),
+            'name': self.names[row].decode('utf-8'),
+            'exchange': self.exchanges[self.exchange_codes[row]],
+            'share_class': ticker.rsplit('-', 1)[1] if '-' in ticker else '',
+        }
+
+    def cik(self, ticker):
+        """
+        Resolve a ticker to its zero-padded CIK ('BRK.B' and 'brk-b' both work)
+
+        Returns:
+            str: 10-digit CIK, or None for unknown tickers
+        """
+        row = self._row(ticker)
+        return str(int(self.ciks[row])).zfill(10) if row >= 0 else None
+
+    def company(self, ticker):
+        """
+        Look up a ticker's company record
+
+        Returns:
+            dict: ticker, cik, name, exchange and share_class, or None for unknown tickers
+        """
+        row = self._row(ticker)
+        return self._record(row) if row >= 0 else None
+
+    def tickers_for(self, cik):
+        """
+        List every ticker (share class) listed for a CIK
+
+        Args:
+            cik (str or int): CIK, padded or unpadded
+
+        Returns:
+            list: Company records (see company), one per ticker
+        """
+        cik = int(cik)
+        start = int(np.searchsorted(self.cik_sorted, cik, side='left'))
+        end = int(np.searchsorted(self.cik_sorted, cik, side='right'))
+        return [self._record(int(row)) for row in self.cik_rows[start:end]]
+
+    def search(self, prefix, limit=10):
+        """
+        Find companies whose name starts with a prefix (case-insensitive)
+
+        Args:
+            prefix (str): Name prefix, e.g. 'berkshire'
+            limit (int): Maximum number of results (default: 10)
+
+        Returns:
+            list: Company records (see company) in name order
+        """
+        key = normalize_name(prefix).encode('utf-8')
+        start = int(np.searchsorted(self.name_keys, key, side='left'))
+        end = int(np.searchsorted(self.name_keys, _prefix_upper_bound(key), side='left'))
+        end = min(end, start + limit) if limit is not None else end
+        return [self._record(int(row)) for row in self.name_rows[start:end]]
+
+    def to_dict(self):
+        """
+        Build the plain ticker -> zero-padded CIK mapping
+
+        Returns:
+            dict: Mapping of EDGAR tickers to CIK numbers
+        """
+        return {
+            ticker.decode('utf-8'): str(int(cik)).zfill(10)
+            for ticker, cik in zip(self.tickers, self.ciks)
+        }
+
+
+def load_or_fetch_resolver(path='company_tickers.snapshot', client=None, max_age=24 * 3600):
+    """
+    Load the resolver snapshot, downloading and rewriting it when missing or stale
+
+    Args:
+        path (str): Snapshot path (default: company_tickers.snapshot)
+        client (EdgarClient): EDGAR client used to refresh (default: shared client)
+        max_age (float): Refresh snapshots older than this many seconds (default: one day;
+                         None never refreshes an existing snapshot)
+
+    Returns:
+        TickerResolver: The resolver
+    """
+    if os.path.exists(path) and (max_age is None or time.time() - os.path.getmtime(path) < max_age):
+        return TickerResolver.load(path)
+
+    resolver = TickerResolver.fetch(client)
+    resolver.save(path)
+    return resolver
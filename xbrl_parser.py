@@ -0,0 +1,569 @@
+import re
+from array import array
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from edgar_metrics import get_default_metrics
+
+try:
+    from lxml import etree
+except ImportError:  # lxml is optional; the BeautifulSoup engine still works without it
+    etree = None
+
+
+FACT_COLUMNS = ['concept', 'value', 'context_ref', 'period', 'unit', 'decimals']
+FACT_TABLE_COLUMNS = ['concept', 'value', 'value_text', 'context_ref', 'start', 'end', 'instant',
+                      'unit', 'decimals']
+
+# Inline XBRL 1.0 and 1.1 namespaces
+IX_NAMESPACES = ('http://www.xbrl.org/2008/inlineXBRL', 'http://www.xbrl.org/2013/inlineXBRL')
+XBRLI_CONTEXT = '{http://www.xbrl.org/2003/instance}context'
+XSI_NIL = '{http://www.w3.org/2001/XMLSchema-instance}nil'
+NAMESPACE_DECLARATION = re.compile(r'\s+xmlns(?::[\w.-]+)?="[^"]*"')
+
+# Transformation registry formats (ixt / ixt-sec local names) handled by _ix_number
+IX_ZERO_FORMATS = {'fixed-zero', 'zerodash', 'numdash'}
+IX_COMMA_DECIMAL_FORMATS = {'num-comma-decimal', 'numcommadecimal', 'numspacecomma', 'numdotcomma'}
+IX_NUMBER_WORDS = {
+    'no': 0, 'none': 0, 'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12, 'thirteen': 13,
+    'fourteen': 14, 'fifteen': 15, 'sixteen': 16, 'seventeen': 17, 'eighteen': 18, 'nineteen': 19,
+    'twenty': 20,
+}
+
+
+class _Interner:
+    """
+    Dictionary-encodes a column while it is being collected
+
+    Each distinct string is stored once; rows only hold an integer code, so
+    a concept repeated across 100k facts costs 4 bytes per row, not a string.
+    """
+
+    def __init__(self):
+        self.index = {}
+        self.categories = []
+        self.codes = array('i')
+
+    def add(self, value):
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.categories)
+            self.categories.append(value)
+        self.codes.append(code)
+
+    def categorical(self):
+        return pd.Categorical.from_codes(np.asarray(self.codes, dtype=np.int32), categories=self.categories)
+
+    def decode(self):
+        categories = self.categories
+        return [categories[code] for code in self.codes]
+
+
+class _FactColumns:
+    """
+    Column-wise fact collector shared by all parser engines
+    """
+
+    def __init__(self):
+        self.concept = _Interner()
+        self.context_ref = _Interner()
+        self.unit = _Interner()
+        self.decimals = _Interner()
+        self.values = []
+
+    def add(self, concept, value, context_ref, unit, decimals):
+        self.concept.add(concept)
+        self.context_ref.add(context_ref)
+        self.unit.add(unit)
+        self.decimals.add(decimals)
+        self.values.append(value)
+
+
+def _local_name(tag):
+    """
+    Strip the namespace from an lxml tag ('{ns}Revenues' -> 'Revenues')
+    """
+    return tag.rsplit('}', 1)[-1] if tag[:1] == '{' else tag
+
+
+def _format_period(period):
+    """
+    Render a context period dict the way the original parser did
+    """
+    if 'instant' in period:
+        return period['instant']
+    if 'startDate' in period and 'endDate' in period:
+        return f"{period['startDate']} to {period['endDate']}"
+    return ''
+
+
+def _legacy_frame(facts, contexts):
+    """
+    Build the original object-dtype fact DataFrame with an "a to b" period string
+    """
+    context_refs = facts.context_ref.decode()
+    return pd.DataFrame({
+        'concept': facts.concept.decode(),
+        'value': facts.values,
+        'context_ref': context_refs,
+        'period': [_format_period(contexts.get(ref, {})) for ref in context_refs],
+        'unit': facts.unit.decode(),
+        'decimals': facts.decimals.decode(),
+    }, columns=FACT_COLUMNS)
+
+
+def build_fact_table(facts, contexts):
+    """
+    Build the compact, typed fact table
+
+    Concept, context, unit and decimals are categorical. Numeric facts (those
+    with a unitRef) are parsed into the float64 `value` column. `value_text`
+    keeps the raw text of non-numeric facts (dei fields, text blocks) and of
+    numeric facts whose text does not parse as a number, so nothing is lost.
+    Context periods are split into start/end/instant datetime64 columns.
+
+    Args:
+        facts (_FactColumns): Collected facts
+        contexts (dict): Context id -> {'startDate', 'endDate', 'instant'} strings
+
+    Returns:
+        pandas.DataFrame: Fact table with FACT_TABLE_COLUMNS
+    """
+    unit = facts.unit.categorical()
+    context_ref = facts.context_ref.categorical()
+    raw = pd.Series(facts.values, dtype=object)
+
+    # XBRL numeric items always carry a unitRef; everything else is text
+    numeric = np.asarray(unit != '', dtype=bool)
+    value = np.full(len(raw), np.nan)
+    if numeric.any():
+        value[numeric] = pd.to_numeric(raw[numeric], errors='coerce').to_numpy(dtype=float)
+    # Numeric facts that failed to parse keep their text; nil (empty) facts stay None
+    unparsed = numeric & np.isnan(value) & (raw.str.strip().fillna('') != '').to_numpy(dtype=bool)
+    value_text = raw.where(~numeric | unparsed, None)
+
+    # Resolve periods once per distinct context, then broadcast through the codes
+    codes = np.asarray(context_ref.codes)
+    periods = {}
+    for key in ('startDate', 'endDate', 'instant'):
+        per_context = pd.to_datetime(
+            [contexts.get(ref, {}).get(key) for ref in context_ref.categories], errors='coerce'
+        )
+        periods[key] = np.asarray(per_context, dtype='datetime64[ns]')[codes]
+
+    return pd.DataFrame({
+        'concept': facts.concept.categorical(),
+        'value': value,
+        'value_text': value_text,
+        'context_ref': context_ref,
+        'start': periods['startDate'],
+        'end': periods['endDate'],
+        'instant': periods['instant'],
+        'unit': unit,
+        'decimals': facts.decimals.categorical(),
+    }, columns=FACT_TABLE_COLUMNS)
+
+
+def _parse_xbrl_lxml(source):
+    """
+    Stream an XBRL instance with lxml.etree.iterparse
+
+    Elements are cleared as soon as they are consumed, so memory stays flat
+    regardless of file size. Contexts and facts are collected in the same
+    pass; periods are joined onto facts at the end, which also handles
+    instances that declare contexts after the facts that reference them.
+
+    Args:
+        source (str or file): Path or binary file object of the instance document
+
+    Returns:
+        tuple: (_FactColumns, contexts dict)
+    """
+    contexts = {}
+    facts = _FactColumns()
+
+    depth = 0
+    for event, elem in etree.iterparse(source, events=('start', 'end'), huge_tree=True):
+        if event == 'start':
+            depth += 1
+            continue
+        depth -= 1
+
+        tag = elem.tag
+        if not isinstance(tag, str):
+            continue
+        name = _local_name(tag)
+
+        if name == 'context':
+            period = {}
+            for child in elem.iter():
+                if isinstance(child.tag, str):
+                    child_name = _local_name(child.tag)
+                    if child_name in ('instant', 'startDate', 'endDate'):
+                        period[child_name] = (child.text or '').strip()
+            contexts[elem.get('id')] = period
+        else:
+            attrib = elem.attrib
+            context_ref = attrib.get('contextRef')
+            if context_ref:
+                facts.add(
+                    name,
+                    ''.join(elem.itertext()).strip(),
+                    context_ref,
+                    attrib.get('unitRef', ''),
+                    attrib.get('decimals', ''),
+                )
+
+        # Release top-level elements (and everything before them) once consumed
+        if depth == 1:
+            elem.clear()
+            parent = elem.getparent()
+            while elem.getprevious() is not None:
+                del parent[0]
+
+    return facts, contexts
+
+
+def _parse_xbrl_bs4(source):
+    """
+    Parse an XBRL instance with BeautifulSoup (the original, in-memory engine)
+
+    Args:
+        source (str or file): Path or file object of the instance document
+
+    Returns:
+        tuple: (_FactColumns, contexts dict)
+    """
+    # Read and parse XBRL file
+    if isinstance(source, str):
+        with open(source, 'r', encoding='utf-8') as file:
+            soup = BeautifulSoup(file, 'xml')
+    else:
+        soup = BeautifulSoup(source, 'xml')
+
+    # Initialize containers to store data
+    contexts = {}
+    facts = _FactColumns()
+
+    # Extract contexts
+    context_elements = soup.find_all('context')
+    for context in context_elements:
+        context_id = context.get('id')
+        period = context.find('period')
+        if period:
+            instant = period.find('instant')
+            if instant:
+                contexts[context_id] = {'instant': instant.text}
+            else:
+                start_date = period.find('startDate')
+                end_date = period.find('endDate')
+                if start_date and end_date:
+                    contexts[context_id] = {'startDate': start_date.text, 'endDate': end_date.text}
+
+    # Extract facts
+    for tag in soup.find_all():
+        if tag.name != 'context' and tag.get('contextRef'):
+            facts.add(
+                tag.name,
+                tag.text.strip(),
+                tag.get('contextRef'),
+                tag.get('unitRef', ''),
+                tag.get('decimals', ''),
+            )
+
+    return facts, contexts
+
+
+def _ix_number(text, attrib):
+    """
+    Apply an ix:nonFraction's format, scale and sign to its displayed text
+
+    Returns the value as a plain decimal string ('-1500000000' for "1.5" with
+    scale 9 and sign "-"), or the cleaned text when it is not a number.
+    """
+    if attrib.get(XSI_NIL) in ('true', '1'):
+        return ''
+
+    fmt = attrib.get('format', '').rsplit(':', 1)[-1]
+    text = text.replace('\xa0', ' ').strip()
+    if fmt in IX_ZERO_FORMATS:
+        text = '0'
+    elif fmt in IX_COMMA_DECIMAL_FORMATS:
+        text = text.replace('.', '').replace(' ', '').replace(',', '.')
+    elif text.lower() in IX_NUMBER_WORDS:
+        text = str(IX_NUMBER_WORDS[text.lower()])
+    else:
+        text = text.replace(',', '').replace(' ', '')
+
+    try:
+        number = Decimal(text)
+    except InvalidOperation:
+        return text
+    scale = int(attrib.get('scale') or 0)
+    if scale:
+        number = number.scaleb(scale)
+    if attrib.get('sign') == '-':
+        number = -number
+    return format(number, 'f')
+
+
+def _ix_text(elem, exclude_tags):
+    """
+    Concatenate an element's text, skipping ix:exclude subtrees
+    """
+    parts = [elem.text or '']
+    for child in elem:
+        if child.tag not in exclude_tags:
+            parts.append(_ix_text(child, exclude_tags))
+        parts.append(child.tail or '')
+    return ''.join(parts)
+
+
+def _ix_markup(elem):
+    """
+    Serialize an element's content, as escaped text blocks carry it in an instance
+    """
+    markup = ''.join(etree.tostring(child, encoding='unicode', with_tail=True) for child in elem)
+    return (elem.text or '') + NAMESPACE_DECLARATION.sub('', markup)
+
+
+def _parse_ixbrl_lxml(source, handler=None):
+    """
+    Stream the facts out of an inline XBRL (iXBRL) HTML document
+
+    Contexts are read from ix:resources and facts from ix:nonFraction and
+    ix:nonNumeric, in a single lxml iterparse pass over the document. Numeric
+    facts get their format/scale/sign transforms applied, so values match
+    the ones in the equivalent instance document. Text split across
+    ix:continuation elements is joined back onto its fact. Elements are
+    released as soon as no open fact needs them.
+
+    With a handler, every other element's start and end are passed on in
+    document order. Elements inside a fact are passed on once the fact has
+    been read, and the handler then owns releasing elements.
+
+    Args:
+        source (str or file): Path or binary file object of the .htm document
+        handler: Object with start(elem) and end(elem) methods, such as an HtmlTextExtractor
+
+    Returns:
+        tuple: (_FactColumns, contexts dict)
+    """
+    contexts = {}
+    facts = _FactColumns()
+
+    fact_tags = {f'{{{ns}}}{name}' for ns in IX_NAMESPACES for name in ('nonFraction', 'nonNumeric')}
+    continuation_tags = {f'{{{ns}}}continuation' for ns in IX_NAMESPACES}
+    exclude_tags = {f'{{{ns}}}exclude' for ns in IX_NAMESPACES}
+    capture_tags = fact_tags | continuation_tags | exclude_tags | {XBRLI_CONTEXT}
+
+    # ix:continuation id -> (text, markup, next continuation id)
+    continuations = {}
+    continued_facts = []
+
+    capture_depth = 0
+    for event, elem in etree.iterparse(source, events=('start', 'end'), huge_tree=True, recover=True):
+        tag = elem.tag
+        if not isinstance(tag, str):
+            continue
+        if event == 'start':
+            if tag in capture_tags:
+                capture_depth += 1
+            elif handler is not None and capture_depth == 0:
+                handler.start(elem)
+            continue
+
+        if tag in fact_tags:
+            capture_depth -= 1
+            attrib = elem.attrib
+            if tag.endswith('}nonFraction'):
+                value = _ix_number(_ix_text(elem, exclude_tags), attrib)
+            elif attrib.get('escape') in ('true', '1'):
+                value = _ix_markup(elem)
+            else:
+                value = _ix_text(elem, exclude_tags).strip()
+            if attrib.get('continuedAt'):
+                continued_facts.append((len(facts.values), attrib.get('escape') in ('true', '1'),
+                                        attrib.get('continuedAt')))
+            facts.add(
+                attrib.get('name', '').rsplit(':', 1)[-1],
+                value,
+                attrib.get('contextRef', ''),
+                attrib.get('unitRef', ''),
+                attrib.get('decimals', ''),
+            )
+        elif tag in continuation_tags:
+            capture_depth -= 1
+            continuations[elem.get('id')] = (_ix_text(elem, exclude_tags), _ix_markup(elem),
+                                             elem.get('continuedAt'))
+        elif tag in exclude_tags:
+            capture_depth -= 1
+        elif tag == XBRLI_CONTEXT:
+            capture_depth -= 1
+            period = {}
+            for child in elem.iter():
+                if isinstance(child.tag, str):
+                    child_name = _local_name(child.tag)
+                    if child_name in ('instant', 'startDate', 'endDate'):
+                        period[child_name] = (child.text or '').strip()
+            contexts[elem.get('id')] = period
+
+        if handler is not None:
+            if capture_depth == 0 and tag in capture_tags:
+                # Replay the fact's subtree, which the handler has not seen yet
+                for walk_event, walk_elem in etree.iterwalk(elem, events=('start', 'end')):
+                    if not isinstance(walk_elem.tag, str):
+                        continue
+                    if walk_event == 'start':
+                        handler.start(walk_elem)
+                    else:
+                        handler.end(walk_elem)
+            elif capture_depth == 0:
+                handler.end(elem)
+        # Release consumed markup unless an enclosing fact still needs its text
+        elif capture_depth == 0:
+            elem.clear(keep_tail=True)
+            parent = elem.getparent()
+            if parent is not None:
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+    # Join continued text (continuations may appear before or after their fact)
+    for index, escaped, continued_at in continued_facts:
+        parts = [facts.values[index]]
+        seen = set()
+        while continued_at and continued_at in continuations and continued_at not in seen:
+            seen.add(continued_at)
+            text, markup, continued_at = continuations[continued_at]
+            parts.append(markup if escaped else text)
+        facts.values[index] = ''.join(parts) if escaped else ' '.join(part.strip() for part in parts)
+
+    return facts, contexts
+
+
+def is_inline_xbrl(source, sniff_bytes=65536):
+    """
+    Check whether an HTML document carries inline XBRL facts
+
+    Only the head of the file is read: iXBRL documents declare the inline
+    XBRL namespace on their root element.
+
+    Args:
+        source (str or file): Path or binary file object of the .htm document
+        sniff_bytes (int): Number of leading bytes to inspect (default: 65536)
+
+    Returns:
+        bool: True if the document is inline XBRL
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            head = f.read(sniff_bytes)
+    else:
+        head = source.read(sniff_bytes)
+    return any(ns.encode() in head for ns in IX_NAMESPACES)
+
+
+def parse_ixbrl(htm_file_path, compact=True, handler=None):
+    """
+    Extract the facts of an inline XBRL document, raising on failure
+
+    Args:
+        htm_file_path (str or file): Path or binary file object of the inline XBRL document
+        compact (bool): Return the typed fact table (default: True)
+        handler: Also pass the document's elements to handler.start / handler.end in the
+                 same pass, e.g. an HtmlTextExtractor for its text (default: None)
+
+    Returns:
+        pandas.DataFrame: DataFrame containing the XBRL data
+    """
+    if etree is None:
+        raise ImportError("Inline XBRL parsing requires the lxml package")
+    facts, contexts = _parse_ixbrl_lxml(htm_file_path, handler)
+    if compact:
+        return build_fact_table(facts, contexts)
+    return _legacy_frame(facts, contexts)
+
+
+def parse_ixbrl_to_dataframe(htm_file_path, compact=True, handler=None):
+    """
+    Extract the XBRL facts embedded in an inline XBRL (.htm) document
+
+    Produces the same fact table as parse_xbrl_to_dataframe does for the
+    filing's instance document, so the separate .xml does not need to be
+    downloaded or parsed. Requires lxml. Errors are reported and None is
+    returned; use parse_ixbrl to have them raised.
+
+    Args:
+        htm_file_path (str or file): Path or binary file object of the inline XBRL document
+        compact (bool): Return the typed fact table (default: True)
+        handler: Also pass the document's elements to it, see parse_ixbrl (default: None)
+
+    Returns:
+        pandas.DataFrame: DataFrame containing the XBRL data
+    """
+    try:
+        return parse_ixbrl(htm_file_path, compact, handler)
+    except Exception as e:
+        get_default_metrics().error('ixbrl_parse_failed', f"Error parsing inline XBRL file: {str(e)}", e)
+        return None
+
+
+def parse_xbrl(xbrl_file_path, engine='auto', compact=True):
+    """
+    Parse an XBRL instance, raising on failure
+
+    Args:
+        xbrl_file_path (str or file): Path or file object of the instance document
+        engine (str): 'lxml' (streaming), 'bs4' (BeautifulSoup) or 'auto' (default: 'auto')
+        compact (bool): Return the typed fact table instead of the legacy layout (default: True)
+
+    Returns:
+        pandas.DataFrame: DataFrame containing the XBRL data
+    """
+    if engine == 'auto':
+        engine = 'lxml' if etree is not None else 'bs4'
+
+    if engine == 'lxml':
+        if etree is None:
+            raise ImportError("The 'lxml' engine requires the lxml package")
+        facts, contexts = _parse_xbrl_lxml(xbrl_file_path)
+    elif engine == 'bs4':
+        facts, contexts = _parse_xbrl_bs4(xbrl_file_path)
+    else:
+        raise ValueError(f"Unknown XBRL engine: {engine}")
+
+    if compact:
+        return build_fact_table(facts, contexts)
+    return _legacy_frame(facts, contexts)
+
+
+def parse_xbrl_to_dataframe(xbrl_file_path, engine='auto', compact=True):
+    """
+    Parse XBRL file and convert it to a pandas DataFrame
+
+    By default facts come back as a compact typed table: categorical
+    concept/context_ref/unit/decimals, float64 `value` plus `value_text` for
+    non-numeric facts, and start/end/instant datetime columns. Pass
+    compact=False for the original string columns with an "a to b" period.
+    Errors are reported and None is returned; use parse_xbrl to have them
+    raised.
+
+    Args:
+        xbrl_file_path (str or file): Path to the XBRL file, or a binary file object
+                                      (e.g. a decompressing reader from open_document)
+        engine (str): 'lxml' (streaming), 'bs4' (BeautifulSoup) or 'auto' (default: 'auto',
+                      lxml when installed)
+        compact (bool): Return the typed fact table (default: True)
+
+    Returns:
+        pandas.DataFrame: DataFrame containing the XBRL data
+    """
+    try:
+        return parse_xbrl(xbrl_file_path, engine, compact)
+    except Exception as e:
+        get_default_metrics().error('xbrl_parse_failed', f"Error parsing XBRL file: {str(e)}", e)
+        return None